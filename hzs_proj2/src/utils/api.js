@@ -150,6 +150,15 @@ export function getBookCopies(bookId) {
   return getJson(`/book/${bookId}/copies`);
 }
 
+export function getBookAvailability(bookId) {
+  return getJson(`/book/${bookId}/availability`);
+}
+
+export function getBooksAvailability(bookIds) {
+  const query = bookIds.map(id => `ids=${encodeURIComponent(id)}`).join('&');
+  return getJson(`/book/availability?${query}`);
+}
+
 export function addAuthorToBook(bookId, authorId) {
   return fetch(`${BASE_URL}/book/${bookId}/authors?author_id=${authorId}`, {
     method: 'POST',
@@ -174,8 +183,23 @@ export function getBookById(bookId) {
   return getJson(`/book/${bookId}`);
 }
 
-export function getAllBooks() {
-  return getJson('/book/');
+export function getBooksPage(afterId = 0, limit = 50, topic = null) {
+  const params = new URLSearchParams({ after_id: afterId, limit });
+  if (topic) {
+    params.append('topic', topic);
+  }
+  return getJson(`/book/?${params.toString()}`);
+}
+
+export async function getAllBooks() {
+  const books = [];
+  let cursor = 0;
+  while (cursor !== null) {
+    const page = await getBooksPage(cursor, 500);
+    books.push(...page.items);
+    cursor = page.next_cursor;
+  }
+  return books;
 }
 
 export function addAuthor(author) {
@@ -215,6 +239,27 @@ export async function addRental(rentalData) {
   }
 }
 
+export async function checkoutBook(checkoutData) {
+  try {
+    const response = await fetch(`${BASE_URL}/rental/checkout`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(checkoutData),
+    });
+
+    const data = await response.json();
+
+    if (!response.ok) {
+      throw new Error(`${response.status}: ${data.detail || 'Failed to check out book'}`);
+    }
+
+    return data;
+  } catch (error) {
+    console.error('Failed to check out book:', error);
+    throw error;
+  }
+}
+
 export const getRentalById = async (rentalId) => {
   const response = await fetch(`${BASE_URL}/rental/${rentalId}`);
 
@@ -262,6 +307,25 @@ export const returnRental = async (rentalId) => {
   }
 };
 
+export const returnCopies = async (copyIds) => {
+  const response = await fetch(`${BASE_URL}/rental/return`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({
+      copy_ids: copyIds,
+      actual_return_date: new Date().toISOString()
+    })
+  });
+
+  const data = await response.json();
+  if (!response.ok) {
+    throw new Error(data.detail || 'Failed to return copies');
+  }
+  return data;
+};
+
 export const getRentalsByCustomer = async (customerId) => {
   const response = await fetch(`${BASE_URL}/rental/customer/${customerId}`);
 
@@ -367,6 +431,15 @@ export function createRoomReservation(data) {
   }).then(res => res.json());
 }
 
+// Create a repeating reservation; data.recurrence = { freq: 'WEEKLY' | 'DAILY', interval, until | count }
+export function createRecurringRoomReservation(data) {
+  return fetch('http://127.0.0.1:8000/room-reservation/recurring', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data)
+  }).then(res => res.json());
+}
+
 // Get reservations for a specific room
 export function getRoomReservations(roomId) {
   return fetch(`http://127.0.0.1:8000/room-reservation/room/${roomId}`)
@@ -400,6 +473,15 @@ export function deleteRoomReservation(reservationId) {
   });
 }
 
+// Get free rooms and their free slots for a date; start/end are "HH:MM" and optional
+export function getRoomAvailability({ date, start, end, minCapacity } = {}) {
+  const params = new URLSearchParams({ date });
+  if (start) params.append('start', start);
+  if (end) params.append('end', end);
+  if (minCapacity) params.append('min_capacity', minCapacity);
+  return getJson(`/study-room/availability?${params}`);
+}
+
 // Get all rooms
 export function getAllRooms() {
   return fetch('http://127.0.0.1:8000/room/')
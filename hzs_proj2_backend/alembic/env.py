@@ -4,14 +4,13 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from app.models import Base
-from app.config import settings
+from app.database import DATABASE_URL
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", f"postgresql://{settings.database_username}:{settings.database_password} \
-@{settings.database_hostname}:{settings.database_port}/{settings.database_name}")
+# ConfigParser treats % as interpolation, so escape it in case the password contains one
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -22,7 +21,8 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = Base.metadata
+# The schema is plain SQL (no SQLAlchemy models), so revisions are written by hand
+target_metadata = None
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -68,8 +68,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # each revision commits on its own, so a failure leaves the earlier ones applied
+        # and the autocommit blocks of the online helpers only end their own revision
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -1,35 +0,0 @@
-"""add user table
-
-Revision ID: 39c2e34bc2ed
-Revises: f088ba3496d7
-Create Date: 2025-02-23 17:28:24.522727
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '39c2e34bc2ed'
-down_revision: Union[str, None] = 'f088ba3496d7'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    op.create_table('users', 
-                    sa.Column('id', sa.Integer, nullable=False),
-                    sa.Column('email', sa.String, nullable=False),
-                    sa.Column('password', sa.String, nullable=False),
-                    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('now()')),
-                    sa.PrimaryKeyConstraint('id'),
-                    sa.UniqueConstraint('email')
-)
-    pass
-
-
-def downgrade() -> None:
-    op.drop_table('users')
-    pass
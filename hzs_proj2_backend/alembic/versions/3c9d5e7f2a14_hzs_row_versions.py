@@ -0,0 +1,68 @@
+"""hzs row versions for conditional GET
+
+Revision ID: 3c9d5e7f2a14
+Revises: f6a3e8b2c915
+Create Date: 2026-10-18 13:30:00.000000
+
+hzs_room_reservation, hzs_event and hzs_seminar get an updated_at column that a trigger
+sets on every insert and update. app/row_versions.py derives the ETags of the polled
+collections (a room's reservations, the seminar list) from it.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import create_index_concurrently, drop_index_concurrently, lock_timeout
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d5e7f2a14'
+down_revision: Union[str, None] = 'f6a3e8b2c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+VERSIONED_TABLES = ['hzs_room_reservation', 'hzs_event', 'hzs_seminar']
+
+# clock_timestamp() rather than now(): the version records when the row was written, not
+# when its transaction started
+TOUCH_FUNC = """
+CREATE OR REPLACE FUNCTION trg_hzs_touch_updated_at_func() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    lock_timeout()
+    op.execute(TOUCH_FUNC)
+    for table in VERSIONED_TABLES:
+        # now() is stable, so existing rows share the value and the table is not rewritten
+        op.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMPTZ NOT NULL DEFAULT now()")
+        op.execute(f"""
+            CREATE OR REPLACE TRIGGER trg_{table}_updated_at
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW
+            EXECUTE FUNCTION trg_hzs_touch_updated_at_func()
+        """)
+
+    # a room's version is computed by an index-only scan
+    create_index_concurrently(
+        'hzs_room_reservation_room_version_idx', 'hzs_room_reservation', 'room_id',
+        include='reservation_id, updated_at',
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently('hzs_room_reservation_room_version_idx')
+
+    lock_timeout()
+    for table in reversed(VERSIONED_TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table}")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS updated_at")
+    op.execute("DROP FUNCTION IF EXISTS trg_hzs_touch_updated_at_func()")
@@ -1,29 +0,0 @@
-"""create posts table
-
-Revision ID: 57f8f82da4a7
-Revises: 
-Create Date: 2025-02-23 17:18:20.425844
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '57f8f82da4a7'
-down_revision: Union[str, None] = None
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    op.create_table('posts', sa.Column('id', sa.Integer, nullable=False, primary_key=True),
-                    sa.Column('title', sa.String, nullable=False))
-    pass
-
-
-def downgrade() -> None:
-    op.drop_table('posts')
-    pass
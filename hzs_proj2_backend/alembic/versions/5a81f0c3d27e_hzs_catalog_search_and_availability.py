@@ -0,0 +1,256 @@
+"""hzs catalog search and per-book availability
+
+Revision ID: 5a81f0c3d27e
+Revises: 0c5e2a7d41f3
+Create Date: 2026-10-18 11:10:00.000000
+
+Keyset pagination by topic, full-text/prefix search over books (GET /book/search) and
+the trigger-maintained hzs_book_availability counters. search_document is backfilled
+in batches and every index is built concurrently, so hzs_book stays writable.
+
+The counter triggers are committed before the counters are backfilled, so CREATE TRIGGER
+holds its locks on hzs_book_copy and hzs_rental only briefly. The backfill then recounts
+one range of books at a time with both tables share-locked for that range only.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import (
+    backfill_in_batches,
+    create_index_concurrently,
+    drop_index_concurrently,
+    lock_timeout,
+    run_in_key_ranges,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a81f0c3d27e'
+down_revision: Union[str, None] = '0c5e2a7d41f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION hzs_book_search_document(p_book_id NUMERIC, p_b_name VARCHAR, p_topic VARCHAR)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(p_b_name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(p_topic, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(string_agg(a.f_name || ' ' || a.l_name, ' '), '')), 'C')
+    FROM hzs_book_author ba
+    JOIN hzs_author a ON a.author_id = ba.author_id
+    WHERE ba.book_id = p_book_id;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION trg_hzs_book_search_func() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_document := hzs_book_search_document(NEW.book_id, NEW.b_name, NEW.topic);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_hzs_book_search
+BEFORE INSERT OR UPDATE OF b_name, topic ON hzs_book
+FOR EACH ROW
+EXECUTE FUNCTION trg_hzs_book_search_func();
+
+-- re-index a book when its author list or an author's name changes
+CREATE OR REPLACE FUNCTION trg_hzs_book_author_search_func() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'hzs_author' THEN
+        UPDATE hzs_book b
+        SET search_document = hzs_book_search_document(b.book_id, b.b_name, b.topic)
+        WHERE b.book_id IN (SELECT book_id FROM hzs_book_author WHERE author_id = NEW.author_id);
+    ELSE
+        UPDATE hzs_book b
+        SET search_document = hzs_book_search_document(b.book_id, b.b_name, b.topic)
+        WHERE b.book_id = CASE WHEN TG_OP = 'DELETE' THEN OLD.book_id ELSE NEW.book_id END;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_hzs_book_author_search
+AFTER INSERT OR DELETE ON hzs_book_author
+FOR EACH ROW
+EXECUTE FUNCTION trg_hzs_book_author_search_func();
+
+CREATE OR REPLACE TRIGGER trg_hzs_author_search
+AFTER UPDATE OF f_name, l_name ON hzs_author
+FOR EACH ROW
+EXECUTE FUNCTION trg_hzs_book_author_search_func();
+"""
+
+# per-book copy availability, kept current by triggers so readers never count copy rows
+AVAILABILITY_TABLE = """
+CREATE TABLE hzs_book_availability (
+    book_id   DECIMAL(20) PRIMARY KEY REFERENCES hzs_book (book_id) ON DELETE CASCADE,
+    total     INTEGER NOT NULL DEFAULT 0,
+    available INTEGER NOT NULL DEFAULT 0,
+    on_loan   INTEGER NOT NULL DEFAULT 0,
+    late      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION hzs_book_availability_adjust(
+    p_book_id NUMERIC, p_total INTEGER, p_available INTEGER, p_on_loan INTEGER, p_late INTEGER
+) RETURNS void AS $$
+    -- selecting from hzs_book skips books deleted earlier in the same statement
+    INSERT INTO hzs_book_availability AS a (book_id, total, available, on_loan, late)
+    SELECT book_id, p_total, p_available, p_on_loan, p_late
+    FROM hzs_book
+    WHERE book_id = p_book_id
+    ON CONFLICT (book_id) DO UPDATE
+    SET total = a.total + EXCLUDED.total,
+        available = a.available + EXCLUDED.available,
+        on_loan = a.on_loan + EXCLUDED.on_loan,
+        late = a.late + EXCLUDED.late;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION trg_hzs_book_copy_availability_func() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.book_id IS NOT NULL THEN
+        PERFORM hzs_book_availability_adjust(
+            OLD.book_id, -1, -(OLD.status = 'AVAILABLE')::int, 0, 0
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.book_id IS NOT NULL THEN
+        PERFORM hzs_book_availability_adjust(
+            NEW.book_id, 1, (NEW.status = 'AVAILABLE')::int, 0, 0
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_hzs_book_copy_availability
+AFTER INSERT OR DELETE OR UPDATE OF status, book_id ON hzs_book_copy
+FOR EACH ROW
+EXECUTE FUNCTION trg_hzs_book_copy_availability_func();
+
+-- a rental counts as on loan until it has an actual_return_date; open LATE rentals are also late
+CREATE OR REPLACE FUNCTION trg_hzs_rental_availability_func() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.copy_id = NEW.copy_id
+       AND (OLD.actual_return_date IS NULL) = (NEW.actual_return_date IS NULL)
+       AND (OLD.rental_status = 'LATE') = (NEW.rental_status = 'LATE') THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.actual_return_date IS NULL THEN
+        PERFORM hzs_book_availability_adjust(
+            c.book_id, 0, 0, -1, -(OLD.rental_status = 'LATE')::int
+        )
+        FROM hzs_book_copy c
+        WHERE c.copy_id = OLD.copy_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.actual_return_date IS NULL THEN
+        PERFORM hzs_book_availability_adjust(
+            c.book_id, 0, 0, 1, (NEW.rental_status = 'LATE')::int
+        )
+        FROM hzs_book_copy c
+        WHERE c.copy_id = NEW.copy_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_hzs_rental_availability
+AFTER INSERT OR DELETE OR UPDATE OF rental_status, actual_return_date, copy_id ON hzs_rental
+FOR EACH ROW
+EXECUTE FUNCTION trg_hzs_rental_availability_func();
+"""
+
+# counters of one range of books. The triggers may already have started a counter from
+# the writes since they were committed; with writes paused for the range, the recount is
+# exact and replaces it.
+AVAILABILITY_BACKFILL = """
+INSERT INTO hzs_book_availability (book_id, total, available, on_loan, late)
+SELECT b.book_id,
+       coalesce(c.total, 0),
+       coalesce(c.available, 0),
+       coalesce(r.on_loan, 0),
+       coalesce(r.late, 0)
+FROM hzs_book b
+LEFT JOIN (
+    SELECT book_id,
+           count(*) AS total,
+           count(*) FILTER (WHERE status = 'AVAILABLE') AS available
+    FROM hzs_book_copy
+    WHERE book_id > {after} AND book_id <= {until}
+    GROUP BY book_id
+) c ON c.book_id = b.book_id
+LEFT JOIN (
+    SELECT bc.book_id,
+           count(*) AS on_loan,
+           count(*) FILTER (WHERE r.rental_status = 'LATE') AS late
+    FROM hzs_rental r
+    JOIN hzs_book_copy bc ON bc.copy_id = r.copy_id
+    WHERE r.actual_return_date IS NULL
+      AND bc.book_id > {after} AND bc.book_id <= {until}
+    GROUP BY bc.book_id
+) r ON r.book_id = b.book_id
+WHERE b.book_id > {after} AND b.book_id <= {until}
+ON CONFLICT (book_id) DO UPDATE
+SET total = EXCLUDED.total,
+    available = EXCLUDED.available,
+    on_loan = EXCLUDED.on_loan,
+    late = EXCLUDED.late
+"""
+
+# the per-range counts look copies and rentals up by these (also listed in b7d3c2a91e40)
+BACKFILL_INDEXES = [
+    ('hzs_book_copy_book_id_idx', 'hzs_book_copy', 'book_id'),
+    ('hzs_rental_copy_id_idx', 'hzs_rental', 'copy_id'),
+]
+
+
+def upgrade() -> None:
+    lock_timeout()
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("ALTER TABLE hzs_book ADD COLUMN search_document tsvector")
+    op.execute(SEARCH_FUNCTIONS)
+    op.execute(AVAILABILITY_TABLE)
+
+    # the first autocommit block commits the triggers above
+    for name, table, columns in BACKFILL_INDEXES:
+        create_index_concurrently(name, table, columns)
+    run_in_key_ranges(AVAILABILITY_BACKFILL, 'hzs_book', 'book_id', share_lock=('hzs_book_copy', 'hzs_rental'))
+
+    # keyset pagination of GET /book/ filtered by topic
+    create_index_concurrently('hzs_book_topic_book_id_idx', 'hzs_book', 'topic, book_id')
+
+    # books written from here on are indexed by trg_hzs_book_search
+    backfill_in_batches(
+        'hzs_book',
+        "search_document = hzs_book_search_document(t.book_id, t.b_name, t.topic)",
+        key='book_id',
+    )
+    create_index_concurrently('hzs_book_search_document_idx', 'hzs_book', 'search_document', using='gin')
+    create_index_concurrently('hzs_book_b_name_trgm_idx', 'hzs_book', 'b_name gin_trgm_ops', using='gin')
+
+
+def downgrade() -> None:
+    drop_index_concurrently('hzs_book_b_name_trgm_idx')
+    drop_index_concurrently('hzs_book_search_document_idx')
+    drop_index_concurrently('hzs_book_topic_book_id_idx')
+    for name, _, _ in reversed(BACKFILL_INDEXES):
+        drop_index_concurrently(name)
+
+    lock_timeout()
+    op.execute("DROP TRIGGER IF EXISTS trg_hzs_rental_availability ON hzs_rental")
+    op.execute("DROP TRIGGER IF EXISTS trg_hzs_book_copy_availability ON hzs_book_copy")
+    op.execute("DROP FUNCTION IF EXISTS trg_hzs_rental_availability_func()")
+    op.execute("DROP FUNCTION IF EXISTS trg_hzs_book_copy_availability_func()")
+    op.execute("DROP FUNCTION IF EXISTS hzs_book_availability_adjust(NUMERIC, INTEGER, INTEGER, INTEGER, INTEGER)")
+    op.execute("DROP TABLE IF EXISTS hzs_book_availability")
+
+    op.execute("DROP TRIGGER IF EXISTS trg_hzs_author_search ON hzs_author")
+    op.execute("DROP TRIGGER IF EXISTS trg_hzs_book_author_search ON hzs_book_author")
+    op.execute("DROP TRIGGER IF EXISTS trg_hzs_book_search ON hzs_book")
+    op.execute("DROP FUNCTION IF EXISTS trg_hzs_book_author_search_func()")
+    op.execute("DROP FUNCTION IF EXISTS trg_hzs_book_search_func()")
+    op.execute("DROP FUNCTION IF EXISTS hzs_book_search_document(NUMERIC, VARCHAR, VARCHAR)")
+    op.execute("ALTER TABLE hzs_book DROP COLUMN IF EXISTS search_document")
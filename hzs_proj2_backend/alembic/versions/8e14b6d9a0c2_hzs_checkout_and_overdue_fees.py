@@ -0,0 +1,135 @@
+"""hzs copy checkout and overdue late fees
+
+Revision ID: 8e14b6d9a0c2
+Revises: 5a81f0c3d27e
+Create Date: 2026-10-18 11:20:00.000000
+
+One open rental per copy (POST /rental/checkout), a cheap path to a book's free copies,
+and the LATE_FEE invoices written by the overdue job (app/overdue.py).
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import (
+    add_check_not_valid,
+    create_index_concurrently,
+    drop_index_concurrently,
+    lock_timeout,
+    validate_constraint,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e14b6d9a0c2'
+down_revision: Union[str, None] = '5a81f0c3d27e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# the final invoice on return no longer bills late days already invoiced by the overdue job
+GENERATE_INVOICE_FUNC = """
+CREATE OR REPLACE FUNCTION trg_generate_invoice_func() RETURNS TRIGGER AS $$
+DECLARE
+    v_days_borrowed NUMERIC;
+    v_days_late NUMERIC;
+    v_invoice_amount NUMERIC;
+    v_late_fees_invoiced NUMERIC;
+BEGIN
+    IF NEW.ACTUAL_RETURN_DATE IS NOT NULL THEN
+        v_days_borrowed := EXTRACT(DAY FROM (NEW.ACTUAL_RETURN_DATE - NEW.BORROW_DATE));
+
+        IF NEW.ACTUAL_RETURN_DATE <= NEW.EXPECTED_RETURN_DATE THEN
+            v_invoice_amount := v_days_borrowed * 0.2;
+        ELSE
+            v_days_borrowed := EXTRACT(DAY FROM (NEW.EXPECTED_RETURN_DATE - NEW.BORROW_DATE));
+            v_days_late := EXTRACT(DAY FROM (NEW.ACTUAL_RETURN_DATE - NEW.EXPECTED_RETURN_DATE));
+            v_invoice_amount := (v_days_borrowed * 0.2) + (v_days_late * 0.4);
+        END IF;
+
+        SELECT coalesce(sum(INVOIC__AMOUNT), 0) INTO v_late_fees_invoiced
+        FROM HZS_INVOICE
+        WHERE RENTAL_ID = NEW.RENTAL_ID AND INVOICE_TYPE = 'LATE_FEE';
+        v_invoice_amount := GREATEST(v_invoice_amount - v_late_fees_invoiced, 0);
+
+        INSERT INTO HZS_INVOICE (INVOICE_ID, RENTAL_ID, INVOICE_DATE, INVOIC__AMOUNT)
+        VALUES (nextval('seq_invoice_id'), NEW.RENTAL_ID, CURRENT_TIMESTAMP, v_invoice_amount);
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ORIGINAL_GENERATE_INVOICE_FUNC = """
+CREATE OR REPLACE FUNCTION trg_generate_invoice_func() RETURNS TRIGGER AS $$
+DECLARE
+    v_days_borrowed NUMERIC;
+    v_days_late NUMERIC;
+    v_invoice_amount NUMERIC;
+BEGIN
+    IF NEW.ACTUAL_RETURN_DATE IS NOT NULL THEN
+        v_days_borrowed := EXTRACT(DAY FROM (NEW.ACTUAL_RETURN_DATE - NEW.BORROW_DATE));
+
+        IF NEW.ACTUAL_RETURN_DATE <= NEW.EXPECTED_RETURN_DATE THEN
+            v_invoice_amount := v_days_borrowed * 0.2;
+        ELSE
+            v_days_borrowed := EXTRACT(DAY FROM (NEW.EXPECTED_RETURN_DATE - NEW.BORROW_DATE));
+            v_days_late := EXTRACT(DAY FROM (NEW.ACTUAL_RETURN_DATE - NEW.EXPECTED_RETURN_DATE));
+            v_invoice_amount := (v_days_borrowed * 0.2) + (v_days_late * 0.4);
+        END IF;
+
+        INSERT INTO HZS_INVOICE (INVOICE_ID, RENTAL_ID, INVOICE_DATE, INVOIC__AMOUNT)
+        VALUES (nextval('seq_invoice_id'), NEW.RENTAL_ID, CURRENT_TIMESTAMP, v_invoice_amount);
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    # unique_rental (copy_id, rental_status) also rejected a copy's second RETURNED rental;
+    # the partial index replaces it, and is built before the constraint goes away
+    create_index_concurrently(
+        'hzs_rental_open_copy_uidx', 'hzs_rental', 'copy_id', unique=True,
+        where='actual_return_date IS NULL',
+    )
+    create_index_concurrently(
+        'hzs_book_copy_available_idx', 'hzs_book_copy', 'book_id, copy_id',
+        where="status = 'AVAILABLE'",
+    )
+    create_index_concurrently(
+        'hzs_rental_open_due_idx', 'hzs_rental', 'expected_return_date, rental_id',
+        where='actual_return_date IS NULL',
+    )
+
+    lock_timeout()
+    op.execute("ALTER TABLE hzs_rental DROP CONSTRAINT IF EXISTS unique_rental")
+    # a constant default does not rewrite the table; the CHECK is validated without blocking writes
+    op.execute("ALTER TABLE hzs_invoice ADD COLUMN invoice_type VARCHAR(10) NOT NULL DEFAULT 'RENTAL'")
+    add_check_not_valid('hzs_invoice', 'ck_invoice_type', "invoice_type IN ('RENTAL', 'LATE_FEE')")
+    op.execute(GENERATE_INVOICE_FUNC)
+    validate_constraint('hzs_invoice', 'ck_invoice_type')
+
+    # one running late-fee invoice per rental, so re-running the job updates instead of duplicating
+    create_index_concurrently(
+        'hzs_invoice_late_fee_uidx', 'hzs_invoice', 'rental_id', unique=True,
+        where="invoice_type = 'LATE_FEE'",
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently('hzs_invoice_late_fee_uidx')
+
+    lock_timeout()
+    op.execute(ORIGINAL_GENERATE_INVOICE_FUNC)
+    op.execute("ALTER TABLE hzs_invoice DROP COLUMN IF EXISTS invoice_type")
+    op.execute("ALTER TABLE hzs_rental ADD CONSTRAINT unique_rental UNIQUE (copy_id, rental_status)")
+
+    drop_index_concurrently('hzs_rental_open_due_idx')
+    drop_index_concurrently('hzs_book_copy_available_idx')
+    drop_index_concurrently('hzs_rental_open_copy_uidx')
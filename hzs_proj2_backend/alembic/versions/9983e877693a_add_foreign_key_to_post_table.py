@@ -1,31 +0,0 @@
-"""add foreign key to post table
-
-Revision ID: 9983e877693a
-Revises: 39c2e34bc2ed
-Create Date: 2025-02-23 17:36:32.142584
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '9983e877693a'
-down_revision: Union[str, None] = '39c2e34bc2ed'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    op.add_column('posts', sa.Column('owner_id', sa.Integer, nullable=False))
-    op.create_foreign_key('posts_users_fk', source_table='posts', referent_table='users',
-                          local_cols=['owner_id'], remote_cols=['id'], ondelete='CASCADE')
-    pass
-
-
-def downgrade() -> None:
-    op.drop_constraint('posts_users_fk', table_name='posts')
-    op.drop_column('posts', 'owner_id')
-    pass
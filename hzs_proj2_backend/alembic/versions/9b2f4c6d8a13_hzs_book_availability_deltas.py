@@ -0,0 +1,103 @@
+"""hzs insert-only book availability deltas
+
+Revision ID: 9b2f4c6d8a13
+Revises: 3c9d5e7f2a14
+Create Date: 2026-10-18 16:40:00.000000
+
+The availability triggers from 5a81f0c3d27e upserted the book's hzs_book_availability row
+on every checkout and return, so concurrent borrowers of one title queued on that row's
+lock until the previous borrower committed. The triggers now insert a delta row instead,
+which no other transaction ever locks; app/availability.py folds the deltas into the
+counters in the background and readers add the deltas that are not folded yet.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import lock_timeout
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f4c6d8a13'
+down_revision: Union[str, None] = '3c9d5e7f2a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# no foreign key: its check would lock the hzs_book row; deltas of deleted books are dropped when folded
+DELTA_TABLE = """
+CREATE TABLE hzs_book_availability_delta (
+    book_id   DECIMAL(20) NOT NULL,
+    total     INTEGER NOT NULL DEFAULT 0,
+    available INTEGER NOT NULL DEFAULT 0,
+    on_loan   INTEGER NOT NULL DEFAULT 0,
+    late      INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# same signature as before, so the copy and rental triggers pick it up unchanged
+DELTA_ADJUST_FUNCTION = """
+CREATE OR REPLACE FUNCTION hzs_book_availability_adjust(
+    p_book_id NUMERIC, p_total INTEGER, p_available INTEGER, p_on_loan INTEGER, p_late INTEGER
+) RETURNS void AS $$
+    -- selecting from hzs_book skips books deleted earlier in the same statement
+    INSERT INTO hzs_book_availability_delta (book_id, total, available, on_loan, late)
+    SELECT book_id, p_total, p_available, p_on_loan, p_late
+    FROM hzs_book
+    WHERE book_id = p_book_id;
+$$ LANGUAGE sql
+"""
+
+UPSERT_ADJUST_FUNCTION = """
+CREATE OR REPLACE FUNCTION hzs_book_availability_adjust(
+    p_book_id NUMERIC, p_total INTEGER, p_available INTEGER, p_on_loan INTEGER, p_late INTEGER
+) RETURNS void AS $$
+    -- selecting from hzs_book skips books deleted earlier in the same statement
+    INSERT INTO hzs_book_availability AS a (book_id, total, available, on_loan, late)
+    SELECT book_id, p_total, p_available, p_on_loan, p_late
+    FROM hzs_book
+    WHERE book_id = p_book_id
+    ON CONFLICT (book_id) DO UPDATE
+    SET total = a.total + EXCLUDED.total,
+        available = a.available + EXCLUDED.available,
+        on_loan = a.on_loan + EXCLUDED.on_loan,
+        late = a.late + EXCLUDED.late;
+$$ LANGUAGE sql
+"""
+
+FOLD_ALL_DELTAS = """
+WITH moved AS (
+    DELETE FROM hzs_book_availability_delta
+    RETURNING book_id, total, available, on_loan, late
+)
+INSERT INTO hzs_book_availability AS a (book_id, total, available, on_loan, late)
+SELECT m.book_id, sum(m.total), sum(m.available), sum(m.on_loan), sum(m.late)
+FROM moved m
+JOIN hzs_book b ON b.book_id = m.book_id
+GROUP BY m.book_id
+ON CONFLICT (book_id) DO UPDATE
+SET total = a.total + EXCLUDED.total,
+    available = a.available + EXCLUDED.available,
+    on_loan = a.on_loan + EXCLUDED.on_loan,
+    late = a.late + EXCLUDED.late
+"""
+
+
+def upgrade() -> None:
+    lock_timeout()
+    op.execute(DELTA_TABLE)
+    # readers sum a book's pending deltas; the table is new, so no need to build it concurrently
+    op.execute("CREATE INDEX hzs_book_availability_delta_book_idx ON hzs_book_availability_delta (book_id)")
+    op.execute(DELTA_ADJUST_FUNCTION)
+
+
+def downgrade() -> None:
+    lock_timeout()
+    # waits for open checkouts to commit their deltas and holds off new ones until the
+    # counters are written directly again
+    op.execute("LOCK TABLE hzs_book_availability_delta IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(UPSERT_ADJUST_FUNCTION)
+    op.execute(FOLD_ALL_DELTAS)
+    op.execute("DROP TABLE hzs_book_availability_delta")
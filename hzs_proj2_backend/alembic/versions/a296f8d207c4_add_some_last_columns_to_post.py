@@ -1,30 +0,0 @@
-"""add some last columns to post
-
-Revision ID: a296f8d207c4
-Revises: 9983e877693a
-Create Date: 2025-02-23 17:41:10.186869
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'a296f8d207c4'
-down_revision: Union[str, None] = '9983e877693a'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    op.add_column('posts', sa.Column('published', sa.Boolean, nullable=False, server_default='TRUE'))
-    op.add_column('posts', sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text('NOW()')))
-    pass
-
-
-def downgrade() -> None:
-    op.drop_column('posts', 'published')
-    op.drop_column('posts', 'created_at')
-    pass
@@ -0,0 +1,47 @@
+"""hzs secondary indexes on foreign-key and filter columns
+
+Revision ID: b7d3c2a91e40
+Revises: 8e14b6d9a0c2
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3c2a91e40'
+down_revision: Union[str, None] = '8e14b6d9a0c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) for every column the routers filter or join on. Room
+# schedule lookups use the GiST index of hzs_room_reservation_no_overlap (d42f7a9c1e58).
+INDEXES = [
+    ('hzs_rental_customer_id_idx', 'hzs_rental', 'customer_id'),
+    ('hzs_rental_copy_id_idx', 'hzs_rental', 'copy_id'),
+    ('hzs_book_copy_book_id_idx', 'hzs_book_copy', 'book_id'),
+    ('hzs_book_author_book_id_idx', 'hzs_book_author', 'book_id'),
+    ('hzs_customer_email_idx', 'hzs_customer', 'email'),
+    ('hzs_room_reservation_customer_id_idx', 'hzs_room_reservation', 'customer_id'),
+    ('hzs_invoice_rental_id_idx', 'hzs_invoice', 'rental_id'),
+    ('hzs_payment_invoice_id_idx', 'hzs_payment', 'invoice_id'),
+    ('hzs_exhibition_access_event_id_idx', 'hzs_exhibition_access', 'event_id'),
+    ('hzs_seminar_access_event_id_idx', 'hzs_seminar_access', 'event_id'),
+    ('hzs_seminar_sponsor_sponsor_id_idx', 'hzs_seminar_sponsor', 'sponsor_id'),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_concurrently(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(INDEXES):
+        drop_index_concurrently(name)
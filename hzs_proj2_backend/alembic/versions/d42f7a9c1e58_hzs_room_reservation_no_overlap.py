@@ -0,0 +1,55 @@
+"""hzs room reservations may not overlap
+
+Revision ID: d42f7a9c1e58
+Revises: b7d3c2a91e40
+Create Date: 2026-10-18 12:00:00.000000
+
+Reservations of the same room whose [start_time, end_time) ranges overlap are rejected
+by an exclusion constraint, so concurrent bookings cannot both succeed. The constraint
+cannot be added while overlapping reservations exist; resolve those first.
+
+Requires PostgreSQL 14+ (range_agg over the constraint's ranges) and the btree_gist
+extension. Exclusion constraints cannot be built concurrently: ADD CONSTRAINT holds an
+ACCESS EXCLUSIVE lock on hzs_room_reservation while it builds the GiST index, so reads
+and writes of reservations wait for the build (lock_timeout only bounds the wait for the
+lock). The range is an expression of the constraint rather than a stored column, so at
+least the table is not rewritten; on a large table, run it in a quiet period.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import add_check_not_valid, lock_timeout, validate_constraint
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd42f7a9c1e58'
+down_revision: Union[str, None] = 'b7d3c2a91e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # btree_gist provides the gist operator class for the room_id equality
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    lock_timeout()
+    # tsrange() rejects an end before the start, so existing rows are checked first
+    add_check_not_valid('hzs_room_reservation', 'ck_room_reservation_times', "end_time > start_time")
+    validate_constraint('hzs_room_reservation', 'ck_room_reservation_times')
+    # queries filter on the same tsrange() expression, so they use the constraint's index
+    op.execute("""
+        ALTER TABLE hzs_room_reservation
+        ADD CONSTRAINT hzs_room_reservation_no_overlap
+            EXCLUDE USING gist (room_id WITH =, tsrange(start_time, end_time, '[)') WITH &&)
+    """)
+
+
+def downgrade() -> None:
+    lock_timeout()
+    op.execute("ALTER TABLE hzs_room_reservation DROP CONSTRAINT IF EXISTS hzs_room_reservation_no_overlap")
+    # added by earlier versions of this revision
+    op.execute("ALTER TABLE hzs_room_reservation DROP COLUMN IF EXISTS reserved_during")
+    op.execute("ALTER TABLE hzs_room_reservation DROP CONSTRAINT IF EXISTS ck_room_reservation_times")
@@ -0,0 +1,34 @@
+"""hzs drop the redundant room/date reservation index
+
+Revision ID: e8c1f4a7b352
+Revises: 9b2f4c6d8a13
+Create Date: 2026-10-18 17:10:00.000000
+
+b7d3c2a91e40 no longer creates hzs_room_reservation_room_date_idx (room_id, reserve_date,
+start_time); this drops it from databases that were migrated before that change. The GiST
+index behind hzs_room_reservation_no_overlap already serves the per-room lookups, so the
+btree only slowed down every reservation write.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c1f4a7b352'
+down_revision: Union[str, None] = '9b2f4c6d8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    drop_index_concurrently('hzs_room_reservation_room_date_idx')
+
+
+def downgrade() -> None:
+    # not recreated: b7d3c2a91e40 no longer creates it either
+    pass
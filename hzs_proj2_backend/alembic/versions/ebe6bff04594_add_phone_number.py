@@ -1,30 +0,0 @@
-"""add phone number
-
-Revision ID: ebe6bff04594
-Revises: 37d204dd67ac
-Create Date: 2025-02-23 17:49:43.725374
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'ebe6bff04594'
-down_revision: Union[str, None] = '37d204dd67ac'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('users', sa.Column('phone_number', sa.String(), nullable=True))
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_column('users', 'phone_number')
-    # ### end Alembic commands ###
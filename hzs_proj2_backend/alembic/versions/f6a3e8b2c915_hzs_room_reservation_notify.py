@@ -0,0 +1,53 @@
+"""hzs notify reservation changes for the in-memory index
+
+Revision ID: f6a3e8b2c915
+Revises: d42f7a9c1e58
+Create Date: 2026-10-18 12:30:00.000000
+
+Every committed insert, update or delete on hzs_room_reservation sends the reservation
+id on the hzs_room_reservation channel, which each API worker's reservation index
+(app/reservation_index.py) listens on.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a3e8b2c915'
+down_revision: Union[str, None] = 'd42f7a9c1e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NOTIFY_TRIGGER = """
+CREATE OR REPLACE FUNCTION trg_hzs_room_reservation_notify_func() RETURNS TRIGGER AS $$
+BEGIN
+    -- notifications are delivered on commit; identical ones in a transaction are merged
+    PERFORM pg_notify(
+        'hzs_room_reservation',
+        (CASE WHEN TG_OP = 'DELETE' THEN OLD.reservation_id ELSE NEW.reservation_id END)::text
+    );
+    IF TG_OP = 'UPDATE' AND OLD.reservation_id <> NEW.reservation_id THEN
+        PERFORM pg_notify('hzs_room_reservation', OLD.reservation_id::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_hzs_room_reservation_notify
+AFTER INSERT OR UPDATE OR DELETE ON hzs_room_reservation
+FOR EACH ROW
+EXECUTE FUNCTION trg_hzs_room_reservation_notify_func();
+"""
+
+
+def upgrade() -> None:
+    op.execute(NOTIFY_TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_hzs_room_reservation_notify ON hzs_room_reservation")
+    op.execute("DROP FUNCTION IF EXISTS trg_hzs_room_reservation_notify_func()")
@@ -0,0 +1,134 @@
+"""
+Folds pending availability deltas into the per-book counters.
+
+Checkouts, returns and copy changes do not update hzs_book_availability directly: their
+triggers insert a row into hzs_book_availability_delta (revision 9b2f4c6d8a13), so
+concurrent borrowers of the same title never wait on each other's counter row lock. This
+job moves the deltas into the counters, a batch per transaction; readers add whatever is
+still pending (book.GET_AVAILABILITY_BY_BOOKS_QUERY), so the numbers they see do not
+depend on how far behind the job is.
+
+Run it once from the command line with `python -m app.availability`, or let the API run it
+every AVAILABILITY_FOLD_INTERVAL seconds.
+"""
+from anyio import to_thread
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from . import database
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# SKIP LOCKED lets several workers fold at once; counters are updated in book_id order so
+# two folds never deadlock. Deltas of books deleted in the meantime are dropped.
+FOLD_DELTAS_QUERY = """
+    WITH moved AS (
+        DELETE FROM hzs_book_availability_delta
+        WHERE ctid = ANY(ARRAY(
+            SELECT ctid
+            FROM hzs_book_availability_delta
+            LIMIT %(batch_size)s
+            FOR UPDATE SKIP LOCKED
+        ))
+        RETURNING book_id, total, available, on_loan, late
+    ), folded AS (
+        INSERT INTO hzs_book_availability AS a (book_id, total, available, on_loan, late)
+        SELECT m.book_id, sum(m.total), sum(m.available), sum(m.on_loan), sum(m.late)
+        FROM moved m
+        JOIN hzs_book b ON b.book_id = m.book_id
+        GROUP BY m.book_id
+        ORDER BY m.book_id
+        ON CONFLICT (book_id) DO UPDATE
+        SET total = a.total + EXCLUDED.total,
+            available = a.available + EXCLUDED.available,
+            on_loan = a.on_loan + EXCLUDED.on_loan,
+            late = a.late + EXCLUDED.late
+        RETURNING a.book_id
+    )
+    SELECT (SELECT count(*) FROM moved) AS deltas,
+           (SELECT count(*) FROM folded) AS books
+"""
+
+_lock = threading.Lock()
+_stats = {
+    "runs": 0,
+    "deltas_folded": 0,
+    "last_run_at": None,
+    "last_run_deltas": 0,
+    "last_run_seconds": None,
+    "last_error": None,
+}
+
+
+def availability_stats():
+    with _lock:
+        return dict(_stats)
+
+
+def fold_availability(batch_size=None):
+    """Fold every pending delta into hzs_book_availability. Returns the number of deltas folded."""
+    batch_size = batch_size or settings.availability_fold_batch_size
+    started = time.time()
+    folded = 0
+    with _lock:
+        _stats["last_error"] = None
+    conn = database.pool.getconn()
+    cursor = conn.cursor()
+    try:
+        while True:
+            cursor.execute(FOLD_DELTAS_QUERY, {"batch_size": batch_size})
+            batch = cursor.fetchone()
+            conn.commit()
+            folded += batch["deltas"]
+            if batch["deltas"] < batch_size:
+                break
+    except Exception as error:
+        conn.rollback()
+        with _lock:
+            _stats["last_error"] = str(error)
+        logger.error(f"Availability fold failed: {error}")
+        raise
+    finally:
+        cursor.close()
+        database.pool.putconn(conn)
+        with _lock:
+            _stats.update(
+                runs=_stats["runs"] + 1,
+                deltas_folded=_stats["deltas_folded"] + folded,
+                last_run_at=started,
+                last_run_deltas=folded,
+                last_run_seconds=round(time.time() - started, 3),
+            )
+    if folded:
+        logger.debug(f"Folded {folded} availability deltas")
+    return folded
+
+
+async def run_periodically(interval):
+    """Fold the deltas every `interval` seconds on a worker thread, until cancelled."""
+    while True:
+        try:
+            await to_thread.run_sync(fold_availability)
+        except Exception:
+            # already logged and recorded in availability_stats(); retry on the next tick
+            pass
+        await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold pending book availability deltas into the counters.")
+    parser.add_argument("--batch-size", type=int, default=settings.availability_fold_batch_size,
+                        help="deltas folded per transaction")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        logger.info(f"Folded {fold_availability(args.batch_size)} availability deltas")
+    finally:
+        database.pool.close()
+
+
+if __name__ == "__main__":
+    main()
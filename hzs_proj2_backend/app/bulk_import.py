@@ -0,0 +1,189 @@
+"""
+Bulk loading of books, copies and book/author links from a CSV or NDJSON upload.
+
+Rows are validated while the upload is read and streamed straight into a temporary
+staging table with COPY; the real tables are then filled with a handful of set-based
+statements inside the caller's transaction. Every input row is accounted for: it is
+either imported or reported back with the reasons it was rejected.
+"""
+from pydantic import ValidationError
+import csv
+import io
+import json
+from . import schemas
+
+MAX_REPORTED_ERRORS = 1000
+
+CREATE_STAGING_TABLE_QUERY = """
+    CREATE TEMP TABLE hzs_book_import (
+        row_num    INTEGER PRIMARY KEY,
+        b_name     VARCHAR(50) NOT NULL,
+        topic      VARCHAR(20) NOT NULL,
+        copies     INTEGER NOT NULL,
+        author_ids NUMERIC[] NOT NULL,
+        book_id    NUMERIC
+    ) ON COMMIT DROP
+"""
+
+COPY_STAGING_QUERY = """
+    COPY hzs_book_import (row_num, b_name, topic, copies, author_ids) FROM STDIN
+"""
+
+UNKNOWN_AUTHORS_QUERY = """
+    SELECT s.row_num, array_agg(x.author_id ORDER BY x.author_id) AS author_ids
+    FROM hzs_book_import s
+    CROSS JOIN LATERAL unnest(s.author_ids) AS x(author_id)
+    WHERE NOT EXISTS (SELECT 1 FROM hzs_author a WHERE a.author_id = x.author_id)
+    GROUP BY s.row_num
+    ORDER BY s.row_num
+"""
+
+DELETE_STAGED_ROWS_QUERY = """
+    DELETE FROM hzs_book_import
+    WHERE row_num = ANY(%s)
+"""
+
+ALLOCATE_BOOK_IDS_QUERY = """
+    UPDATE hzs_book_import
+    SET book_id = nextval('hzs_book_id_seq')
+"""
+
+INSERT_BOOKS_QUERY = """
+    INSERT INTO hzs_book (book_id, b_name, topic)
+    SELECT book_id, b_name, topic
+    FROM hzs_book_import
+    ORDER BY row_num
+"""
+
+INSERT_BOOK_AUTHORS_QUERY = """
+    INSERT INTO hzs_book_author (book_id, author_id)
+    SELECT DISTINCT s.book_id, x.author_id
+    FROM hzs_book_import s
+    CROSS JOIN LATERAL unnest(s.author_ids) AS x(author_id)
+"""
+
+INSERT_BOOK_COPIES_QUERY = """
+    INSERT INTO hzs_book_copy (book_id, status)
+    SELECT s.book_id, 'AVAILABLE'
+    FROM hzs_book_import s
+    CROSS JOIN LATERAL generate_series(1, s.copies)
+    ORDER BY s.row_num
+"""
+
+
+def _copy_text(value):
+    """Escape a value for COPY's text format."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _LineStream(io.RawIOBase):
+    """Minimal file object over an iterator of text lines, as consumed by copy_expert."""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line.encode("utf-8")
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _csv_records(upload):
+    """Yield (row number, record) pairs; rows are numbered from 1, after the header."""
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    try:
+        for row_num, record in enumerate(csv.DictReader(text), start=1):
+            author_ids = (record.get("author_ids") or "").replace(",", ";")
+            yield row_num, {
+                "b_name": record.get("b_name"),
+                "topic": record.get("topic") or None,
+                "copies": record.get("copies") or 0,
+                "author_ids": [part.strip() for part in author_ids.split(";") if part.strip()],
+            }
+    finally:
+        text.detach()
+
+
+def _ndjson_records(upload):
+    """Yield (line number, record) pairs, skipping blank lines."""
+    for row_num, line in enumerate(upload, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_num, json.loads(line)
+        except ValueError as error:
+            yield row_num, error
+
+
+def import_books(cursor, upload, fmt):
+    """Load every valid row of `upload` and return a schemas.BookImportResult-shaped dict."""
+    records = _csv_records(upload) if fmt == "csv" else _ndjson_records(upload)
+    errors = []
+    rejected = 0
+
+    def reject(row_num, messages):
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_num, "errors": messages})
+
+    def staged_lines():
+        for row_num, record in records:
+            if isinstance(record, Exception):
+                reject(row_num, [f"invalid JSON: {record}"])
+                continue
+            try:
+                row = schemas.BookImportRow.model_validate(record)
+            except ValidationError as error:
+                reject(row_num, [
+                    ": ".join(filter(None, (".".join(str(part) for part in e["loc"]), e["msg"])))
+                    for e in error.errors()
+                ])
+                continue
+            author_ids = "{" + ",".join(str(author_id) for author_id in row.author_ids) + "}"
+            yield "\t".join((
+                str(row_num), _copy_text(row.b_name), _copy_text(row.topic), str(row.copies), author_ids
+            )) + "\n"
+
+    cursor.execute(CREATE_STAGING_TABLE_QUERY)
+    cursor.copy_expert(COPY_STAGING_QUERY, _LineStream(staged_lines()))
+
+    cursor.execute(UNKNOWN_AUTHORS_QUERY)
+    unknown = cursor.fetchall()
+    for row in unknown:
+        reject(row["row_num"], [f"author_ids: unknown author id(s) {', '.join(str(a) for a in row['author_ids'])}"])
+    if unknown:
+        cursor.execute(DELETE_STAGED_ROWS_QUERY, ([row["row_num"] for row in unknown],))
+    errors.sort(key=lambda error: error["row"])
+
+    cursor.execute(ALLOCATE_BOOK_IDS_QUERY)
+    cursor.execute(INSERT_BOOKS_QUERY)
+    books_created = cursor.rowcount
+    cursor.execute(INSERT_BOOK_AUTHORS_QUERY)
+    author_links_created = cursor.rowcount
+    cursor.execute(INSERT_BOOK_COPIES_QUERY)
+    copies_created = cursor.rowcount
+
+    return {
+        "books_created": books_created,
+        "copies_created": copies_created,
+        "author_links_created": author_links_created,
+        "rejected_rows": rejected,
+        "errors": errors,
+    }
@@ -10,6 +10,50 @@ class Settings(BaseSettings):
     algorithm: str
     access_token_expire_minutes: int
 
+    # connection pool (app/database.py)
+    db_pool_min_size: int = 2
+    db_pool_max_size: int = 20
+    db_pool_max_lifetime: int = 1800  # seconds, 0 disables recycling
+    db_pool_timeout: float = 10.0  # seconds to wait for a free connection
+    db_pool_check_on_checkout: bool = True
+    # PREPARE the routers' *_QUERY constants on every pooled connection (app/statements.py)
+    prepared_statements_enabled: bool = True
+
+    # authenticated user lookups cached by oauth2.get_current_user
+    user_cache_max_size: int = 10000
+    user_cache_ttl: int = 60  # seconds
+
+    # verified JWTs cached by oauth2.verify_access_token until they expire
+    token_cache_max_size: int = 10000
+
+    # bcrypt hashing/verification pool (app/utils.py)
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 200
+
+    # rows fetched per round trip by the streaming export endpoints
+    export_batch_size: int = 2000
+
+    # overdue rental sweep (app/overdue.py)
+    overdue_batch_size: int = 5000  # rentals per transaction
+    overdue_job_interval: int = 0  # seconds between in-process runs, 0 disables
+
+    # folding of book availability deltas into the counters (app/availability.py)
+    availability_fold_interval: float = 5.0  # seconds between in-process runs, 0 disables
+    availability_fold_batch_size: int = 10000  # deltas per transaction
+
+    # per-worker room reservation index (app/reservation_index.py)
+    reservation_index_enabled: bool = True
+    reservation_index_retry_interval: float = 5.0  # seconds before reconnecting the listener
+    reservation_index_retention_days: int = 30  # reservations that ended earlier are read from the database
+
+    # cached GET responses of read-mostly endpoints (app/response_cache.py)
+    response_cache_max_size: int = 1000
+    response_cache_ttl: int = 300  # seconds
+    response_cache_redis_url: str = ""  # e.g. redis://localhost:6379/0, empty keeps entries in-process
+
+    # author, sponsor and customer rental lists built as JSON by PostgreSQL (app/fast_json.py)
+    postgres_json_lists: bool = False
+
     class Config:
         env_file = ".env"
     
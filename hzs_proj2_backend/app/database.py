@@ -1,21 +1,357 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.extensions
+from collections import deque
+from contextlib import asynccontextmanager
+from anyio import CapacityLimiter, to_thread
+import logging
 import os
+import threading
+import time
+from . import statements
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL") or f"postgresql://{settings.database_username}:{settings.database_password}" \
                                             f"@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
 
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out before the pool timeout."""
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection that remembers when it was opened, so the pool can retire it,
+    and which registered statements are prepared on it (app/statements.py).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.prepared_statements = frozenset()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of long-lived psycopg2 connections.
+
+    Connections are created lazily up to max_size. When every connection is in use,
+    callers wait up to `timeout` seconds for one to be returned before PoolTimeout
+    is raised. Connections older than max_lifetime are closed instead of being
+    reused, and every checkout can be preceded by a cheap `SELECT 1` health check.
+    """
+
+    def __init__(self, dsn, min_size, max_size, max_lifetime, timeout, check_on_checkout=True):
+        if min_size > max_size:
+            raise ValueError("min_size cannot be larger than max_size")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_on_checkout = check_on_checkout
+
+        self._idle = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "checkouts": 0,
+            "exhausted": 0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "failed_health_checks": 0,
+            "max_waiting": 0,
+            "wait_time_total": 0.0,
+        }
+
+    def _connect(self):
+        conn = psycopg2.connect(
+            self.dsn, connection_factory=PooledConnection, cursor_factory=statements.PreparedCursor
+        )
+        try:
+            statements.prepare(conn)
+        except psycopg2.Error:
+            conn.close()
+            raise
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _expired(self, conn):
+        return self.max_lifetime > 0 and time.monotonic() - conn.created_at > self.max_lifetime
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        if not self.check_on_checkout:
+            return True
+        try:
+            # autocommit keeps the probe to a single round trip (no BEGIN/ROLLBACK)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.autocommit = False
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def open(self):
+        """Pre-create min_size connections so the first requests do not pay the handshake."""
+        with self._cond:
+            self._closed = False
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+        created = []
+        try:
+            for _ in range(max(missing, 0)):
+                created.append(self._connect())
+        except psycopg2.Error as error:
+            logger.error(f"Could not pre-fill connection pool: {error}")
+            with self._cond:
+                self._size -= missing - len(created)
+        with self._cond:
+            self._idle.extend(created)
+            self._cond.notify_all()
+
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        started = time.monotonic()
+        waited = False
+
+        while True:
+            conn = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    if not waited:
+                        waited = True
+                        self._stats["exhausted"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Timed out after {timeout}s waiting for a database connection "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._waiting += 1
+                    self._stats["max_waiting"] = max(self._stats["max_waiting"], self._waiting)
+                    self._cond.wait(remaining)
+                    self._waiting -= 1
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif self._expired(conn):
+                with self._cond:
+                    self._stats["connections_recycled"] += 1
+                self._discard(conn)
+                continue
+            elif not self._healthy(conn):
+                with self._cond:
+                    self._stats["failed_health_checks"] += 1
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_time_total"] += time.monotonic() - started
+            return conn
+
+    def putconn(self, conn):
+        if conn.closed:
+            self._discard(conn)
+            return
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                self._discard(conn)
+                return
+        if self._closed or self._expired(conn):
+            if not self._closed:
+                with self._cond:
+                    self._stats["connections_recycled"] += 1
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                waiting=self._waiting,
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+        wait_total = stats.pop("wait_time_total")
+        stats["avg_checkout_ms"] = round(wait_total / stats["checkouts"] * 1000, 3) if stats["checkouts"] else 0.0
+        return stats
+
+
+pool = ConnectionPool(
+    DATABASE_URL,
+    min_size=settings.db_pool_min_size,
+    max_size=settings.db_pool_max_size,
+    max_lifetime=settings.db_pool_max_lifetime,
+    timeout=settings.db_pool_timeout,
+    check_on_checkout=settings.db_pool_check_on_checkout,
+)
+
+
 def get_db():
+    conn = pool.getconn()
+    cursor = conn.cursor()
     try:
-        conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
-        cursor = conn.cursor()
         yield cursor
         conn.commit()
-        print("Database connection is successful!")
     except Exception as error:
-        print("Database connection failed:", error)
+        logger.debug(f"Request failed, rolling back: {error}")
         raise
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        pool.putconn(conn)
+
+
+# Blocking psycopg2 calls made from async routes run on worker threads. Checkouts and
+# queries get separate limiters so requests waiting for a connection can never starve
+# the threads needed by requests that already hold one.
+_checkout_limiter = None
+_query_limiter = None
+
+
+def _limiters():
+    global _checkout_limiter, _query_limiter
+    if _query_limiter is None:
+        _checkout_limiter = CapacityLimiter(pool.max_size)
+        _query_limiter = CapacityLimiter(pool.max_size)
+    return _checkout_limiter, _query_limiter
+
+
+async def _run_query(func, *args):
+    return await to_thread.run_sync(func, *args, limiter=_limiters()[1])
+
+
+class AsyncConnection:
+    """Awaitable transaction control for the connection behind an AsyncCursor."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    async def commit(self):
+        await _run_query(self._conn.commit)
+
+    async def rollback(self):
+        await _run_query(self._conn.rollback)
+
+
+class AsyncCursor:
+    """
+    Awaitable facade over a pooled psycopg2 cursor for `async def` routes.
+
+    Routes on the blocking get_db cursor must stay plain `def`: FastAPI runs those on
+    its threadpool, while an `async def` route would block the event loop on every query.
+
+    execute() runs on a worker thread so a slow query never blocks the event loop.
+    Regular cursors buffer the whole result on execute, so fetching from them is
+    served directly; server-side (named) cursors fetch on a worker thread as well.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.connection = AsyncConnection(cursor.connection)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    async def execute(self, query, vars=None):
+        await _run_query(self._cursor.execute, query, vars)
+
+    async def executemany(self, query, vars_list):
+        await _run_query(self._cursor.executemany, query, vars_list)
+
+    async def fetchone(self):
+        if self._cursor.name is None:
+            return self._cursor.fetchone()
+        return await _run_query(self._cursor.fetchone)
+
+    async def fetchmany(self, size=None):
+        size = self._cursor.arraysize if size is None else size
+        if self._cursor.name is None:
+            return self._cursor.fetchmany(size)
+        return await _run_query(self._cursor.fetchmany, size)
+
+    async def fetchall(self):
+        if self._cursor.name is None:
+            return self._cursor.fetchall()
+        return await _run_query(self._cursor.fetchall)
+
+    async def run_sync(self, func, *args):
+        """Run func(cursor, *args) on a worker thread, for multi-statement blocking work."""
+        return await _run_query(func, self._cursor, *args)
+
+
+@asynccontextmanager
+async def async_cursor():
+    """Check out a pooled connection for a block of async code; commits on success."""
+    checkout_limiter, _ = _limiters()
+    conn = await to_thread.run_sync(pool.getconn, limiter=checkout_limiter)
+    cursor = conn.cursor()
+    try:
+        yield AsyncCursor(cursor)
+        await _run_query(conn.commit)
+    except Exception as error:
+        logger.debug(f"Request failed, rolling back: {error}")
+        raise
+    finally:
+        cursor.close()
+        await _run_query(pool.putconn, conn)
+
+
+async def get_async_db():
+    async with async_cursor() as cursor:
+        yield cursor
@@ -0,0 +1,84 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from fastapi.responses import StreamingResponse
+from uuid import uuid4
+import csv
+import io
+import json
+import psycopg2.extensions
+from . import database
+from .config import settings
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _batches(query, params):
+    """
+    Yield (column_names, rows) batches from a server-side cursor on its own pooled connection.
+
+    A named cursor keeps the result set in PostgreSQL and only transfers
+    export_batch_size rows at a time, so memory stays flat however big the table is.
+    The connection is owned by the generator because a StreamingResponse keeps
+    iterating after the request's dependencies have been torn down.
+    """
+    conn = database.pool.getconn()
+    try:
+        cursor = conn.cursor(name=f"export_{uuid4().hex}", cursor_factory=psycopg2.extensions.cursor)
+        try:
+            cursor.itersize = settings.export_batch_size
+            cursor.execute(query, params)
+            columns = None
+            while True:
+                rows = cursor.fetchmany(settings.export_batch_size)
+                if not rows:
+                    break
+                if columns is None:
+                    columns = [column.name for column in cursor.description]
+                yield columns, rows
+        finally:
+            cursor.close()
+    finally:
+        database.pool.putconn(conn)
+
+
+def _ndjson(query, params):
+    for columns, rows in _batches(query, params):
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+            for row in rows
+        )
+
+
+def _csv(query, params):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for columns, rows in _batches(query, params):
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def stream_export(query, params=None, fmt="ndjson", filename="export"):
+    """Stream the rows of `query` as NDJSON or CSV without materializing the result."""
+    rows = _csv(query, params) if fmt == "csv" else _ndjson(query, params)
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
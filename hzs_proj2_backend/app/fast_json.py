@@ -0,0 +1,99 @@
+"""
+Fast serialization for large list endpoints.
+
+A route returning a list normally builds a dict per RealDictRow, validates every dict
+against its response_model and then encodes the validated models; for thousands of rows
+that dominates the request's CPU time. Routes that opt in instead fetch their rows on a
+plain tuple cursor with fetch_trusted() and return TrustedJSONResponse, which encodes the
+rows with pydantic_core in one call and skips the response_model (FastAPI does not touch a
+returned Response; the model still documents the route).
+
+Nothing is validated on this path, so the query is the contract: it must select exactly
+the model's fields, cast to the types the model would produce (DECIMAL ids to int8,
+amounts to float8, dates the model declares as datetime to timestamp).
+fetch_trusted() checks the column names against the model.
+
+With POSTGRES_JSON_LISTS set, some list routes go one step further: fetch_json() has
+PostgreSQL aggregate the rows into a JSON array, which is passed through as the response
+body, so no per-row Python objects are created at all. The same column check applies
+(once per query), and int and float fields are cast so NUMERIC columns are emitted the
+way the model would serialize them.
+"""
+import types
+import typing
+from pydantic_core import to_json
+from starlette.responses import Response
+from .statements import PreparedTupleCursor
+
+# (query, model) pairs fetch_json() has checked
+_checked_queries = set()
+
+
+def _check_columns(columns, model):
+    if set(columns) != set(model.model_fields):
+        raise RuntimeError(
+            f"Query columns {sorted(columns)} do not match {model.__name__} fields {sorted(model.model_fields)}"
+        )
+
+
+class TrustedJSONResponse(Response):
+    """JSON response for content that already has the shape of the route's response_model."""
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return to_json(content)
+
+
+def fetch_trusted(cursor, query, params, model):
+    """
+    Run `query` on a tuple cursor of `cursor`'s connection and return its rows as dicts.
+
+    Takes the cursor first so async routes can call it through `db.run_sync()`.
+    """
+    with cursor.connection.cursor(cursor_factory=PreparedTupleCursor) as tuple_cursor:
+        tuple_cursor.execute(query, params)
+        columns = [column.name for column in tuple_cursor.description]
+        _check_columns(columns, model)
+        return [dict(zip(columns, row)) for row in tuple_cursor.fetchall()]
+
+
+class RawJSONResponse(Response):
+    """Response for a body that is already JSON text."""
+
+    media_type = "application/json"
+
+
+# json_build_object() writes NUMERIC as stored (1.50, 7.0); the model would emit 1.5 and 7
+_JSON_CASTS = {int: "::int8", float: "::float8"}
+
+
+def _json_value(name, field):
+    annotation = field.annotation
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        arguments = [argument for argument in typing.get_args(annotation) if argument is not type(None)]
+        annotation = arguments[0] if len(arguments) == 1 else None
+    return f"r.{name}{_JSON_CASTS.get(annotation, '')}"
+
+
+def json_list_query(query, model):
+    """Wrap `query` so it returns one text value: its rows as a JSON array of `model` objects."""
+    fields = ", ".join(f"'{name}', {_json_value(name, field)}" for name, field in model.model_fields.items())
+    return f"SELECT coalesce(json_agg(json_build_object({fields})), '[]')::text FROM ({query}) AS r"
+
+
+def fetch_json(cursor, query, params, model):
+    """
+    Run `query` with json_list_query() and return the JSON text.
+
+    The first call for a query checks its columns against the model with a LIMIT 0 run.
+    PostgreSQL formats the values: numbers and timestamps match the response_model
+    output, except that UTC timestamptz values end in +00:00 instead of Z.
+    """
+    with cursor.connection.cursor(cursor_factory=PreparedTupleCursor) as tuple_cursor:
+        if (query, model) not in _checked_queries:
+            tuple_cursor.execute(f"SELECT * FROM ({query}) AS r LIMIT 0", params)
+            _check_columns([column.name for column in tuple_cursor.description], model)
+            _checked_queries.add((query, model))
+        tuple_cursor.execute(json_list_query(query, model), params)
+        return tuple_cursor.fetchone()[0]
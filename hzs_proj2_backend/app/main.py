@@ -1,14 +1,50 @@
 from typing import Optional
-from fastapi import FastAPI, Depends
-from .routers import customer, auth, book, rental, seminars, exhibitions, seminar_sponsor, seminar_access, sponsor, exhibition_access, author, event, invoice, room, room_reservation
-from .database import get_db  
+from contextlib import asynccontextmanager, suppress
+import asyncio
+from fastapi import FastAPI, Depends, Request, status
+from fastapi.responses import JSONResponse
+from .routers import customer, auth, book, rental, seminars, exhibitions, seminar_sponsor, seminar_access, sponsor, exhibition_access, author, event, invoice, room, room_reservation, study_room
+from . import availability, database, oauth2, overdue, reservation_index, response_cache, row_versions, statements, utils
+from .config import settings
+from .database import get_async_db
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.pool.open()
+    overdue_task = None
+    if settings.overdue_job_interval > 0:
+        overdue_task = asyncio.create_task(overdue.run_periodically(settings.overdue_job_interval))
+    fold_task = None
+    if settings.availability_fold_interval > 0:
+        fold_task = asyncio.create_task(availability.run_periodically(settings.availability_fold_interval))
+    if settings.reservation_index_enabled:
+        reservation_index.start()
+    yield
+    if settings.reservation_index_enabled:
+        reservation_index.stop()
+    if overdue_task is not None:
+        overdue.request_stop()
+        overdue_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await overdue_task
+    if fold_task is not None:
+        fold_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await fold_task
+    database.pool.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
+# added before CORS so CORS wraps it and cached bodies never carry per-origin headers
+app.add_middleware(response_cache.ResponseCacheMiddleware)
+# outside the response cache, so a matching If-None-Match costs one version query only
+app.add_middleware(row_versions.RowVersionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -18,6 +54,22 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(database.PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: database.PoolTimeout):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "The database is busy, please retry shortly."}
+    )
+
+
+@app.exception_handler(utils.PasswordHashBusy)
+async def password_hash_busy_handler(request: Request, exc: utils.PasswordHashBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many sign-ins in progress, please retry shortly."}
+    )
+
+
 app.include_router(customer.router)
 
 app.include_router(auth.router)
@@ -48,6 +100,14 @@ app.include_router(room.router)
 
 app.include_router(room_reservation.router)
 
+app.include_router(study_room.router)
+
+# registered before the pool opens its first connection, which PREPAREs them
+statements.register_modules(
+    oauth2, customer, auth, book, rental, seminars, exhibitions, seminar_sponsor, seminar_access, sponsor,
+    exhibition_access, author, event, invoice, room, room_reservation, study_room,
+)
+
 
 @app.get('/')
 async def root():
@@ -55,10 +115,26 @@ async def root():
 
 
 
+@app.get('/metrics')
+async def metrics():
+    return {
+        "db_pool": database.pool.stats(),
+        "token_cache": oauth2.token_cache.stats(),
+        "user_cache": oauth2.user_cache.stats(),
+        "password_hashing": utils.hash_stats(),
+        "overdue_job": overdue.overdue_stats(),
+        "availability_fold": availability.availability_stats(),
+        "reservation_index": reservation_index.reservation_index.stats(),
+        "response_cache": response_cache.response_cache_stats(),
+        "row_versions": row_versions.row_version_stats(),
+        "statements": statements.statement_stats(),
+    }
+
+
 @app.get('/posts')
-async def get_posts(db=Depends(get_db)):
-    db.execute(""" SELECT * FROM posts """)
-    posts = db.fetchall()
+async def get_posts(db=Depends(get_async_db)):
+    await db.execute(""" SELECT * FROM posts """)
+    posts = await db.fetchall()
     print(posts)
     return {"data": posts}
 
@@ -1,9 +1,12 @@
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+import hashlib
+import time
 from . import database, schemas
 from fastapi import Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from .config import settings
+from .cache import TTLCache
 import logging
 
 logging.basicConfig(
@@ -18,6 +21,23 @@ SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
+GET_CURRENT_USER_QUERY = """
+    SELECT customer_id, role
+    FROM hzs_customer
+    WHERE customer_id = %s
+"""
+
+# sha256(token) -> TokenData, each entry living until the token's own exp
+token_cache = TTLCache(max_size=settings.token_cache_max_size, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# customer_id -> {"user_id", "role"}; see invalidate_user()
+user_cache = TTLCache(max_size=settings.user_cache_max_size, ttl=settings.user_cache_ttl)
+
+
+def invalidate_user(customer_id: int):
+    """Drop a cached user so the next request re-reads it; call after changing or deleting a customer."""
+    user_cache.invalidate(int(customer_id))
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -27,6 +47,11 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 def verify_access_token(token: str, credentials_exception):
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    token_data = token_cache.get(token_key)
+    if token_data is not None:
+        return token_data
+
     try:
         payload = jwt.decode(token, SECRET_KEY, [ALGORITHM])
         # logger.info(f"Decoded token payload: {payload}")  # Debugging log
@@ -38,11 +63,16 @@ def verify_access_token(token: str, credentials_exception):
     except JWTError as e:
         logger.error(f"JWT Error: {str(e)}")  # Log the error
         raise credentials_exception
-    
+
+    # jwt.decode already rejected expired tokens, so the signature stays valid until exp
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(token_key, token_data, ttl=exp - time.time())
+
     return token_data
 
 # Fetch the logged-in user
-def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(database.get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(database.get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -51,16 +81,31 @@ def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(database.ge
 
     token_data = verify_access_token(token, credentials_exception)
 
+    current_user = user_cache.get(token_data.id)
+    if current_user is not None:
+        return current_user
+
     # Query the user from the database
-    db.execute("""SELECT * FROM hzs_customer WHERE customer_id = %s""", (token_data.id,))
-    user = db.fetchone()
+    await db.execute(GET_CURRENT_USER_QUERY, (token_data.id,))
+    user = await db.fetchone()
 
     if not user:
         raise credentials_exception
 
-    logger.info(f"Current user: {user}")
-    return {"user_id": user['customer_id'], "role": user['role']}
-
-
+    logger.debug(f"Loaded current user {user['customer_id']}")
+    current_user = {"user_id": user['customer_id'], "role": user['role']}
+    user_cache.set(token_data.id, current_user)
+    return current_user
 
 
+async def user_for_token(token: str):
+    """
+    The user get_current_user() resolves for `token`, for code outside a route's
+    dependencies (response_cache); a connection is checked out on a user-cache miss only.
+    """
+    token_data = verify_access_token(token, HTTPException(status_code=status.HTTP_401_UNAUTHORIZED))
+    current_user = user_cache.get(token_data.id)
+    if current_user is not None:
+        return current_user
+    async with database.async_cursor() as db:
+        return await get_current_user(token, db)
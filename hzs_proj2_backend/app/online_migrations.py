@@ -0,0 +1,148 @@
+"""
+Helpers for Alembic revisions that must run against a live database.
+
+Large tables (hzs_rental in particular) cannot be locked for the length of an index build
+or a table-wide UPDATE. These helpers keep each migration step short or non-blocking:
+
+* lock_timeout() makes DDL give up instead of queueing behind long transactions (and
+  blocking every query that queues behind the DDL in turn);
+* create_index_concurrently() / drop_index_concurrently() build and drop indexes without
+  blocking writes;
+* add_check_not_valid() + validate_constraint() add a CHECK without a full-table scan
+  under an exclusive lock;
+* backfill_in_batches() rewrites rows in key order, one short transaction per batch;
+* run_in_key_ranges() does the same for any statement, e.g. an INSERT ... SELECT.
+
+They are meant to be called from upgrade()/downgrade() and work in offline (--sql) mode too.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+def lock_timeout(timeout="5s"):
+    """Fail the current migration's DDL if a lock is not granted within `timeout`."""
+    op.execute(f"SET LOCAL lock_timeout = '{timeout}'")
+
+
+def create_index_concurrently(name, table, columns, unique=False, using=None, include=None, where=None):
+    """
+    CREATE INDEX CONCURRENTLY, outside the migration transaction.
+
+    `columns` is the raw column list, so expressions and operator classes are allowed;
+    `include` adds non-key columns for index-only scans.
+    An INVALID index left behind by an interrupted build is dropped first.
+    """
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = '{name}' AND NOT i.indisvalid
+                ) THEN
+                    DROP INDEX {name};
+                END IF;
+            END $$
+        """)
+        op.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}"
+            f"{f' USING {using}' if using else ''} ({columns})"
+            f"{f' INCLUDE ({include})' if include else ''}"
+            f"{f' WHERE {where}' if where else ''}"
+        )
+
+
+def drop_index_concurrently(name):
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def add_check_not_valid(table, name, condition):
+    """Add a CHECK that is enforced for new rows only; call validate_constraint() afterwards."""
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID")
+
+
+def validate_constraint(table, name):
+    """Check existing rows against a NOT VALID constraint while allowing reads and writes."""
+    op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def backfill_in_batches(table, assignments, key, where="TRUE", batch_size=10000):
+    """
+    UPDATE {table} SET {assignments} for rows matching `where`, batch_size rows at a time.
+
+    Rows are visited in order of the numeric `key` column (normally the primary key) and
+    every batch commits on its own, so row locks are short-lived and the work already done
+    survives an interruption. Inside `assignments` and `where` the table is aliased `t`.
+    """
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table} t SET {assignments} WHERE {where}")
+        return
+
+    batch = sa.text(f"""
+        WITH batch AS (
+            SELECT {key} FROM {table}
+            WHERE {key} > :after
+            ORDER BY {key}
+            LIMIT :batch_size
+        ), updated AS (
+            UPDATE {table} t
+            SET {assignments}
+            FROM batch
+            WHERE t.{key} = batch.{key} AND ({where})
+        )
+        SELECT max({key}) FROM batch
+    """)
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        after = bind.execute(sa.text(f"SELECT min({key}) - 1 FROM {table}")).scalar()
+        while after is not None:
+            after = bind.execute(batch, {"after": after, "batch_size": batch_size}).scalar()
+
+
+def run_in_key_ranges(statement, table, key, batch_size=10000, share_lock=()):
+    """
+    Run `statement` once per range of batch_size consecutive `key` values of `table`.
+
+    `statement` restricts itself to the current range with the {after} and {until}
+    placeholders (after < key <= until). Every range commits on its own, as in
+    backfill_in_batches(). The `share_lock` tables are locked IN SHARE MODE for the length
+    of a range only, so a statement that counts their rows sees no write in flight while
+    writers wait for one batch rather than for the whole backfill.
+    """
+    lock = f"LOCK TABLE {', '.join(share_lock)} IN SHARE MODE" if share_lock else None
+    if op.get_context().as_sql:
+        if lock:
+            op.execute(lock)
+        op.execute(statement.format(after=f"(SELECT min({key}) - 1 FROM {table})",
+                                    until=f"(SELECT max({key}) FROM {table})"))
+        return
+
+    upper = sa.text(f"""
+        SELECT max({key}) FROM (
+            SELECT {key} FROM {table}
+            WHERE {key} > :after
+            ORDER BY {key}
+            LIMIT :batch_size
+        ) batch
+    """)
+    batch = sa.text(statement.format(after=":after", until=":until"))
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        after = bind.execute(sa.text(f"SELECT min({key}) - 1 FROM {table}")).scalar()
+        while after is not None:
+            until = bind.execute(upper, {"after": after, "batch_size": batch_size}).scalar()
+            if until is None:
+                break
+            # the connection autocommits here, so each range gets an explicit transaction
+            bind.execute(sa.text("BEGIN"))
+            try:
+                bind.execute(sa.text("SET LOCAL lock_timeout = '5s'"))
+                if lock:
+                    bind.execute(sa.text(lock))
+                bind.execute(batch, {"after": after, "until": until})
+            except Exception:
+                bind.execute(sa.text("ROLLBACK"))
+                raise
+            bind.execute(sa.text("COMMIT"))
+            after = until
@@ -0,0 +1,224 @@
+"""
+Overdue rental sweep: flags open rentals past their due date as LATE and keeps a running
+late-fee invoice for each of them.
+
+The sweep walks the partial index on open rentals in (expected_return_date, rental_id)
+order, one chunk per transaction, so row locks are held for a single chunk only and rows
+being returned concurrently are skipped rather than waited on. Re-running it is safe: a
+rental has at most one LATE_FEE invoice, which is updated in place while it is unpaid.
+
+Run it once from the command line with `python -m app.overdue`, or let the API run it
+periodically by setting OVERDUE_JOB_INTERVAL.
+"""
+from anyio import to_thread
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from . import database
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Must match the late-day rate used by trg_generate_invoice_func
+LATE_FEE_PER_DAY = 0.4
+
+# Session-level lock so API workers and cron never sweep at the same time
+TRY_LOCK_QUERY = "SELECT pg_try_advisory_lock(hashtext('hzs_overdue_job')) AS locked"
+UNLOCK_QUERY = "SELECT pg_advisory_unlock(hashtext('hzs_overdue_job'))"
+
+CUTOFF_QUERY = "SELECT LOCALTIMESTAMP(0) AS cutoff"
+
+PROCESS_OVERDUE_CHUNK_QUERY = """
+    WITH batch AS (
+        SELECT rental_id, expected_return_date
+        FROM hzs_rental
+        WHERE actual_return_date IS NULL
+          AND expected_return_date < %(cutoff)s
+          AND (expected_return_date, rental_id) > (%(after_date)s, %(after_id)s)
+        ORDER BY expected_return_date, rental_id
+        LIMIT %(batch_size)s
+        FOR UPDATE SKIP LOCKED
+    ), flagged AS (
+        UPDATE hzs_rental r
+        SET rental_status = 'LATE'
+        FROM batch
+        WHERE r.rental_id = batch.rental_id AND r.rental_status <> 'LATE'
+        RETURNING r.rental_id
+    ), invoiced AS (
+        INSERT INTO hzs_invoice (invoice_id, rental_id, invoice_date, invoic__amount, invoice_type)
+        SELECT nextval('seq_invoice_id'), rental_id, %(cutoff)s, days_late * %(fee_per_day)s, 'LATE_FEE'
+        FROM (
+            SELECT rental_id, EXTRACT(DAY FROM (%(cutoff)s - expected_return_date)) AS days_late
+            FROM batch
+        ) due
+        WHERE days_late > 0
+        ON CONFLICT (rental_id) WHERE invoice_type = 'LATE_FEE' DO UPDATE
+        SET invoic__amount = EXCLUDED.invoic__amount,
+            invoice_date = EXCLUDED.invoice_date
+        WHERE hzs_invoice.invoic__amount <> EXCLUDED.invoic__amount
+          AND NOT EXISTS (SELECT 1 FROM hzs_payment p WHERE p.invoice_id = hzs_invoice.invoice_id)
+        RETURNING (xmax = 0) AS inserted
+    ), last AS (
+        SELECT expected_return_date, rental_id
+        FROM batch
+        ORDER BY expected_return_date DESC, rental_id DESC
+        LIMIT 1
+    )
+    SELECT (SELECT count(*) FROM batch) AS scanned,
+           (SELECT count(*) FROM flagged) AS flagged,
+           (SELECT count(*) FROM invoiced WHERE inserted) AS invoices_created,
+           (SELECT count(*) FROM invoiced WHERE NOT inserted) AS invoices_updated,
+           (SELECT expected_return_date FROM last) AS last_date,
+           (SELECT rental_id FROM last) AS last_id
+"""
+
+_lock = threading.Lock()
+_progress = {
+    "running": False,
+    "runs": 0,
+    "started_at": None,
+    "finished_at": None,
+    "cutoff": None,
+    "chunks": 0,
+    "scanned": 0,
+    "flagged": 0,
+    "invoices_created": 0,
+    "invoices_updated": 0,
+    "last_run_seconds": None,
+    "last_error": None,
+}
+_COUNTERS = ("chunks", "scanned", "flagged", "invoices_created", "invoices_updated")
+_stop = threading.Event()
+
+
+def overdue_stats():
+    """Progress of the current (or last) sweep, for /metrics."""
+    with _lock:
+        stats = dict(_progress)
+    started = stats["started_at"]
+    if started is not None:
+        elapsed = (time.time() if stats["running"] else stats["finished_at"]) - started
+        stats["rentals_per_second"] = round(stats["scanned"] / elapsed, 1) if elapsed > 0 else 0.0
+    return stats
+
+
+def _update(**changes):
+    with _lock:
+        for key, value in changes.items():
+            _progress[key] = _progress[key] + value if key in _COUNTERS else value
+
+
+def run_overdue_job(batch_size=None):
+    """
+    Sweep every open rental that is overdue as of now. Returns the run's totals.
+
+    request_stop() makes a running sweep finish after its current chunk; the next run
+    picks up whatever it left.
+    """
+    batch_size = batch_size or settings.overdue_batch_size
+    with _lock:
+        if _progress["running"]:
+            raise RuntimeError("The overdue job is already running")
+        _progress.update(
+            running=True, started_at=time.time(), finished_at=None, cutoff=None, last_error=None,
+            **{counter: 0 for counter in _COUNTERS}
+        )
+
+    conn = database.pool.getconn()
+    cursor = conn.cursor()
+    locked = False
+    try:
+        cursor.execute(TRY_LOCK_QUERY)
+        locked = cursor.fetchone()["locked"]
+        conn.commit()
+        if not locked:
+            logger.info("Overdue job skipped, another sweep holds the lock")
+            return overdue_stats()
+
+        cursor.execute(CUTOFF_QUERY)
+        cutoff = cursor.fetchone()["cutoff"]
+        conn.commit()
+        _update(cutoff=cutoff.isoformat())
+        logger.info(f"Overdue job started, cutoff {cutoff}, chunks of {batch_size}")
+
+        params = {
+            "cutoff": cutoff,
+            "after_date": cutoff.min,
+            "after_id": -1,
+            "batch_size": batch_size,
+            "fee_per_day": LATE_FEE_PER_DAY,
+        }
+        while not _stop.is_set():
+            cursor.execute(PROCESS_OVERDUE_CHUNK_QUERY, params)
+            chunk = cursor.fetchone()
+            conn.commit()
+            if not chunk["scanned"]:
+                break
+            params.update(after_date=chunk["last_date"], after_id=chunk["last_id"])
+            _update(
+                chunks=1,
+                scanned=chunk["scanned"],
+                flagged=chunk["flagged"],
+                invoices_created=chunk["invoices_created"],
+                invoices_updated=chunk["invoices_updated"],
+            )
+            stats = overdue_stats()
+            logger.info(
+                f"Overdue job: {stats['scanned']} rentals scanned in {stats['chunks']} chunks "
+                f"({stats['rentals_per_second']}/s), {stats['flagged']} flagged late, "
+                f"{stats['invoices_created']} invoices created, {stats['invoices_updated']} updated"
+            )
+    except Exception as error:
+        conn.rollback()
+        _update(last_error=str(error))
+        logger.error(f"Overdue job failed: {error}")
+        raise
+    finally:
+        if locked and not conn.closed:
+            cursor.execute(UNLOCK_QUERY)
+            conn.commit()
+        cursor.close()
+        database.pool.putconn(conn)
+        finished = time.time()
+        with _lock:
+            _progress.update(
+                running=False,
+                runs=_progress["runs"] + 1,
+                finished_at=finished,
+                last_run_seconds=round(finished - _progress["started_at"], 3),
+            )
+    return overdue_stats()
+
+
+def request_stop():
+    _stop.set()
+
+
+async def run_periodically(interval):
+    """Run the sweep every `interval` seconds on a worker thread, until cancelled."""
+    _stop.clear()
+    while True:
+        try:
+            await to_thread.run_sync(run_overdue_job)
+        except Exception:
+            # already logged and recorded in overdue_stats(); retry on the next tick
+            pass
+        await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag overdue rentals and invoice late fees.")
+    parser.add_argument("--batch-size", type=int, default=settings.overdue_batch_size,
+                        help="rentals processed per transaction")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        run_overdue_job(args.batch_size)
+    finally:
+        database.pool.close()
+
+
+if __name__ == "__main__":
+    main()
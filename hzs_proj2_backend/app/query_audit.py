@@ -0,0 +1,202 @@
+"""
+EXPLAIN audit of the SQL issued by the routers.
+
+Every SQL string literal in app/routers (module-level *_QUERY constants as well as inline
+statements) is prepared and its generic plan inspected. The audit fails when a plan
+sequentially scans a table holding more than --threshold rows, which is how a missing
+index shows up once tables grow.
+
+    python -m app.query_audit --seed 200000 --threshold 10000
+
+--seed fills the large tables with synthetic rows and runs ANALYZE first. Everything
+happens in one transaction that is rolled back, so the database is left untouched;
+nothing is executed beyond EXPLAIN. Statements that cannot be prepared on their own
+(f-strings, temp tables, ...) are listed as skipped rather than failing the audit, and
+statements without a WHERE clause are expected to read their whole table.
+"""
+from pathlib import Path
+import argparse
+import ast
+import json
+import psycopg2
+import re
+import sys
+from . import database
+
+ROUTERS_DIR = Path(__file__).parent / "routers"
+
+SQL_START = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+# Synthetic data for the tables that grow without bound; sized relative to --seed.
+# Triggers stay enabled, so availability counters and return invoices are built as well.
+SEED_QUERIES = [
+    """
+    INSERT INTO hzs_customer (l_name, f_name, phone, email, id_type, id_num, password)
+    SELECT 'Seed', 'Customer', '5550100', 'seed' || g || '@example.com', 'SSN', g::text, 'x'
+    FROM generate_series(1, %(n)s) g
+    """,
+    """
+    INSERT INTO hzs_author (f_name, l_name, email, state, country, street, city)
+    SELECT 'Seed', 'Author' || g, 'author' || g || '@example.com', 'NY', 'US', 'Main St', 'New York'
+    FROM generate_series(1, greatest(%(n)s / 100, 1)) g
+    """,
+    """
+    INSERT INTO hzs_book (b_name, topic)
+    SELECT 'Seed book ' || g, 'topic' || (g %% 50)
+    FROM generate_series(1, greatest(%(n)s / 4, 1)) g
+    """,
+    """
+    INSERT INTO hzs_book_author (book_id, author_id)
+    SELECT b.book_id, a.author_id
+    FROM (SELECT book_id, row_number() OVER () AS rn FROM hzs_book) b
+    JOIN (SELECT author_id, row_number() OVER () - 1 AS rn, count(*) OVER () AS total FROM hzs_author) a
+      ON a.rn = b.rn %% a.total
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO hzs_book_copy (book_id, status)
+    SELECT b.book_id, 'AVAILABLE'
+    FROM hzs_book b, generate_series(1, 4)
+    """,
+    """
+    INSERT INTO hzs_rental (rental_status, borrow_date, expected_return_date, actual_return_date,
+                            customer_id, copy_id)
+    SELECT 'RETURNED', d, d + interval '14 days', d + interval '10 days', c.customer_id, bc.copy_id
+    FROM (SELECT copy_id, row_number() OVER () AS rn FROM hzs_book_copy) bc
+    JOIN (SELECT customer_id, row_number() OVER () AS rn FROM hzs_customer) c ON c.rn = bc.rn,
+         LATERAL (SELECT timestamp '2020-01-01' + bc.rn * interval '1 minute' AS d) t
+    """,
+    """
+    INSERT INTO hzs_payment (payment_date, method, card_holder_l_name, card_holder_f_name, amount, invoice_id)
+    SELECT invoice_date, 'CASH', 'Seed', 'Customer', invoic__amount, invoice_id
+    FROM hzs_invoice
+    WHERE invoice_id %% 2 = 0
+    """,
+    """
+    INSERT INTO hzs_study_room (capacity)
+    SELECT 8 FROM generate_series(1, 20)
+    """,
+    """
+    INSERT INTO hzs_room_reservation (topic_description, reserve_date, start_time, end_time, group_size,
+                                      customer_id, room_id, l_name, f_name)
+    SELECT 'Seed session', date_trunc('day', s), s, s + interval '1 hour', 4,
+           c.customer_id, r.room_id, 'Seed', 'Customer'
+    FROM (SELECT customer_id, row_number() OVER () AS rn FROM hzs_customer) c
+    JOIN (SELECT room_id, row_number() OVER () - 1 AS rn, count(*) OVER () AS total FROM hzs_study_room) r
+      ON r.rn = c.rn %% r.total,
+         LATERAL (SELECT timestamp '2020-01-01' + c.rn * interval '2 hours' AS s) t
+    """,
+]
+
+LARGE_TABLES = ("hzs_customer", "hzs_author", "hzs_book", "hzs_book_author", "hzs_book_copy",
+                "hzs_rental", "hzs_invoice", "hzs_payment", "hzs_study_room", "hzs_room_reservation")
+
+
+def collect_queries():
+    """Return (label, sql) for every SQL string literal in the router modules."""
+    queries = []
+    for path in sorted(ROUTERS_DIR.glob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Constant) and isinstance(node.value, str)
+                    and SQL_START.match(node.value) and "hzs_" in node.value.lower()):
+                queries.append((f"{path.stem}:{node.lineno}", node.value))
+    return queries
+
+
+def to_prepared(sql):
+    """Rewrite psycopg2 placeholders (%s, %(name)s) into $n parameters for PREPARE."""
+    names = {}
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group(0) == "%%":
+            return "%"
+        name = match.group(1)
+        if name is None:
+            count += 1
+            return f"${count}"
+        if name not in names:
+            count += 1
+            names[name] = count
+        return f"${names[name]}"
+
+    return PLACEHOLDER.sub(replace, sql), count
+
+
+def seq_scans(plan):
+    """Yield every relation a plan (or any of its sub-plans) reads with a sequential scan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def audit(cursor, threshold):
+    cursor.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+    cursor.execute("SELECT relname, reltuples FROM pg_class WHERE relkind IN ('r', 'p')")
+    table_rows = {row["relname"]: row["reltuples"] for row in cursor.fetchall()}
+
+    failures, skipped, checked = [], [], 0
+    for label, sql in collect_queries():
+        prepared, params = to_prepared(sql)
+        cursor.execute("SAVEPOINT audit")
+        try:
+            cursor.execute(f"PREPARE audit_stmt AS {prepared}")
+            args = f"({', '.join(['NULL'] * params)})" if params else ""
+            cursor.execute(f"EXPLAIN (FORMAT JSON) EXECUTE audit_stmt{args}")
+            plan = cursor.fetchone()["QUERY PLAN"]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            cursor.execute("DEALLOCATE audit_stmt")
+            cursor.execute("RELEASE SAVEPOINT audit")
+        except psycopg2.Error as error:
+            cursor.execute("ROLLBACK TO SAVEPOINT audit")
+            skipped.append((label, str(error).strip().splitlines()[0]))
+            continue
+        checked += 1
+        if not WHERE.search(sql):
+            # list-all and export statements read the whole table by design
+            continue
+        for table in set(seq_scans(plan[0]["Plan"])):
+            rows = table_rows.get(table, 0)
+            if rows > threshold:
+                failures.append((label, table, int(rows), " ".join(sql.split())[:120]))
+    return checked, failures, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a router query sequentially scans a large table.")
+    parser.add_argument("--threshold", type=int, default=10000,
+                        help="largest table (estimated rows) a sequential scan may read")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="insert this many synthetic customers/rentals/... first (rolled back afterwards)")
+    args = parser.parse_args()
+
+    conn = database.pool.getconn()
+    cursor = conn.cursor()
+    try:
+        if args.seed:
+            for query in SEED_QUERIES:
+                cursor.execute(query, {"n": args.seed})
+            for table in LARGE_TABLES:
+                cursor.execute(f"ANALYZE {table}")
+        checked, failures, skipped = audit(cursor, args.threshold)
+    finally:
+        conn.rollback()
+        cursor.close()
+        database.pool.putconn(conn)
+        database.pool.close()
+
+    for label, reason in skipped:
+        print(f"SKIP {label}: {reason}")
+    for label, table, rows, sql in failures:
+        print(f"FAIL {label}: seq scan on {table} (~{rows} rows): {sql}")
+    print(f"{checked} queries checked, {len(failures)} failing, {len(skipped)} skipped")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
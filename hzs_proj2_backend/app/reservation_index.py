@@ -0,0 +1,358 @@
+"""
+Per-worker in-memory index of room reservations.
+
+Each room's reservations are kept in arrays sorted by start time. The
+hzs_room_reservation_no_overlap constraint guarantees that a room's reservations never
+overlap, so their end times are sorted as well and every window query is two bisects.
+
+The index is loaded on startup by a listener thread that also LISTENs on the
+hzs_room_reservation channel; a trigger notifies the reservation id of every committed
+change, and the listener re-reads those rows, so other workers' writes show up within one
+notification round trip. The routes write through as well, so a worker sees its own
+writes immediately; a row that is older than the one already indexed (by updated_at) is
+ignored, whichever path delivers it last. While the index is not loaded (startup, lost
+listener connection) `ready` is False and callers query the database instead.
+
+Only reservations that end after the horizon (settings.reservation_index_retention_days
+before the load, moved forward daily) are kept. Windows that start before the horizon are
+answered from the database. A room's full schedule adds its archived reservations, which
+are read from the database on first use and cached until a change may touch them.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from hashlib import blake2b
+import logging
+import select
+import threading
+import time as clock
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from . import database
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "hzs_room_reservation"
+
+RESERVATION_COLUMNS = """
+    reservation_id, room_id, topic_description, reserve_date, start_time, end_time,
+    group_size, customer_id, l_name, f_name, updated_at
+"""
+
+# computed by the database, which stores local times without a time zone
+HORIZON_QUERY = "SELECT localtimestamp - make_interval(days => %s) AS horizon"
+
+LOAD_RESERVATIONS_QUERY = f"""
+    SELECT {RESERVATION_COLUMNS}
+    FROM hzs_room_reservation
+    WHERE end_time >= %s
+    ORDER BY room_id, start_time
+"""
+
+# reservations of a room that ended before the horizon
+GET_ARCHIVED_RESERVATIONS_QUERY = f"""
+    SELECT {RESERVATION_COLUMNS}
+    FROM hzs_room_reservation
+    WHERE room_id = %s AND end_time < %s
+    ORDER BY start_time
+"""
+
+# seconds between moves of the horizon
+HORIZON_REFRESH_INTERVAL = 24 * 3600
+
+GET_RESERVATIONS_BY_IDS_QUERY = f"""
+    SELECT {RESERVATION_COLUMNS}
+    FROM hzs_room_reservation
+    WHERE reservation_id = ANY(%s)
+"""
+
+
+def _row_hash(reservation):
+    """Hash of a reservation's id and version; the same in every worker, unlike hash()."""
+    row = f"{reservation['reservation_id']}:{reservation['updated_at'].isoformat()}"
+    return int.from_bytes(blake2b(row.encode(), digest_size=8).digest(), "big")
+
+
+class _RoomSchedule:
+    """One room's reservations, sorted by (start_time, reservation_id)."""
+
+    __slots__ = ("keys", "ends", "entries", "checksum")
+
+    def __init__(self):
+        self.keys = []
+        self.ends = []
+        self.entries = []
+        # sum of the entries' _row_hash(), mod 2**64
+        self.checksum = 0
+
+    def insert(self, reservation):
+        key = (reservation["start_time"], reservation["reservation_id"])
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.ends.insert(position, reservation["end_time"])
+        self.entries.insert(position, reservation)
+        self.checksum = (self.checksum + _row_hash(reservation)) % 2**64
+
+    def remove(self, reservation):
+        position = bisect_left(self.keys, (reservation["start_time"], reservation["reservation_id"]))
+        del self.keys[position], self.ends[position], self.entries[position]
+        self.checksum = (self.checksum - _row_hash(reservation)) % 2**64
+
+    def overlapping(self, start, end):
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.keys, (end,))
+        return self.entries[first:last]
+
+    def drop_ended_before(self, horizon):
+        """Remove and return the reservations that end before `horizon`."""
+        position = bisect_left(self.ends, horizon)
+        dropped = self.entries[:position]
+        del self.keys[:position], self.ends[:position], self.entries[:position]
+        self.checksum = (self.checksum - sum(map(_row_hash, dropped))) % 2**64
+        return dropped
+
+
+class ReservationIndex:
+    """Thread-safe index of reservations by room and by id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rooms = {}
+        self._by_id = {}
+        # archived reservations (ending before the horizon) of the rooms read so far
+        self._archives = {}
+        self._archived_ids = {}
+        # bumped whenever a cached archive may have become stale; see store_archive()
+        self.archive_generation = 0
+        self.horizon = None
+        self.ready = False
+        self._stats = {"lookups": 0, "loads": 0, "notifications": 0, "stale_writes": 0,
+                       "archive_loads": 0, "last_error": None}
+
+    @staticmethod
+    def _normalize(row):
+        reservation = dict(row)
+        reservation["reservation_id"] = int(reservation["reservation_id"])
+        if reservation["room_id"] is not None:
+            reservation["room_id"] = int(reservation["room_id"])
+        if reservation["customer_id"] is not None:
+            reservation["customer_id"] = int(reservation["customer_id"])
+        return reservation
+
+    def _drop_archive_locked(self, room_id):
+        archive = self._archives.pop(room_id, None)
+        if archive is not None:
+            for entry in archive.entries:
+                del self._archived_ids[entry["reservation_id"]]
+
+    def _forget_locked(self, reservation_id):
+        """Remove the reservation and invalidate the archives it may be part of."""
+        old = self._by_id.pop(reservation_id, None)
+        if old is not None:
+            self._rooms[old["room_id"]].remove(old)
+            return
+        if reservation_id in self._archived_ids:
+            self._drop_archive_locked(self._archived_ids[reservation_id])
+        # not indexed: possibly archived in a room whose archive is being read right now
+        self.archive_generation += 1
+
+    def _store_locked(self, reservation):
+        """Index `reservation` unless a newer version of it is indexed already."""
+        current = self._by_id.get(reservation["reservation_id"])
+        if current is not None and current["updated_at"] > reservation["updated_at"]:
+            self._stats["stale_writes"] += 1
+            return
+        self._forget_locked(reservation["reservation_id"])
+        if self.horizon is not None and reservation["end_time"] < self.horizon:
+            self._drop_archive_locked(reservation["room_id"])
+            self.archive_generation += 1
+            return
+        self._by_id[reservation["reservation_id"]] = reservation
+        self._rooms.setdefault(reservation["room_id"], _RoomSchedule()).insert(reservation)
+
+    def load(self, rows, horizon):
+        """Replace the index by `rows`, the reservations that end at or after `horizon`."""
+        rooms, by_id = {}, {}
+        for row in rows:
+            reservation = self._normalize(row)
+            by_id[reservation["reservation_id"]] = reservation
+            rooms.setdefault(reservation["room_id"], _RoomSchedule()).insert(reservation)
+        with self._lock:
+            self._rooms, self._by_id = rooms, by_id
+            self._archives, self._archived_ids = {}, {}
+            self.archive_generation += 1
+            self.horizon = horizon
+            self._stats["loads"] += 1
+            self.ready = True
+
+    def advance_horizon(self, horizon):
+        """Move the horizon forward, dropping the reservations that ended before it."""
+        with self._lock:
+            for schedule in self._rooms.values():
+                for reservation in schedule.drop_ended_before(horizon):
+                    del self._by_id[reservation["reservation_id"]]
+            self._rooms = {room_id: schedule for room_id, schedule in self._rooms.items() if schedule.entries}
+            self._archives, self._archived_ids = {}, {}
+            self.archive_generation += 1
+            self.horizon = horizon
+
+    def put(self, row):
+        """Insert or replace a reservation (it may have moved to another room)."""
+        reservation = self._normalize(row)
+        with self._lock:
+            self._store_locked(reservation)
+
+    def remove(self, reservation_id):
+        with self._lock:
+            self._forget_locked(int(reservation_id))
+
+    def apply_changes(self, reservation_ids, rows):
+        """Replace the given reservations by their current rows; ids without a row were deleted."""
+        current = {reservation["reservation_id"]: reservation for reservation in map(self._normalize, rows)}
+        with self._lock:
+            self._stats["notifications"] += len(reservation_ids)
+            for reservation_id in reservation_ids:
+                if reservation_id in current:
+                    self._store_locked(current[reservation_id])
+                else:
+                    self._forget_locked(reservation_id)
+
+    def store_archive(self, room_id, rows, generation):
+        """
+        Cache the room's archived reservations, read with GET_ARCHIVED_RESERVATIONS_QUERY
+        after `generation` was taken from archive_generation. They are dropped instead when
+        a change that may touch them arrived in the meantime.
+        """
+        archive = _RoomSchedule()
+        for row in rows:
+            archive.insert(self._normalize(row))
+        with self._lock:
+            self._stats["archive_loads"] += 1
+            if generation != self.archive_generation:
+                return
+            self._drop_archive_locked(room_id)
+            self._archives[room_id] = archive
+            for entry in archive.entries:
+                self._archived_ids[entry["reservation_id"]] = room_id
+
+    def get(self, reservation_id):
+        with self._lock:
+            self._stats["lookups"] += 1
+            return self._by_id.get(reservation_id)
+
+    def by_room(self, room_id):
+        """
+        Every reservation of the room, sorted by start time, or None while its archived
+        reservations are not cached (see store_archive()).
+        """
+        with self._lock:
+            self._stats["lookups"] += 1
+            archive = self._archives.get(room_id)
+            if archive is None:
+                return None
+            schedule = self._rooms.get(room_id)
+            # archived reservations end before the horizon, the indexed ones do not
+            return archive.entries + (schedule.entries if schedule else [])
+
+    def covers(self, start):
+        """Whether every reservation overlapping a window that begins at `start` is indexed."""
+        return self.ready and start >= self.horizon
+
+    def overlapping(self, room_id, start, end):
+        """Reservations of the room that overlap [start, end), sorted by start time; see covers()."""
+        with self._lock:
+            self._stats["lookups"] += 1
+            schedule = self._rooms.get(room_id)
+            return schedule.overlapping(start, end) if schedule else []
+
+    def room_version(self, room_id):
+        """
+        Version row of the schedule by_room() returns, in the form app/row_versions.py
+        expects, or None while the room's archived reservations are not cached.
+        """
+        with self._lock:
+            archive = self._archives.get(room_id)
+            if archive is None:
+                return None
+            schedule = self._rooms.get(room_id) or _RoomSchedule()
+            entries = archive.entries + schedule.entries
+            return {
+                "row_count": len(entries),
+                "updated_at": max((entry["updated_at"] for entry in entries), default=None),
+                "checksum": (archive.checksum + schedule.checksum) % 2**64,
+            }
+
+    def on_day(self, room_id, day):
+        start = datetime.combine(day, time(0))
+        return self.overlapping(room_id, start, start + timedelta(days=1))
+
+    def mark_stale(self, error=None):
+        with self._lock:
+            self.ready = False
+            if error is not None:
+                self._stats["last_error"] = str(error)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(ready=self.ready, rooms=len(self._rooms), reservations=len(self._by_id),
+                         horizon=self.horizon, archived_rooms=len(self._archives))
+        return stats
+
+
+reservation_index = ReservationIndex()
+
+_stop = threading.Event()
+_listener = None
+
+
+def _listen():
+    while not _stop.is_set():
+        conn = None
+        try:
+            conn = psycopg2.connect(database.DATABASE_URL, cursor_factory=RealDictCursor)
+            conn.autocommit = True
+            cursor = conn.cursor()
+            # listen before loading so no change committed in between is missed
+            cursor.execute(f"LISTEN {CHANNEL}")
+            cursor.execute(HORIZON_QUERY, (settings.reservation_index_retention_days,))
+            horizon = cursor.fetchone()["horizon"]
+            cursor.execute(LOAD_RESERVATIONS_QUERY, (horizon,))
+            reservation_index.load(cursor.fetchall(), horizon)
+            logger.info(f"Reservation index loaded: {reservation_index.stats()['reservations']} reservations")
+            horizon_moved = clock.monotonic()
+            while not _stop.is_set():
+                if clock.monotonic() - horizon_moved >= HORIZON_REFRESH_INTERVAL:
+                    cursor.execute(HORIZON_QUERY, (settings.reservation_index_retention_days,))
+                    reservation_index.advance_horizon(cursor.fetchone()["horizon"])
+                    horizon_moved = clock.monotonic()
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                changed = {int(notify.payload) for notify in conn.notifies}
+                conn.notifies.clear()
+                if changed:
+                    cursor.execute(GET_RESERVATIONS_BY_IDS_QUERY, (list(changed),))
+                    reservation_index.apply_changes(changed, cursor.fetchall())
+        except (psycopg2.Error, OSError) as error:
+            reservation_index.mark_stale(error)
+            logger.error(f"Reservation index listener failed, retrying: {error}")
+            _stop.wait(settings.reservation_index_retry_interval)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def start():
+    """Load the index and follow changes on a background thread."""
+    global _listener
+    _stop.clear()
+    _listener = threading.Thread(target=_listen, name="reservation-index", daemon=True)
+    _listener.start()
+
+
+def stop():
+    _stop.set()
+    if _listener is not None:
+        _listener.join(timeout=5)
+    reservation_index.mark_stale()
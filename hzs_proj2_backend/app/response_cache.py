@@ -0,0 +1,340 @@
+"""
+Response cache for read-mostly GET endpoints.
+
+Routers register the paths worth caching with cache_route() together with the tags the
+response depends on, and call invalidate(tag) (invalidate_async() in async handlers) after
+committing a change to that data.
+ResponseCacheMiddleware then serves registered paths from the cache, and answers
+If-None-Match with 304 when the ETag still matches, so a hit never runs the route's
+queries or re-serializes the body.
+
+Invalidation bumps a version number per tag and cache keys embed the versions current
+when the request started, so a response computed from data that changed meanwhile is
+stored under a key nobody asks for anymore. By default entries live in an in-process LRU
+(TTLCache) and invalidations reach the current worker only; other workers catch up
+within the TTL. Setting RESPONSE_CACHE_REDIS_URL shares entries and tag versions through
+a Redis-compatible server (needs the `redis` package), so invalidations reach every
+worker. The Redis client is synchronous; async code calls it on a worker thread, so a
+slow round trip never blocks the event loop.
+"""
+from collections import OrderedDict
+from hashlib import blake2b
+from urllib.parse import parse_qsl, urlencode
+import logging
+import re
+import threading
+import time
+from anyio import to_thread
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from . import oauth2
+from .cache import TTLCache
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# set by app.row_versions.RowVersionMiddleware to the row-version ETag of the request
+ROW_VERSION_SCOPE_KEY = "hzs.row_version"
+
+
+class MemoryBackend:
+    """
+    Entries in a TTLCache; tag versions in an insertion-ordered dict, oldest bump first.
+
+    Versions come from one counter shared by all tags, so a number is never reused. A tag
+    not bumped for longer than the longest entry TTL is forgotten (its version reads as 0
+    again): every entry stored before that bump has expired, and entries stored after it
+    are keyed by the forgotten number, which is never handed out again.
+    """
+
+    # calls return without I/O, so async code calls them directly
+    blocking = False
+
+    def __init__(self, max_size, ttl):
+        self._entries = TTLCache(max_size=max_size, ttl=ttl)
+        self._max_tags = max_size
+        self._max_ttl = ttl
+        self._versions = OrderedDict()  # tag -> (version, bumped at)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, entry, ttl):
+        with self._lock:
+            self._max_ttl = max(self._max_ttl, ttl)
+        self._entries.set(key, entry, ttl=ttl)
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return [self._versions[tag][0] if tag in self._versions else 0 for tag in tags]
+
+    def bump(self, tags):
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                self._counter += 1
+                self._versions.pop(tag, None)
+                self._versions[tag] = (self._counter, now)
+            if len(self._versions) > self._max_tags:
+                self._forget_before(now - self._max_ttl)
+
+    def _forget_before(self, cutoff):
+        while self._versions:
+            tag, (_, bumped_at) = next(iter(self._versions.items()))
+            if bumped_at > cutoff:
+                break
+            del self._versions[tag]
+
+    def stats(self):
+        with self._lock:
+            tags = len(self._versions)
+        return {**self._entries.stats(), "tags": tags}
+
+
+class RedisBackend:
+    """Entries are stored as `etag \\n content-type \\n body`; tag versions are plain counters."""
+
+    PREFIX = "hzs:response-cache:"
+    # every call is a network round trip
+    blocking = True
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as error:
+            raise RuntimeError("RESPONSE_CACHE_REDIS_URL is set but the redis package is not installed") from error
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(self.PREFIX + "entry:" + key)
+        if value is None:
+            return None
+        etag, content_type, body = value.split(b"\n", 2)
+        return etag.decode(), content_type.decode(), body
+
+    def set(self, key, entry, ttl):
+        etag, content_type, body = entry
+        value = b"\n".join((etag.encode(), content_type.encode(), body))
+        self._client.set(self.PREFIX + "entry:" + key, value, ex=ttl)
+
+    def tag_versions(self, tags):
+        values = self._client.mget([self.PREFIX + "tag:" + tag for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def bump(self, tags):
+        with self._client.pipeline() as pipe:
+            for tag in tags:
+                pipe.incr(self.PREFIX + "tag:" + tag)
+            pipe.execute()
+
+    def stats(self):
+        return {"backend": "redis"}
+
+
+def route_regex(template):
+    """
+    Compile a route path such as "/book/{book_id:int}" into a regex capturing its path params.
+
+    As in Starlette, `{name}` matches one path segment and `{name:int}` digits only, so a
+    static sibling route like "/book/search" is not mistaken for an id.
+    """
+    pattern, end = "", 0
+    for match in re.finditer(r"\{(\w+)(:int)?\}", template):
+        pattern += re.escape(template[end:match.start()])
+        pattern += f"(?P<{match.group(1)}>{'[0-9]+' if match.group(2) else '[^/]+'})"
+        end = match.end()
+    return re.compile(pattern + re.escape(template[end:]) + "$")
+
+
+class _Rule:
+    def __init__(self, template, tags, ttl, authorize):
+        self.regex = route_regex(template)
+        self.tags = tags
+        self.ttl = ttl
+        self.authorize = authorize
+
+    def tags_for(self, path_params, query):
+        return self.tags(path_params, query) if callable(self.tags) else list(self.tags)
+
+
+_rules = []
+_backend = None
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "not_modified": 0, "stores": 0, "invalidations": 0, "rejected": 0, "errors": 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        if settings.response_cache_redis_url:
+            _backend = RedisBackend(settings.response_cache_redis_url)
+        else:
+            _backend = MemoryBackend(settings.response_cache_max_size, settings.response_cache_ttl)
+    return _backend
+
+
+def cache_route(template, tags, ttl=None, authorize=None):
+    """
+    Cache successful GET responses of `template` (a route path such as "/book/{book_id:int}").
+
+    `tags` is a list of tag names, or a callable taking (path_params, query_params) that
+    returns the tags for one request, or None when that request must not be cached.
+
+    Routes behind get_current_user pass `authorize`, a predicate on the current user. Every
+    request is then authenticated the way get_current_user does it (expired or unknown
+    tokens, deleted customers and role changes are seen as soon as the route would see
+    them), and only a request the predicate accepts is served from the cache; any other
+    goes to the route, which rejects it. The cached body is shared by all accepted users,
+    so the route's response must not depend on who asks.
+    """
+    _rules.append(_Rule(template, tags, ttl, authorize))
+
+
+async def _run(func, *args):
+    """Call a backend method from async code, on a worker thread if it does I/O."""
+    if backend().blocking:
+        return await to_thread.run_sync(func, *args)
+    return func(*args)
+
+
+def invalidate(*tags):
+    """Drop every cached response that depends on one of `tags`. Call after committing."""
+    try:
+        backend().bump(tags)
+        _count("invalidations")
+    except Exception as error:
+        _count("errors")
+        logger.error(f"Response cache invalidation of {tags} failed: {error}")
+
+
+async def invalidate_async(*tags):
+    """invalidate() for async handlers."""
+    await _run(invalidate, *tags)
+
+
+def response_cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    if _backend is not None:
+        stats.update(_backend.stats())
+    return stats
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def _authorized(rule, headers):
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user = await oauth2.user_for_token(token)
+    except HTTPException:
+        return False
+    return rule.authorize(user)
+
+
+def _match(path):
+    for rule in _rules:
+        match = rule.regex.match(path)
+        if match:
+            return rule, match.groupdict()
+    return None, None
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving the routes registered with cache_route() from the cache."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        rule, path_params = _match(scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        query = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+        tags = rule.tags_for(path_params, query)
+        if tags is None:
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        if rule.authorize is not None and not await _authorized(rule, headers):
+            _count("rejected")
+            return await self.app(scope, receive, send)
+
+        key = scope["path"] + "?" + urlencode(sorted(parse_qsl(scope["query_string"].decode("latin-1"))))
+        if ROW_VERSION_SCOPE_KEY in scope:
+            # the response must match the ETag RowVersionMiddleware is going to attach to it
+            key += "|" + scope[ROW_VERSION_SCOPE_KEY]
+        cache_control = "private, no-cache" if rule.authorize else "no-cache"
+
+        def lookup(key):
+            key += "|" + ",".join(f"{tag}:{version}" for tag, version in zip(tags, backend().tag_versions(tags)))
+            return key, backend().get(key)
+
+        try:
+            key, entry = await _run(lookup, key)
+        except Exception as error:
+            _count("errors")
+            logger.error(f"Response cache lookup failed: {error}")
+            return await self.app(scope, receive, send)
+
+        if entry is not None:
+            _count("hits")
+            etag, content_type, body = entry
+            if etag_matches(headers.get("if-none-match"), etag):
+                _count("not_modified")
+                response = Response(status_code=304, headers={"etag": etag, "cache-control": cache_control})
+            else:
+                response = Response(
+                    body, headers={"content-type": content_type, "etag": etag, "cache-control": cache_control}
+                )
+            return await response(scope, receive, send)
+
+        _count("misses")
+        start, chunks = None, []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+
+        if start["status"] == 200:
+            response_headers = MutableHeaders(scope=start)
+            etag = '"' + blake2b(body, digest_size=16).hexdigest() + '"'
+            try:
+                await _run(backend().set, key, (etag, response_headers.get("content-type", "application/json"), body),
+                           rule.ttl or settings.response_cache_ttl)
+                _count("stores")
+            except Exception as error:
+                _count("errors")
+                logger.error(f"Response cache store failed: {error}")
+            response_headers["etag"] = etag
+            response_headers["cache-control"] = cache_control
+            if etag_matches(headers.get("if-none-match"), etag):
+                _count("not_modified")
+                response = Response(status_code=304, headers={"etag": etag, "cache-control": cache_control})
+                return await response(scope, receive, send)
+
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -7,10 +7,12 @@ from .. import database, schemas, utils, oauth2
 router = APIRouter(tags=['Authentication'])
 
 @router.post('/login', response_model=schemas.Token)
-def login(user_credentials: OAuth2PasswordRequestForm = Depends(), db=Depends(database.get_db)):
-    # Query the user from the database
-    db.execute("""SELECT * FROM hzs_customer WHERE email = %s""", (user_credentials.username,))
-    user = db.fetchone()
+async def login(user_credentials: OAuth2PasswordRequestForm = Depends()):
+    # Query the user from the database; the connection goes back to the pool
+    # before the (slow) password check
+    async with database.async_cursor() as db:
+        await db.execute("""SELECT * FROM hzs_customer WHERE email = %s""", (user_credentials.username,))
+        user = await db.fetchone()
 
     if not user:
         raise HTTPException(
@@ -19,8 +21,8 @@ def login(user_credentials: OAuth2PasswordRequestForm = Depends(), db=Depends(da
         )
     
 
-    # Verify the password
-    if not utils.verify(user_credentials.password, user['password']):
+    # Verify the password on the dedicated hashing pool
+    if not await utils.verify_async(user_credentials.password, user['password']):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid Credentials"
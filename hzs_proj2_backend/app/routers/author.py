@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, status, HTTPException
-from .. import schemas, database
+from .. import schemas, database, response_cache
+from ..config import settings
+from ..export import stream_export
+from ..fast_json import RawJSONResponse, fetch_json
 from ..oauth2 import get_current_user
-from typing import List
+from typing import List, Literal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +14,8 @@ router = APIRouter(
     tags=["author"]
 )
 
+response_cache.cache_route(f"{router.prefix}/", tags=["authors"])
+
 
 # Queries for HZS_AUTHOR
 ADD_AUTHOR_QUERY = """
@@ -53,7 +58,7 @@ GET_BOOKS_BY_AUTHOR_QUERY = """
 
 # Add a new author
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.AuthorOut)
-async def add_author(author: schemas.AuthorCreate, db=Depends(database.get_db), current_user=Depends(get_current_user)):
+async def add_author(author: schemas.AuthorCreate, db=Depends(database.get_async_db), current_user=Depends(get_current_user)):
     if current_user['role'] != 'admin':
         
         raise HTTPException(
@@ -62,26 +67,37 @@ async def add_author(author: schemas.AuthorCreate, db=Depends(database.get_db),
         )
     
     try:
-        db.execute(ADD_AUTHOR_QUERY, (
+        await db.execute(ADD_AUTHOR_QUERY, (
             author.f_name, author.l_name, author.email, author.state, author.country, author.street, author.city
         ))
-        new_author = db.fetchone()
-        db.connection.commit()
+        new_author = await db.fetchone()
+        await db.connection.commit()
+        await response_cache.invalidate_async("authors")
         logger.info(f"Author added successfully: {new_author}")
         return new_author
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error adding author: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while adding the author."
         )
 
+# Stream every author as NDJSON or CSV (bulk export)
+@router.get("/export")
+async def export_authors(format: Literal["ndjson", "csv"] = "ndjson", current_user=Depends(get_current_user)):
+    if current_user['role'] != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have access to this resource"
+        )
+    return stream_export(GET_ALL_AUTHORS_QUERY, fmt=format, filename="authors")
+
 # Get author by ID
 @router.get("/{author_id}", response_model=schemas.AuthorOut)
-async def get_author_by_id(author_id: int, db=Depends(database.get_db)):
-    db.execute(GET_AUTHOR_BY_ID_QUERY, (author_id,))
-    author = db.fetchone()
+async def get_author_by_id(author_id: int, db=Depends(database.get_async_db)):
+    await db.execute(GET_AUTHOR_BY_ID_QUERY, (author_id,))
+    author = await db.fetchone()
     if not author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,42 +107,46 @@ async def get_author_by_id(author_id: int, db=Depends(database.get_db)):
 
 # Get all authors
 @router.get("/", response_model=List[schemas.AuthorOut])
-async def get_all_authors(db=Depends(database.get_db)):
-    db.execute(GET_ALL_AUTHORS_QUERY)
-    authors = db.fetchall()
+async def get_all_authors(db=Depends(database.get_async_db)):
+    if settings.postgres_json_lists:
+        return RawJSONResponse(await db.run_sync(fetch_json, GET_ALL_AUTHORS_QUERY, None, schemas.AuthorOut))
+    await db.execute(GET_ALL_AUTHORS_QUERY)
+    authors = await db.fetchall()
     return authors
 
 # Update author
 @router.put("/{author_id}", response_model=schemas.AuthorOut)
-async def update_author(author_id: int, updated_author: schemas.AuthorCreate, db=Depends(database.get_db)):
-    db.execute(UPDATE_AUTHOR_QUERY, (
+async def update_author(author_id: int, updated_author: schemas.AuthorCreate, db=Depends(database.get_async_db)):
+    await db.execute(UPDATE_AUTHOR_QUERY, (
         updated_author.f_name, updated_author.l_name, updated_author.email,
         updated_author.state, updated_author.country, updated_author.street, updated_author.city, author_id
     ))
-    author = db.fetchone()
+    author = await db.fetchone()
     if not author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Author with id {author_id} does not exist!"
         )
-    db.connection.commit()
+    await db.connection.commit()
+    await response_cache.invalidate_async("authors")
     return author
 
 # Delete author
 @router.delete("/{author_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_author(author_id: int, db=Depends(database.get_db)):
-    db.execute(DELETE_AUTHOR_QUERY, (author_id,))
+async def delete_author(author_id: int, db=Depends(database.get_async_db)):
+    await db.execute(DELETE_AUTHOR_QUERY, (author_id,))
     if db.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Author with id {author_id} does not exist!"
         )
-    db.connection.commit()
+    await db.connection.commit()
+    await response_cache.invalidate_async("authors")
 
 
 # Get books by author
 @router.get("/{author_id}/books", response_model=List[schemas.BookOut])
-async def get_books_by_author(author_id: int, db=Depends(database.get_db)):
-    db.execute(GET_BOOKS_BY_AUTHOR_QUERY, (author_id,))
-    books = db.fetchall()
+async def get_books_by_author(author_id: int, db=Depends(database.get_async_db)):
+    await db.execute(GET_BOOKS_BY_AUTHOR_QUERY, (author_id,))
+    books = await db.fetchall()
     return books
\ No newline at end of file
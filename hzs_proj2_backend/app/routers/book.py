@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from .. import schemas, database
+from fastapi import APIRouter, Depends, status, HTTPException, Query, UploadFile, File
+from .. import schemas, database, response_cache
+from ..bulk_import import import_books
 from ..oauth2 import get_current_user
-from typing import List
+from typing import List, Literal, Optional
 import logging
+import re
 
 logging.basicConfig(
     level=logging.DEBUG,  # Set to DEBUG to capture all logs
@@ -15,6 +17,19 @@ router = APIRouter(
     tags=["book"]
 )
 
+
+def _book_cache_tags(path_params, query):
+    expansions = {part.strip() for part in query.get("include", "").split(",") if part.strip()}
+    if expansions & {"copies", "availability"}:
+        # copies and counters change with every checkout and return
+        return None
+    return [f"book:{path_params['book_id']}"] + (["authors"] if "authors" in expansions else [])
+
+
+response_cache.cache_route(
+    f"{router.prefix}/{{book_id:int}}", tags=_book_cache_tags, authorize=lambda user: user['role'] == 'admin'
+)
+
 ADD_BOOK_QUERY = """
     INSERT INTO hzs_book (b_name, topic)
     VALUES (%s, %s) 
@@ -27,10 +42,35 @@ GET_BOOK_BY_ID_QUERY = """
     WHERE book_id = %s
 """
 
-GET_ALL_BOOKS_QUERY = """
-    SELECT book_id, b_name, topic 
+# Keyset pagination: callers pass the last book_id they saw (0 for the first page)
+# and ask for one row more than the page size to know whether a next page exists.
+GET_BOOKS_PAGE_QUERY = """
+    SELECT book_id, b_name, topic
+    FROM hzs_book
+    WHERE book_id > %s
+    ORDER BY book_id
+    LIMIT %s
+"""
+
+GET_BOOKS_PAGE_BY_TOPIC_QUERY = """
+    SELECT book_id, b_name, topic
     FROM hzs_book
+    WHERE topic = %s
+      AND book_id > %s
     ORDER BY book_id
+    LIMIT %s
+"""
+
+# Ranked search: prefix matches on title/topic/author words through the tsvector index,
+# plus substring matches on the title through the trigram index.
+SEARCH_BOOKS_QUERY = """
+    SELECT book_id, b_name, topic,
+           ts_rank_cd(search_document, query) + similarity(b_name, %s) AS rank
+    FROM hzs_book, to_tsquery('simple', %s) AS query
+    WHERE search_document @@ query
+       OR b_name ILIKE %s
+    ORDER BY rank DESC, book_id
+    LIMIT %s OFFSET %s
 """
 
 DELETE_BOOK_BY_ID_QUERY = """
@@ -70,6 +110,89 @@ GET_AUTHORS_BY_BOOK_QUERY = """
     WHERE ba.book_id = %s
 """
 
+# Set-based lookups used by ?include= to expand a whole page of books at once
+GET_AUTHORS_BY_BOOKS_QUERY = """
+    SELECT ba.book_id, a.author_id, a.f_name, a.l_name, a.email, a.state, a.country, a.street, a.city
+    FROM hzs_author a
+    JOIN hzs_book_author ba ON a.author_id = ba.author_id
+    WHERE ba.book_id = ANY(%s)
+    ORDER BY ba.book_id, a.author_id
+"""
+
+GET_COPIES_BY_BOOKS_QUERY = """
+    SELECT copy_id, book_id, status
+    FROM hzs_book_copy
+    WHERE book_id = ANY(%s)
+    ORDER BY book_id, copy_id
+"""
+
+# Folded counters in hzs_book_availability plus the deltas the triggers on hzs_book_copy and
+# hzs_rental wrote since the last fold (app/availability.py)
+GET_AVAILABILITY_BY_BOOKS_QUERY = """
+    SELECT b.book_id,
+           coalesce(a.total, 0) + d.total AS total,
+           coalesce(a.available, 0) + d.available AS available,
+           coalesce(a.on_loan, 0) + d.on_loan AS on_loan,
+           coalesce(a.late, 0) + d.late AS late
+    FROM hzs_book b
+    LEFT JOIN hzs_book_availability a ON a.book_id = b.book_id
+    CROSS JOIN LATERAL (
+        SELECT coalesce(sum(total), 0)::int AS total,
+               coalesce(sum(available), 0)::int AS available,
+               coalesce(sum(on_loan), 0)::int AS on_loan,
+               coalesce(sum(late), 0)::int AS late
+        FROM hzs_book_availability_delta
+        WHERE book_id = b.book_id
+    ) d
+    WHERE b.book_id = ANY(%s)
+    ORDER BY b.book_id
+"""
+
+BOOK_EXPANSIONS = ("authors", "copies", "availability")
+
+
+def parse_include(include: Optional[str]):
+    expansions = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = expansions.difference(BOOK_EXPANSIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include value(s): {', '.join(sorted(unknown))}. "
+                   f"Allowed: {', '.join(BOOK_EXPANSIONS)}"
+        )
+    return expansions
+
+
+async def expand_books(db, books, expansions):
+    """Attach the requested relations to every book with one query per relation."""
+    if not books or not expansions:
+        return books
+    book_ids = [book['book_id'] for book in books]
+
+    if "authors" in expansions:
+        authors = {book_id: [] for book_id in book_ids}
+        await db.execute(GET_AUTHORS_BY_BOOKS_QUERY, (book_ids,))
+        for row in await db.fetchall():
+            authors[row.pop('book_id')].append(row)
+        for book in books:
+            book['authors'] = authors[book['book_id']]
+
+    if "copies" in expansions:
+        copies = {book_id: [] for book_id in book_ids}
+        await db.execute(GET_COPIES_BY_BOOKS_QUERY, (book_ids,))
+        for row in await db.fetchall():
+            copies[row['book_id']].append(row)
+        for book in books:
+            book['copies'] = copies[book['book_id']]
+
+    if "availability" in expansions:
+        await db.execute(GET_AVAILABILITY_BY_BOOKS_QUERY, (book_ids,))
+        availability = {row.pop('book_id'): row for row in await db.fetchall()}
+        for book in books:
+            book['availability'] = availability.get(book['book_id'], {"total": 0, "available": 0, "on_loan": 0, "late": 0})
+
+    return books
+
 DELETE_BOOK_COPY_QUERY = """
     DELETE FROM hzs_book_copy
     WHERE copy_id = %s
@@ -81,7 +204,7 @@ DELETE_BOOK_QUERY = """
 """
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.BookOut)
-async def add_book(book: schemas.BookCreate, db=Depends(database.get_db), current_user=Depends(get_current_user)):
+async def add_book(book: schemas.BookCreate, db=Depends(database.get_async_db), current_user=Depends(get_current_user)):
     # logger.info(current_user['role'])
     if current_user['role'] != 'admin':
         
@@ -90,12 +213,12 @@ async def add_book(book: schemas.BookCreate, db=Depends(database.get_db), curren
             detail="You do not have access to this resource"
         )
     try:
-        db.execute(ADD_BOOK_QUERY, (book.b_name, book.topic))
-        added_book = db.fetchone()
-        db.connection.commit()
+        await db.execute(ADD_BOOK_QUERY, (book.b_name, book.topic))
+        added_book = await db.fetchone()
+        await db.connection.commit()
         logger.info(f"Book added successfully: {added_book}")
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error adding book: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -105,17 +228,65 @@ async def add_book(book: schemas.BookCreate, db=Depends(database.get_db), curren
     # 嚙踝蕭嚙踝蕭嚙踝蕭嚙踝蕭芞嚙踝蕭嚙踝蕭嚙踝蕭嚙誕�?
     return added_book
 
-@router.get("/", response_model=List[schemas.BookOut])
-async def get_all_books(db=Depends(database.get_db), current_user=Depends(get_current_user)):
+@router.post("/import", response_model=schemas.BookImportResult)
+async def bulk_import_books(
+    file: UploadFile = File(..., description="CSV with b_name,topic,copies,author_ids columns or NDJSON objects"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to the file extension"),
+    db=Depends(database.get_async_db),
+    current_user=Depends(get_current_user)
+):
     if current_user['role'] != 'admin':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have access to this resource"
         )
+    if format is None:
+        format = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
     try:
-        db.execute(GET_ALL_BOOKS_QUERY)
-        books = db.fetchall()
-        return books
+        # Parsing, COPY and the set-based inserts all block, so they share one worker thread
+        result = await db.run_sync(import_books, file.file, format)
+        await db.connection.commit()
+        logger.info(
+            f"Imported {result['books_created']} books and {result['copies_created']} copies, "
+            f"rejected {result['rejected_rows']} rows"
+        )
+        return result
+    except Exception as e:
+        await db.connection.rollback()
+        logger.error(f"Error importing books: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while importing books."
+        )
+
+@router.get("/", response_model=schemas.BookPage, response_model_exclude_unset=True)
+async def get_all_books(
+    after_id: int = Query(0, ge=0, description="Return books with a book_id greater than this cursor"),
+    limit: int = Query(50, ge=1, le=500),
+    topic: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Comma separated: authors, copies, availability"),
+    db=Depends(database.get_async_db),
+    current_user=Depends(get_current_user)
+):
+    if current_user['role'] != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have access to this resource"
+        )
+    expansions = parse_include(include)
+    try:
+        if topic is None:
+            await db.execute(GET_BOOKS_PAGE_QUERY, (after_id, limit + 1))
+        else:
+            await db.execute(GET_BOOKS_PAGE_BY_TOPIC_QUERY, (topic, after_id, limit + 1))
+        books = await db.fetchall()
+
+        next_cursor = None
+        if len(books) > limit:
+            books = books[:limit]
+            next_cursor = books[-1]['book_id']
+        await expand_books(db, books, expansions)
+        return {"items": books, "next_cursor": next_cursor}
     except Exception as e:
         logger.error(f"Error retrieving books: {str(e)}")
         raise HTTPException(
@@ -123,16 +294,70 @@ async def get_all_books(db=Depends(database.get_db), current_user=Depends(get_cu
             detail="An error occurred while retrieving books."
         )
 
-@router.get("/{book_id}", response_model=schemas.BookOut)
-async def get_book_byid(book_id: int, db=Depends(database.get_db), current_user=Depends(get_current_user)):
+@router.get("/search", response_model=schemas.BookSearchPage)
+async def search_books(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db=Depends(database.get_async_db)
+):
+    # Only word characters reach to_tsquery, so user input cannot break the query syntax
+    terms = re.findall(r"\w+", q.lower())
+    if not terms:
+        return {"items": [], "next_offset": None}
+    tsquery = " & ".join(f"{term}:*" for term in terms)
+    # trigram indexes cannot serve patterns shorter than 3 characters; NULL disables the ILIKE branch
+    pattern = None
+    if len(q.strip()) >= 3:
+        pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+    try:
+        await db.execute(SEARCH_BOOKS_QUERY, (q, tsquery, pattern, limit + 1, offset))
+        books = await db.fetchall()
+    except Exception as e:
+        logger.error(f"Error searching books: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while searching books."
+        )
+
+    next_offset = None
+    if len(books) > limit:
+        books = books[:limit]
+        next_offset = offset + limit
+    return {"items": books, "next_offset": next_offset}
+
+@router.get("/availability", response_model=List[schemas.BookAvailabilityEntry])
+async def get_books_availability(
+    ids: List[int] = Query(..., max_length=500, description="Repeat for each book: ?ids=1&ids=2"),
+    db=Depends(database.get_async_db)
+):
+    try:
+        await db.execute(GET_AVAILABILITY_BY_BOOKS_QUERY, (ids,))
+        return await db.fetchall()
+    except Exception as e:
+        logger.error(f"Error retrieving book availability: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving book availability."
+        )
+
+@router.get("/{book_id}", response_model=schemas.BookExpandedOut, response_model_exclude_unset=True)
+async def get_book_byid(
+    book_id: int,
+    include: Optional[str] = Query(None, description="Comma separated: authors, copies, availability"),
+    db=Depends(database.get_async_db),
+    current_user=Depends(get_current_user)
+):
     if current_user['role'] != 'admin':
         
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have access to this resource"
         )
-    db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
-    book = db.fetchone()
+    expansions = parse_include(include)
+    await db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
+    book = await db.fetchone()
 
     if not book:
         raise HTTPException(
@@ -140,14 +365,28 @@ async def get_book_byid(book_id: int, db=Depends(database.get_db), current_user=
             detail=f"Book with id {book_id} does not exist!"
         )
 
+    await expand_books(db, [book], expansions)
     return book
 
 
+@router.get("/{book_id}/availability", response_model=schemas.BookAvailabilityOut)
+async def get_book_availability(book_id: int, db=Depends(database.get_async_db)):
+    await db.execute(GET_AVAILABILITY_BY_BOOKS_QUERY, ([book_id],))
+    availability = await db.fetchone()
+
+    if not availability:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with id {book_id} does not exist!"
+        )
+    return availability
+
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_book_byid(book_id: int, db=Depends(database.get_db)):
+async def delete_book_byid(book_id: int, db=Depends(database.get_async_db)):
     try:
-        db.execute(DELETE_BOOK_BY_ID_QUERY, (book_id,))
-        db.connection.commit()
+        await db.execute(DELETE_BOOK_BY_ID_QUERY, (book_id,))
+        await db.connection.commit()
+        await response_cache.invalidate_async(f"book:{book_id}")
 
         if db.rowcount == 0:
             raise HTTPException(
@@ -157,7 +396,7 @@ async def delete_book_byid(book_id: int, db=Depends(database.get_db)):
 
         logger.info(f"Book with id {book_id} deleted successfully.")
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error deleting book with id {book_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -166,11 +405,11 @@ async def delete_book_byid(book_id: int, db=Depends(database.get_db)):
 
 
 @router.put("/{book_id}", status_code=status.HTTP_200_OK, response_model=schemas.BookOut)
-async def update_book_byid(book_id: int, new_book: schemas.BookCreate, db=Depends(database.get_db)):
+async def update_book_byid(book_id: int, new_book: schemas.BookCreate, db=Depends(database.get_async_db)):
     try:
         # 嚙踝蕭戙猁嚙踝蕭嚙蝓蛛蕭芞嚙踝蕭嚙褒瘀蕭嚙踝蕭嚙�
-        db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
-        old_book = db.fetchone()
+        await db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
+        old_book = await db.fetchone()
         if not old_book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -178,18 +417,19 @@ async def update_book_byid(book_id: int, new_book: schemas.BookCreate, db=Depend
             )
 
         # 嚙踝蕭嚙踝蕭芞嚙踝蕭
-        db.execute(UPDATE_BOOK_BY_ID_QUERY, (new_book.b_name, new_book.topic, book_id))
-        db.connection.commit()
+        await db.execute(UPDATE_BOOK_BY_ID_QUERY, (new_book.b_name, new_book.topic, book_id))
+        await db.connection.commit()
+        await response_cache.invalidate_async(f"book:{book_id}")
 
         # 龰嚙衛賂蕭嚙蝓綽蕭嚙談潘蕭嚙�?
-        db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
-        updated_book = db.fetchone()
+        await db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
+        updated_book = await db.fetchone()
 
         logger.info(f"Book with id {book_id} updated successfully: {updated_book}")
         return updated_book
 
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error updating book with id {book_id}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -200,11 +440,11 @@ async def update_book_byid(book_id: int, new_book: schemas.BookCreate, db=Depend
 
 # 嚙衛鳴蕭嚙踝蕭嚙踝蕭橦棹潘蕭嚙踝蕭嚙踝蕭嚙課鳴蕭嚙踝蕭繕嚙篁tml珜嚙賣ㄛ嚙踝蕭嚙踝蕭嚙踝蕭嚙踝蕭埴橦棹潘蕭嚙踝蕭嚙踝蕭嚙踝蕭洘嚙踝蕭嚙踝蕭嚙踝蕭嚙踝蕭虒嚙踝蕭嚙踝蕭嚙箱all嚙踝蕭嚙窮pi嚙踝蕭嚙踝蕭嚙踝蕭嚙賤掛芞嚙踝蕭嚙踝蕭繕譫嚙踝蕭嚙�
 @router.post("/{book_id}/copy", status_code=status.HTTP_201_CREATED, response_model=schemas.BookCopyOut)
-async def add_book_copy(book_id: int, copy: schemas.BookCopyCreate, db=Depends(database.get_db)):
+async def add_book_copy(book_id: int, copy: schemas.BookCopyCreate, db=Depends(database.get_async_db)):
     try:
         # 嚙賡艘嚙賤掛嚙踝蕭嚙褒瘀蕭嚙踝蕭嚙�
-        db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
-        book = db.fetchone()
+        await db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
+        book = await db.fetchone()
         if not book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -212,15 +452,15 @@ async def add_book_copy(book_id: int, copy: schemas.BookCopyCreate, db=Depends(d
             )
 
         # 嚙踝蕭嚙踝蕭嚙蝓腔賂蕭嚙踝蕭
-        db.execute(ADD_BOOK_COPY_QUERY, (book_id, copy.status))
-        added_copy = db.fetchone()
-        db.connection.commit()
+        await db.execute(ADD_BOOK_COPY_QUERY, (book_id, copy.status))
+        added_copy = await db.fetchone()
+        await db.connection.commit()
 
         # 嚙踝蕭嚙踝蕭嚙蝓賂蕭嚙踝蕭嚙踝蕭嚙踝蕭嚙踝蕭嚙誕�?
         logger.info(f"Book copy added successfully: {added_copy}")
         return added_copy
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error adding book copy: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -230,11 +470,11 @@ async def add_book_copy(book_id: int, copy: schemas.BookCopyCreate, db=Depends(d
 
 # 嚙衛鳴蕭嚙誹脤艘芞嚙踝蕭珜嚙踝蕭嚙踝蕭嚙賡艘嚙踝蕭嚙請賂蕭嚙踝蕭嚙談選蕭嚙踝蕭嚙踝蕭尨嚙踝蕭嚙踝蕭嚙踝蕭嚙踝蕭邽嚙踝蕭嚙�?
 @router.get("/{book_id}/copies", response_model=List[schemas.BookCopyOut])
-async def get_book_copies(book_id: int, db=Depends(database.get_db)):
+async def get_book_copies(book_id: int, db=Depends(database.get_async_db)):
     try:
         # 嚙踝蕭嚙踝蕭漹橘蕭嚙踝蕭セ嚙踝蕭嚙踝�?
-        db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
-        book = db.fetchone()
+        await db.execute(GET_BOOK_BY_ID_QUERY, (book_id,))
+        book = await db.fetchone()
         if not book:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -242,8 +482,8 @@ async def get_book_copies(book_id: int, db=Depends(database.get_db)):
             )
 
         # 龰嚙踝蕭嚙踝蕭嚙踝蕭嚙賤掛嚙踝蕭譫嚙踝蕭嚙�
-        db.execute(GET_BOOK_COPIES_QUERY, (book_id,))
-        copies = db.fetchall()
+        await db.execute(GET_BOOK_COPIES_QUERY, (book_id,))
+        copies = await db.fetchall()
 
         logger.info(f"Retrieved {len(copies)} copies for book id {book_id}")
         return copies
@@ -256,14 +496,15 @@ async def get_book_copies(book_id: int, db=Depends(database.get_db)):
     
 # Add author to a book
 @router.post("/{book_id}/authors", status_code=status.HTTP_201_CREATED)
-async def add_author_to_book(book_id: int, author_id: int, db=Depends(database.get_db)):
+async def add_author_to_book(book_id: int, author_id: int, db=Depends(database.get_async_db)):
     try:
-        db.execute(ADD_BOOK_AUTHOR_QUERY, (book_id, author_id))
-        relationship = db.fetchone()
-        db.connection.commit()
+        await db.execute(ADD_BOOK_AUTHOR_QUERY, (book_id, author_id))
+        relationship = await db.fetchone()
+        await db.connection.commit()
+        await response_cache.invalidate_async(f"book:{book_id}")
         return relationship
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error adding author to book: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -272,16 +513,16 @@ async def add_author_to_book(book_id: int, author_id: int, db=Depends(database.g
 
 # Get authors of a book
 @router.get("/{book_id}/authors", response_model=List[schemas.AuthorOut])
-async def get_authors_of_book(book_id: int, db=Depends(database.get_db)):
-    db.execute(GET_AUTHORS_BY_BOOK_QUERY, (book_id,))
-    authors = db.fetchall()
+async def get_authors_of_book(book_id: int, db=Depends(database.get_async_db)):
+    await db.execute(GET_AUTHORS_BY_BOOK_QUERY, (book_id,))
+    authors = await db.fetchall()
     return authors
 
 @router.delete("/{book_id}/copy/{copy_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book_copy(
     book_id: int,
     copy_id: int,
-    db=Depends(database.get_db),
+    db=Depends(database.get_async_db),
     current_user=Depends(get_current_user)
 ):
     if current_user['role'] != 'admin':
@@ -292,23 +533,23 @@ async def delete_book_copy(
     
     try:
         # First verify the copy belongs to the book
-        db.execute("""
+        await db.execute("""
             SELECT copy_id FROM hzs_book_copy 
             WHERE copy_id = %s AND book_id = %s
         """, (copy_id, book_id))
         
-        if not db.fetchone():
+        if not await db.fetchone():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Book copy not found"
             )
         
         # Delete the copy
-        db.execute(DELETE_BOOK_COPY_QUERY, (copy_id,))
-        db.connection.commit()
+        await db.execute(DELETE_BOOK_COPY_QUERY, (copy_id,))
+        await db.connection.commit()
         
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
@@ -317,7 +558,7 @@ async def delete_book_copy(
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(
     book_id: int,
-    db=Depends(database.get_db),
+    db=Depends(database.get_async_db),
     current_user=Depends(get_current_user)
 ):
     if current_user['role'] != 'admin':
@@ -328,17 +569,18 @@ async def delete_book(
     
     try:
         # First delete all copies of the book
-        db.execute("""
+        await db.execute("""
             DELETE FROM hzs_book_copy
             WHERE book_id = %s
         """, (book_id,))
         
         # Then delete the book
-        db.execute(DELETE_BOOK_QUERY, (book_id,))
-        db.connection.commit()
+        await db.execute(DELETE_BOOK_QUERY, (book_id,))
+        await db.connection.commit()
+        await response_cache.invalidate_async(f"book:{book_id}")
         
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
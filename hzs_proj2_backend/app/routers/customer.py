@@ -1,6 +1,8 @@
 from fastapi import status, HTTPException, Depends, APIRouter
-from .. import schemas, utils
-from ..database import get_db
+from psycopg2 import errors
+from .. import database, schemas, utils
+from ..database import get_async_db
+from ..oauth2 import get_current_user, invalidate_user
 
 router = APIRouter(
     prefix="/customer", # prefix of all paths in this router
@@ -13,23 +15,35 @@ CREATE_CUSTOMER_QUERY = """
     RETURNING customer_id, l_name, f_name, phone, email, id_type, id_num, role
 """
 
+UPDATE_CUSTOMER_ROLE_QUERY = """
+    UPDATE hzs_customer
+    SET role = %s
+    WHERE customer_id = %s
+    RETURNING customer_id, l_name, f_name, phone, email, id_type, id_num, role
+"""
+
+DELETE_CUSTOMER_QUERY = """
+    DELETE FROM hzs_customer
+    WHERE customer_id = %s
+"""
+
 @router.get('/')
 async def root():
     return {"message": "This is a customer"}
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.CustomerOut)
-async def create_customer(customer: schemas.CustomerCreate, db=Depends(get_db)):
-    # Hash the password
-    hashed_password = utils.hash(customer.password)
+async def create_customer(customer: schemas.CustomerCreate):
+    # Hash the password before checking out a connection, so a queued hash does not hold one
+    hashed_password = await utils.hash_async(customer.password)
     customer.password = hashed_password
 
     # Insert the new customer into the database
-    db.execute(
-        CREATE_CUSTOMER_QUERY,
-        (customer.l_name, customer.f_name, customer.phone, customer.email, customer.id_type, customer.id_num, customer.password, customer.role)
-    )
-    new_customer = db.fetchone()
-    db.connection.commit()
+    async with database.async_cursor() as db:
+        await db.execute(
+            CREATE_CUSTOMER_QUERY,
+            (customer.l_name, customer.f_name, customer.phone, customer.email, customer.id_type, customer.id_num, customer.password, customer.role)
+        )
+        new_customer = await db.fetchone()
 
     return new_customer
 
@@ -38,9 +52,9 @@ async def create_customer(customer: schemas.CustomerCreate, db=Depends(get_db)):
 
 
 @router.get("/{customer_id}", response_model=schemas.CustomerOut)
-async def get_customer(customer_id: int, db=Depends(get_db)):
-    db.execute("""SELECT customer_id, l_name, f_name, phone, email, id_type, id_num FROM hzs_customer WHERE customer_id = %s""", (customer_id,))
-    customer = db.fetchone()
+async def get_customer(customer_id: int, db=Depends(get_async_db)):
+    await db.execute("""SELECT customer_id, l_name, f_name, phone, email, id_type, id_num FROM hzs_customer WHERE customer_id = %s""", (customer_id,))
+    customer = await db.fetchone()
 
     if not customer:
         raise HTTPException(
@@ -48,4 +62,55 @@ async def get_customer(customer_id: int, db=Depends(get_db)):
             detail=f"customer with id {id} does not exist"
         )
 
-    return customer
\ No newline at end of file
+    return customer
+
+
+@router.put("/{customer_id}/role", response_model=schemas.CustomerOut)
+async def update_customer_role(
+    customer_id: int,
+    update: schemas.CustomerRoleUpdate,
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    if current_user['role'] != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have access to this resource"
+        )
+
+    await db.execute(UPDATE_CUSTOMER_ROLE_QUERY, (update.role, customer_id))
+    customer = await db.fetchone()
+    if not customer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"customer with id {customer_id} does not exist"
+        )
+    await db.connection.commit()
+    invalidate_user(customer_id)
+
+    return customer
+
+
+@router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_customer(customer_id: int, db=Depends(get_async_db), current_user=Depends(get_current_user)):
+    if current_user['role'] != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have access to this resource"
+        )
+
+    try:
+        await db.execute(DELETE_CUSTOMER_QUERY, (customer_id,))
+    except errors.ForeignKeyViolation:
+        await db.connection.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"customer with id {customer_id} still has rentals, room reservations or exhibition access records and cannot be deleted"
+        )
+    if db.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"customer with id {customer_id} does not exist"
+        )
+    await db.connection.commit()
+    invalidate_user(customer_id)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from .. import schemas, database, oauth2
+from .. import schemas, database, oauth2, response_cache
 from typing import List
 
 router = APIRouter(
@@ -8,7 +8,7 @@ router = APIRouter(
 )
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_event(event: schemas.EventCreate, db=Depends(database.get_db), current_user=Depends(oauth2.get_current_user)):
+async def create_event(event: schemas.EventCreate, db=Depends(database.get_async_db), current_user=Depends(oauth2.get_current_user)):
     # Check if user is admin
     if current_user["role"] != "admin":
         raise HTTPException(
@@ -17,32 +17,33 @@ async def create_event(event: schemas.EventCreate, db=Depends(database.get_db),
         )
     
     # Insert into HZS_EVENT
-    db.execute("""
+    await db.execute("""
         INSERT INTO hzs_event (e_name, event_type, start_datetime, stop_datetime, topic)
         VALUES (%s, %s, %s, %s, %s)
         RETURNING event_id
     """, (event.e_name, event.event_type, event.start_datetime, event.stop_datetime, event.topic))
     
-    new_event = db.fetchone()
-    db.connection.commit()
+    new_event = await db.fetchone()
+    await db.connection.commit()
     
     # Insert into specific event type table
     if event.event_type == 'E':
-        db.execute("""
+        await db.execute("""
             INSERT INTO hzs_exhibition (event_id, expense)
             VALUES (%s, %s)
         """, (new_event['event_id'], event.expense))
     else:  # event_type == 'S'
-        db.execute("""
+        await db.execute("""
             INSERT INTO hzs_seminar (event_id, descrip)
             VALUES (%s, %s)
         """, (new_event['event_id'], event.descrip))
     
-    db.connection.commit()
+    await db.connection.commit()
+    await response_cache.invalidate_async("exhibitions" if event.event_type == 'E' else "seminars")
     return new_event
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_event(event_id: int, db=Depends(database.get_db), current_user=Depends(oauth2.get_current_user)):
+async def delete_event(event_id: int, db=Depends(database.get_async_db), current_user=Depends(oauth2.get_current_user)):
     # Check if user is admin
     if current_user["role"] != "admin":
         raise HTTPException(
@@ -51,8 +52,8 @@ async def delete_event(event_id: int, db=Depends(database.get_db), current_user=
         )
     
     # Get event type
-    db.execute("SELECT event_type FROM hzs_event WHERE event_id = %s", (event_id,))
-    event = db.fetchone()
+    await db.execute("SELECT event_type FROM hzs_event WHERE event_id = %s", (event_id,))
+    event = await db.fetchone()
     
     if not event:
         raise HTTPException(
@@ -63,19 +64,20 @@ async def delete_event(event_id: int, db=Depends(database.get_db), current_user=
     # Delete from specific event type table first
     if event['event_type'] == 'E':
         # First delete related records in hzs_exhibition_access
-        db.execute("DELETE FROM hzs_exhibition_access WHERE event_id = %s", (event_id,))
+        await db.execute("DELETE FROM hzs_exhibition_access WHERE event_id = %s", (event_id,))
         # Then delete from hzs_exhibition
-        db.execute("DELETE FROM hzs_exhibition WHERE event_id = %s", (event_id,))
+        await db.execute("DELETE FROM hzs_exhibition WHERE event_id = %s", (event_id,))
     else:  # event_type == 'S'
         # 先删 sponsor 关系
-        db.execute("DELETE FROM hzs_seminar_sponsor WHERE event_id = %s", (event_id,))
+        await db.execute("DELETE FROM hzs_seminar_sponsor WHERE event_id = %s", (event_id,))
         # First delete related records in hzs_seminar_access
-        db.execute("DELETE FROM hzs_seminar_access WHERE event_id = %s", (event_id,))
+        await db.execute("DELETE FROM hzs_seminar_access WHERE event_id = %s", (event_id,))
         # Then delete from hzs_seminar
-        db.execute("DELETE FROM hzs_seminar WHERE event_id = %s", (event_id,))
+        await db.execute("DELETE FROM hzs_seminar WHERE event_id = %s", (event_id,))
     
     # Finally delete from main event table
-    db.execute("DELETE FROM hzs_event WHERE event_id = %s", (event_id,))
-    db.connection.commit()
+    await db.execute("DELETE FROM hzs_event WHERE event_id = %s", (event_id,))
+    await db.connection.commit()
+    await response_cache.invalidate_async("exhibitions" if event['event_type'] == 'E' else "seminars")
     
     return None 
\ No newline at end of file
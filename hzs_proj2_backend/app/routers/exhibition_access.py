@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from app import schemas
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.oauth2 import get_current_user
 
 router = APIRouter(prefix="/exhibitions/{event_id}/registrations", tags=["exhibition-access"])
@@ -35,7 +35,7 @@ def list_registrations(event_id: int, db = Depends(get_db)):
     return db.fetchall()
 
 @router.delete("/{registration_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_registration(event_id: int, registration_id: int, db=Depends(get_db), current_user=Depends(get_current_user)):
+async def delete_registration(event_id: int, registration_id: int, db=Depends(get_async_db), current_user=Depends(get_current_user)):
     # Check if user is admin
     if current_user["role"] != "admin":
         raise HTTPException(
@@ -43,7 +43,7 @@ async def delete_registration(event_id: int, registration_id: int, db=Depends(ge
             detail="Not authorized to perform this action"
         )
     # Delete the registration
-    db.execute(
+    await db.execute(
         "DELETE FROM hzs_exhibition_access WHERE registration_id = %s AND event_id = %s",
         (registration_id, event_id)
     )
@@ -52,5 +52,5 @@ async def delete_registration(event_id: int, registration_id: int, db=Depends(ge
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Registration not found"
         )
-    db.connection.commit()
+    await db.connection.commit()
     return None
@@ -1,7 +1,8 @@
 # app/routers/exhibitions.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from app import schemas
-from app.database import get_db
+from app import schemas, response_cache
+from app.database import get_db, get_async_db
+from app.fast_json import TrustedJSONResponse, fetch_trusted
 from typing import List
 from app.oauth2 import get_current_user
 
@@ -10,6 +11,8 @@ router = APIRouter(
     tags=["exhibitions"]
 )
 
+response_cache.cache_route(f"{router.prefix}/", tags=["exhibitions"])
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -47,6 +50,7 @@ def create_exhibition(
     ))
 
     db.connection.commit()
+    response_cache.invalidate("exhibitions")
 
     return {
         "event_id":       new_event["event_id"],
@@ -58,35 +62,25 @@ def create_exhibition(
         "expense":        exh.expense
     }
 
+# rows go straight to JSON (app/fast_json.py), so the columns are cast to ExhibitionOut's types
+LIST_EXHIBITIONS_QUERY = """
+    SELECT e.event_id::int8 AS event_id, e.e_name, e.topic,
+           e.start_datetime, e.stop_datetime,
+           e.event_type, x.expense::float8 AS expense
+    FROM hzs_event e
+    JOIN hzs_exhibition x
+      ON e.event_id = x.event_id
+    WHERE e.event_type = 'E'
+    ORDER BY e.start_datetime
+"""
+
 @router.get(
     "/",
     response_model=List[schemas.ExhibitionOut]
 )
 def list_exhibitions(db = Depends(get_db)):
-    query = """
-        SELECT e.event_id, e.e_name, e.topic,
-               e.start_datetime, e.stop_datetime,
-               e.event_type, x.expense
-        FROM hzs_event e
-        JOIN hzs_exhibition x
-          ON e.event_id = x.event_id
-        WHERE e.event_type = 'E'
-        ORDER BY e.start_datetime
-    """
-    db.execute(query)
-    rows = db.fetchall()
-    return [
-        {
-          "event_id":        r["event_id"],
-          "e_name":          r["e_name"],
-          "topic":           r["topic"],
-          "start_datetime":  r["start_datetime"],
-          "stop_datetime":   r["stop_datetime"],
-          "event_type":      r["event_type"],
-          "expense":         r["expense"]
-        }
-        for r in rows
-    ]
+    rows = fetch_trusted(db, LIST_EXHIBITIONS_QUERY, None, schemas.ExhibitionOut)
+    return TrustedJSONResponse(rows)
 
 @router.get(
     "/{event_id}",
@@ -121,7 +115,7 @@ def get_exhibition(event_id: int, db = Depends(get_db)):
     }
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_exhibition(event_id: int, db=Depends(get_db), current_user=Depends(get_current_user)):
+async def delete_exhibition(event_id: int, db=Depends(get_async_db), current_user=Depends(get_current_user)):
     # Check if user is admin
     if current_user["role"] != "admin":
         raise HTTPException(
@@ -130,13 +124,14 @@ async def delete_exhibition(event_id: int, db=Depends(get_db), current_user=Depe
         )
     
     # First delete related records in hzs_exhibition_access
-    db.execute("DELETE FROM hzs_exhibition_access WHERE event_id = %s", (event_id,))
+    await db.execute("DELETE FROM hzs_exhibition_access WHERE event_id = %s", (event_id,))
     
     # Then delete from hzs_exhibition
-    db.execute("DELETE FROM hzs_exhibition WHERE event_id = %s", (event_id,))
+    await db.execute("DELETE FROM hzs_exhibition WHERE event_id = %s", (event_id,))
     
     # Finally delete from main event table
-    db.execute("DELETE FROM hzs_event WHERE event_id = %s", (event_id,))
+    await db.execute("DELETE FROM hzs_event WHERE event_id = %s", (event_id,))
     
-    db.connection.commit()
+    await db.connection.commit()
+    await response_cache.invalidate_async("exhibitions")
     return None
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from app import schemas
-from app.database import get_db
+from app.database import get_async_db
 from app.oauth2 import get_current_user
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
 
 @router.get("/unpaid", response_model=List[dict])
-def get_unpaid_invoices(db=Depends(get_db), current_user=Depends(get_current_user)):
+async def get_unpaid_invoices(db=Depends(get_async_db), current_user=Depends(get_current_user)):
     sql = '''
         SELECT i.invoice_id, i.invoice_date, i.invoic__amount, i.rental_id
         FROM hzs_invoice i
@@ -19,12 +19,12 @@ def get_unpaid_invoices(db=Depends(get_db), current_user=Depends(get_current_use
           )
         ORDER BY i.invoice_date DESC
     '''
-    db.execute(sql, (current_user["user_id"],))
-    return db.fetchall()
+    await db.execute(sql, (current_user["user_id"],))
+    return await db.fetchall()
 
 
 @router.post("/pay/{invoice_id}", status_code=status.HTTP_201_CREATED)
-def pay_invoice(invoice_id: int, payment: schemas.PaymentCreate, db=Depends(get_db), current_user=Depends(get_current_user)):
+async def pay_invoice(invoice_id: int, payment: schemas.PaymentCreate, db=Depends(get_async_db), current_user=Depends(get_current_user)):
 
     sql_check = '''
         SELECT i.invoice_id, i.invoic__amount, r.customer_id
@@ -32,13 +32,13 @@ def pay_invoice(invoice_id: int, payment: schemas.PaymentCreate, db=Depends(get_
         JOIN hzs_rental r ON i.rental_id = r.rental_id
         WHERE i.invoice_id = %s
     '''
-    db.execute(sql_check, (invoice_id,))
-    inv = db.fetchone()
+    await db.execute(sql_check, (invoice_id,))
+    inv = await db.fetchone()
     if not inv or inv["customer_id"] != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="无权支付该账单")
 
-    db.execute("SELECT 1 FROM hzs_payment WHERE invoice_id = %s", (invoice_id,))
-    if db.fetchone():
+    await db.execute("SELECT 1 FROM hzs_payment WHERE invoice_id = %s", (invoice_id,))
+    if await db.fetchone():
         raise HTTPException(status_code=400, detail="该账单已支付")
 
     sql_pay = '''
@@ -46,9 +46,9 @@ def pay_invoice(invoice_id: int, payment: schemas.PaymentCreate, db=Depends(get_
         VALUES (DEFAULT, NOW(), %s, %s, %s, %s, %s)
         RETURNING payment_id, payment_date, amount
     '''
-    db.execute(sql_pay, (
+    await db.execute(sql_pay, (
         payment.method, payment.card_holder_l_name, payment.card_holder_f_name, inv["invoic__amount"], invoice_id
     ))
-    pay = db.fetchone()
-    db.connection.commit()
+    pay = await db.fetchone()
+    await db.connection.commit()
     return pay 
\ No newline at end of file
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from .. import schemas, database
+from ..config import settings
+from ..fast_json import RawJSONResponse, fetch_json
 from typing import List
+from psycopg2 import errors
 import logging
 
 logging.basicConfig(
@@ -27,18 +30,50 @@ GET_RENTAL_BY_ID_QUERY = """
     WHERE rental_id = %s
 """
 
-UPDATE_RENTAL_RETURN_DATE_QUERY = """
-    UPDATE hzs_rental
-    SET actual_return_date = %s, rental_status = 'RETURNED'
-    WHERE rental_id = %s
-    RETURNING rental_id, rental_status, borrow_date, expected_return_date, actual_return_date, customer_id, copy_id
+# Closes an open rental and frees its copy in one statement. The rental becomes LATE when it
+# comes back after expected_return_date, otherwise RETURNED.
+RETURN_RENTAL_QUERY = """
+    WITH returned AS (
+        UPDATE hzs_rental r
+        SET actual_return_date = v.returned_at,
+            rental_status = CASE WHEN v.returned_at > r.expected_return_date THEN 'LATE' ELSE 'RETURNED' END
+        FROM (SELECT %s::timestamp AS returned_at) v
+        WHERE r.rental_id = %s AND r.actual_return_date IS NULL
+        RETURNING r.rental_id, r.rental_status, r.borrow_date, r.expected_return_date,
+                  r.actual_return_date, r.customer_id, r.copy_id
+    ), released AS (
+        UPDATE hzs_book_copy c
+        SET status = 'AVAILABLE'
+        FROM returned
+        WHERE c.copy_id = returned.copy_id
+    )
+    SELECT * FROM returned
 """
 
-UPDATE_LATE_RENTAL_RETURN_DATE_QUERY = """
-    UPDATE hzs_rental
-    SET actual_return_date = %s, rental_status = 'LATE'
-    WHERE rental_id = %s
-    RETURNING rental_id, rental_status, borrow_date, expected_return_date, actual_return_date, customer_id, copy_id
+# Same as RETURN_RENTAL_QUERY for the open rentals of many copies. Rentals are locked in
+# rental_id order so overlapping batches cannot deadlock each other.
+RETURN_COPIES_QUERY = """
+    WITH locked AS (
+        SELECT rental_id
+        FROM hzs_rental
+        WHERE copy_id = ANY(%s) AND actual_return_date IS NULL
+        ORDER BY rental_id
+        FOR UPDATE
+    ), returned AS (
+        UPDATE hzs_rental r
+        SET actual_return_date = v.returned_at,
+            rental_status = CASE WHEN v.returned_at > r.expected_return_date THEN 'LATE' ELSE 'RETURNED' END
+        FROM locked, (SELECT %s::timestamp AS returned_at) v
+        WHERE r.rental_id = locked.rental_id
+        RETURNING r.rental_id, r.rental_status, r.borrow_date, r.expected_return_date,
+                  r.actual_return_date, r.customer_id, r.copy_id
+    ), released AS (
+        UPDATE hzs_book_copy c
+        SET status = 'AVAILABLE'
+        FROM returned
+        WHERE c.copy_id = returned.copy_id
+    )
+    SELECT * FROM returned ORDER BY copy_id
 """
 
 GET_RENTALS_BY_CUSTOMER_QUERY = """
@@ -53,17 +88,46 @@ UPDATE_BOOK_COPY_STATUS_QUERY = """
     WHERE copy_id = %s
 """
 
+# Claims any free copy of a book and opens the rental in one round trip. SKIP LOCKED lets
+# concurrent borrowers of the same title walk past copies another transaction is claiming
+# instead of queueing on their row locks. The availability triggers only insert delta rows
+# (app/availability.py), so the per-title counters are no queue either.
+CHECKOUT_BOOK_QUERY = """
+    WITH picked AS (
+        SELECT copy_id
+        FROM hzs_book_copy
+        WHERE book_id = %s AND status = 'AVAILABLE'
+        ORDER BY copy_id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    ), claimed AS (
+        UPDATE hzs_book_copy c
+        SET status = 'UNAVAILABLE'
+        FROM picked
+        WHERE c.copy_id = picked.copy_id
+        RETURNING c.copy_id
+    )
+    INSERT INTO hzs_rental (rental_status, borrow_date, expected_return_date, customer_id, copy_id)
+    SELECT 'BORROWED', %s, %s, %s, copy_id
+    FROM claimed
+    RETURNING rental_id, rental_status, borrow_date, expected_return_date, actual_return_date, customer_id, copy_id
+"""
+
+BOOK_EXISTS_QUERY = """
+    SELECT 1 FROM hzs_book WHERE book_id = %s
+"""
+
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=schemas.RentalOut)
-async def create_rental(rental: schemas.RentalCreate, db=Depends(database.get_db)):
+async def create_rental(rental: schemas.RentalCreate, db=Depends(database.get_async_db)):
     logger.info(f"Received request to create rental: {rental}")
     try:
 
         # Check if the book copy is available
         # prevent race conditions
-        db.execute("SELECT status FROM hzs_book_copy WHERE copy_id = %s FOR UPDATE", (rental.copy_id,))
-        book_copy = db.fetchone()
+        await db.execute("SELECT status FROM hzs_book_copy WHERE copy_id = %s FOR UPDATE", (rental.copy_id,))
+        book_copy = await db.fetchone()
         logger.debug(f"Checking book copy status for copy_id: {rental.copy_id}")
         logger.debug(f"Book copy status: {book_copy}")
         logger.debug(f"Creating rental with data: {rental}")
@@ -74,27 +138,27 @@ async def create_rental(rental: schemas.RentalCreate, db=Depends(database.get_db
             )
 
         # Create the rental
-        db.execute(ADD_RENTAL_QUERY, (
+        await db.execute(ADD_RENTAL_QUERY, (
             'BORROWED',
             rental.borrow_date,
             rental.expected_return_date,
             rental.customer_id,
             rental.copy_id
         ))
-        new_rental = db.fetchone()
+        new_rental = await db.fetchone()
 
         # Update the book copy status to 'UNAVAILABLE'
-        db.execute(UPDATE_BOOK_COPY_STATUS_QUERY, ('UNAVAILABLE', rental.copy_id))
-        db.connection.commit()
+        await db.execute(UPDATE_BOOK_COPY_STATUS_QUERY, ('UNAVAILABLE', rental.copy_id))
+        await db.connection.commit()
 
         logger.info(f"Rental created successfully: {new_rental}")
         return new_rental
     except HTTPException:
-        db.connection.rollback()
+        await db.connection.rollback()
         raise
     except Exception as e:
         
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error creating rental: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -102,11 +166,48 @@ async def create_rental(rental: schemas.RentalCreate, db=Depends(database.get_db
         )
 
 
+@router.post("/checkout", status_code=status.HTTP_201_CREATED, response_model=schemas.RentalOut)
+async def checkout_book(checkout: schemas.RentalCheckout, db=Depends(database.get_async_db)):
+    try:
+        await db.execute(CHECKOUT_BOOK_QUERY, (
+            checkout.book_id,
+            checkout.borrow_date,
+            checkout.expected_return_date,
+            checkout.customer_id
+        ))
+        new_rental = await db.fetchone()
+        if not new_rental:
+            await db.execute(BOOK_EXISTS_QUERY, (checkout.book_id,))
+            if not await db.fetchone():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Book with id {checkout.book_id} does not exist!"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="No copy of this book is currently available."
+            )
+        await db.connection.commit()
+
+        logger.info(f"Checked out copy {new_rental['copy_id']} of book {checkout.book_id}: {new_rental}")
+        return new_rental
+    except HTTPException:
+        await db.connection.rollback()
+        raise
+    except Exception as e:
+        await db.connection.rollback()
+        logger.error(f"Error checking out book: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while checking out the book."
+        )
+
+
 @router.get("/{rental_id}", response_model=schemas.RentalOut)
-async def get_rental_by_id(rental_id: int, db=Depends(database.get_db)):
+async def get_rental_by_id(rental_id: int, db=Depends(database.get_async_db)):
     try:
-        db.execute(GET_RENTAL_BY_ID_QUERY, (rental_id,))
-        rental = db.fetchone()
+        await db.execute(GET_RENTAL_BY_ID_QUERY, (rental_id,))
+        rental = await db.fetchone()
 
         if not rental:
             raise HTTPException(
@@ -124,56 +225,71 @@ async def get_rental_by_id(rental_id: int, db=Depends(database.get_db)):
         )
 
 
+def _wall_clock(moment):
+    # hzs_rental stores TIMESTAMP without time zone; keep the wall-clock time the client sent
+    return moment.replace(tzinfo=None)
+
+
 @router.put("/{rental_id}/return", response_model=schemas.RentalOut)
 async def return_rental(
     rental_id: int,
     rental_return: schemas.RentalReturn,
-    db=Depends(database.get_db),
+    db=Depends(database.get_async_db),
 ):
     try:
-        db.execute(GET_RENTAL_BY_ID_QUERY, (rental_id,))
-        rental = db.fetchone()
-        if not rental:
-            raise HTTPException(status_code=404, detail="Rental not found")
-
-        actual = rental_return.actual_return_date
-        expected = rental["expected_return_date"]
-
-
-        if actual.tzinfo is not None:
-            actual = actual.replace(tzinfo=None)
-        if expected.tzinfo is not None:
-            expected = expected.replace(tzinfo=None)
-
-        is_late = actual > expected
-        if is_late:
-            db.execute(UPDATE_LATE_RENTAL_RETURN_DATE_QUERY, (actual, rental_id))
-        else:
-            db.execute(UPDATE_RENTAL_RETURN_DATE_QUERY, (actual, rental_id))
-
-        updated = db.fetchone()
+        await db.execute(RETURN_RENTAL_QUERY, (_wall_clock(rental_return.actual_return_date), rental_id))
+        updated = await db.fetchone()
         if not updated:
-            raise HTTPException(status_code=404, detail="Rental not found")
+            await db.execute(GET_RENTAL_BY_ID_QUERY, (rental_id,))
+            if not await db.fetchone():
+                raise HTTPException(status_code=404, detail="Rental not found")
+            raise HTTPException(status_code=409, detail="Rental has already been returned")
 
-        db.execute(UPDATE_BOOK_COPY_STATUS_QUERY, ("AVAILABLE", updated["copy_id"]))
-        db.connection.commit()
+        await db.connection.commit()
         return updated
 
     except HTTPException:
-        db.connection.rollback()
+        await db.connection.rollback()
         raise
+    except errors.CheckViolation:
+        await db.connection.rollback()
+        raise HTTPException(status_code=400, detail="Return date cannot be before the borrow date.")
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error returning rental: {e}")
         raise HTTPException(status_code=500, detail="An error occurred while returning the rental.")
 
 
+@router.post("/return", response_model=schemas.RentalBatchReturnOut)
+async def return_copies(batch: schemas.RentalBatchReturn, db=Depends(database.get_async_db)):
+    copy_ids = list(dict.fromkeys(batch.copy_ids))
+    try:
+        await db.execute(RETURN_COPIES_QUERY, (copy_ids, _wall_clock(batch.actual_return_date)))
+        returned = await db.fetchall()
+        await db.connection.commit()
+    except errors.CheckViolation:
+        await db.connection.rollback()
+        raise HTTPException(status_code=400, detail="Return date cannot be before a borrow date.")
+    except Exception as e:
+        await db.connection.rollback()
+        logger.error(f"Error returning copies: {e}")
+        raise HTTPException(status_code=500, detail="An error occurred while returning the copies.")
+
+    returned_ids = {rental['copy_id'] for rental in returned}
+    not_rented = [copy_id for copy_id in copy_ids if copy_id not in returned_ids]
+    logger.info(f"Returned {len(returned)} copies, {len(not_rented)} had no open rental")
+    return {"returned": returned, "not_rented": not_rented}
+
+
 
 @router.get("/customer/{customer_id}", response_model=List[schemas.RentalOut])
-async def get_rentals_by_customer(customer_id: int, db=Depends(database.get_db)):
+async def get_rentals_by_customer(customer_id: int, db=Depends(database.get_async_db)):
     try:
-        db.execute(GET_RENTALS_BY_CUSTOMER_QUERY, (customer_id,))
-        rentals = db.fetchall()
+        if settings.postgres_json_lists:
+            rentals = await db.run_sync(fetch_json, GET_RENTALS_BY_CUSTOMER_QUERY, (customer_id,), schemas.RentalOut)
+            return RawJSONResponse(rentals)
+        await db.execute(GET_RENTALS_BY_CUSTOMER_QUERY, (customer_id,))
+        rentals = await db.fetchall()
 
         logger.info(f"Retrieved {len(rentals)} rentals for customer id {customer_id}")
         return rentals
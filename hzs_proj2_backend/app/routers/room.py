@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from .. import database
+from .. import database, response_cache
 from typing import List
 from pydantic import BaseModel
 
@@ -32,7 +32,7 @@ router = APIRouter(
 
 # CREATE
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=RoomResponse)
-async def create_room(room: RoomCreate, db=Depends(database.get_db)):
+async def create_room(room: RoomCreate, db=Depends(database.get_async_db)):
     """
     Create a new study room.
     
@@ -40,7 +40,7 @@ async def create_room(room: RoomCreate, db=Depends(database.get_db)):
     - capacity: Maximum number of people that can use the room
     """
     try:
-        db.execute(
+        await db.execute(
             """
             INSERT INTO hzs_study_room (capacity)
             VALUES (%s)
@@ -48,40 +48,41 @@ async def create_room(room: RoomCreate, db=Depends(database.get_db)):
             """,
             (room.capacity,)
         )
-        room = db.fetchone()
-        db.connection.commit()
+        room = await db.fetchone()
+        await db.connection.commit()
+        await response_cache.invalidate_async("study_rooms")
         return room
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 # READ ALL
 @router.get("/", response_model=List[RoomResponse])
-async def get_rooms(db=Depends(database.get_db)):
+async def get_rooms(db=Depends(database.get_async_db)):
     """
     Get all study rooms.
     """
-    db.execute("SELECT * FROM hzs_study_room")
-    return db.fetchall()
+    await db.execute("SELECT * FROM hzs_study_room")
+    return await db.fetchall()
 
 # READ ONE
 @router.get("/{room_id}", response_model=RoomResponse)
-async def get_room(room_id: int, db=Depends(database.get_db)):
+async def get_room(room_id: int, db=Depends(database.get_async_db)):
     """
     Get a specific study room by ID.
     
     Parameters:
     - room_id: ID of the room to retrieve
     """
-    db.execute("SELECT * FROM hzs_study_room WHERE room_id = %s", (room_id,))
-    room = db.fetchone()
+    await db.execute("SELECT * FROM hzs_study_room WHERE room_id = %s", (room_id,))
+    room = await db.fetchone()
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     return room
 
 # UPDATE
 @router.put("/{room_id}", response_model=RoomResponse)
-async def update_room(room_id: int, room: RoomUpdate, db=Depends(database.get_db)):
+async def update_room(room_id: int, room: RoomUpdate, db=Depends(database.get_async_db)):
     """
     Update an existing study room.
     
@@ -89,7 +90,7 @@ async def update_room(room_id: int, room: RoomUpdate, db=Depends(database.get_db
     - room_id: ID of the room to update
     - capacity: New maximum number of people that can use the room
     """
-    db.execute(
+    await db.execute(
         """
         UPDATE hzs_study_room
         SET capacity = %s
@@ -98,23 +99,25 @@ async def update_room(room_id: int, room: RoomUpdate, db=Depends(database.get_db
         """,
         (room.capacity, room_id)
     )
-    room = db.fetchone()
-    db.connection.commit()
+    room = await db.fetchone()
+    await db.connection.commit()
+    await response_cache.invalidate_async("study_rooms")
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     return room
 
 # DELETE
 @router.delete("/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_room(room_id: int, db=Depends(database.get_db)):
+async def delete_room(room_id: int, db=Depends(database.get_async_db)):
     """
     Delete a study room.
     
     Parameters:
     - room_id: ID of the room to delete
     """
-    db.execute("DELETE FROM hzs_study_room WHERE room_id = %s", (room_id,))
-    db.connection.commit()
+    await db.execute("DELETE FROM hzs_study_room WHERE room_id = %s", (room_id,))
+    await db.connection.commit()
+    await response_cache.invalidate_async("study_rooms")
     if db.rowcount == 0:
         raise HTTPException(status_code=404, detail="Room not found")
 
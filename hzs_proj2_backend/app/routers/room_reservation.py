@@ -1,8 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from .. import database
-from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from psycopg2 import errors
+from .. import database, row_versions
+from ..export import stream_export
+from ..fast_json import TrustedJSONResponse, fetch_trusted
+from ..oauth2 import get_current_user
+from ..reservation_index import GET_ARCHIVED_RESERVATIONS_QUERY, reservation_index
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime, timedelta
 
 class RoomReservationBase(BaseModel):
     room_id: int
@@ -42,16 +48,146 @@ class RoomReservationResponse(RoomReservationBase):
     class Config:
         from_attributes = True
 
+MAX_OCCURRENCES = 366
+
+class RoomReservationRecurrence(BaseModel):
+    """RRULE-style repetition: every `interval` days or weeks until `until` (inclusive) or for `count` occurrences."""
+    freq: Literal["DAILY", "WEEKLY"]
+    interval: int = Field(1, ge=1, le=52)
+    until: Optional[date] = None
+    count: Optional[int] = Field(None, ge=1, le=MAX_OCCURRENCES)
+
+    @model_validator(mode="after")
+    def check_end(self):
+        if self.until is None and self.count is None:
+            raise ValueError("Either until or count is required")
+        return self
+
+class RoomReservationRecurringCreate(RoomReservationCreate):
+    recurrence: RoomReservationRecurrence
+    # book the free occurrences and report the others, instead of booking nothing
+    skip_conflicts: bool = False
+
+class RoomReservationConflict(BaseModel):
+    occurrence: int
+    start_time: datetime
+    end_time: datetime
+    conflicting_reservation_id: int
+
+class RoomReservationRecurringResponse(BaseModel):
+    created: List[RoomReservationResponse]
+    conflicts: List[RoomReservationConflict]
+
 router = APIRouter(
     prefix="/room-reservation",
     tags=["room-reservation"]
 )
 
+# explicit columns: updated_at is internal to the row versions
+GET_ALL_RESERVATIONS_QUERY = """
+    SELECT reservation_id, room_id, topic_description, reserve_date, start_time, end_time,
+           group_size, l_name, f_name, customer_id
+    FROM hzs_room_reservation
+"""
+
+# GET / sends the rows straight to JSON (app/fast_json.py), cast to RoomReservationResponse's types
+LIST_RESERVATIONS_QUERY = """
+    SELECT reservation_id::int8 AS reservation_id, room_id::int8 AS room_id, topic_description,
+           reserve_date, start_time, end_time, group_size, l_name, f_name,
+           customer_id::int8 AS customer_id
+    FROM hzs_room_reservation
+"""
+
+# Version of a room's schedule for GET /room/{room_id} (app/row_versions.py)
+ROOM_RESERVATIONS_VERSION_QUERY = """
+    SELECT count(*) AS row_count, max(updated_at) AS updated_at,
+           sum(hashtextextended(reservation_id || ':' || updated_at, 0)) AS checksum
+    FROM hzs_room_reservation
+    WHERE room_id = %(room_id)s
+"""
+
+RESERVATION_CONFLICT_DETAIL = "This time slot overlaps with an existing reservation"
+
+# Existing reservations of the room overlapping any of the occurrences (1-based ordinality)
+GET_OCCURRENCE_CONFLICTS_QUERY = """
+    SELECT o.occurrence, o.start_time, o.end_time, r.reservation_id AS conflicting_reservation_id
+    FROM unnest(%(occurrences)s::int[], %(starts)s::timestamp[], %(ends)s::timestamp[])
+         AS o(occurrence, start_time, end_time)
+    JOIN hzs_room_reservation r
+      ON r.room_id = %(room_id)s
+     AND tsrange(r.start_time, r.end_time, '[)') && tsrange(o.start_time, o.end_time, '[)')
+     AND r.reservation_id <> ALL(%(exclude)s::numeric[])
+    ORDER BY o.occurrence, r.start_time
+"""
+
+# One multi-row insert; occurrences taken by a concurrent booking are left out by the
+# no-overlap constraint instead of failing the statement
+ADD_OCCURRENCES_QUERY = """
+    INSERT INTO hzs_room_reservation
+    (room_id, topic_description, reserve_date, start_time, end_time, group_size, l_name, f_name, customer_id)
+    SELECT %(room_id)s, %(topic_description)s, o.reserve_date, o.start_time, o.end_time,
+           %(group_size)s, %(l_name)s, %(f_name)s, %(customer_id)s
+    FROM unnest(%(reserve_dates)s::timestamp[], %(starts)s::timestamp[], %(ends)s::timestamp[])
+         AS o(reserve_date, start_time, end_time)
+    ON CONFLICT DO NOTHING
+    RETURNING reservation_id, room_id, topic_description, reserve_date, start_time, end_time, group_size, l_name, f_name, customer_id, updated_at
+"""
+
+
+def _index_version(params):
+    """The room's version from the index it is served from; None runs the version query."""
+    return reservation_index.room_version(params["room_id"]) if reservation_index.ready else None
+
+
+def _served_from_database(path_params, version):
+    # the index is ready but has not cached the room's archive yet: the route answers
+    # from the index, which may lag the version the query just read
+    return not reservation_index.ready
+
+
+row_versions.version_route(
+    f"{router.prefix}/room/{{room_id:int}}", ROOM_RESERVATIONS_VERSION_QUERY,
+    current=_served_from_database, version=_index_version,
+)
+
+
+def expand_occurrences(reservation: RoomReservationRecurringCreate):
+    """The (reserve_date, start_time, end_time) of every occurrence, first one included."""
+    recurrence = reservation.recurrence
+    step = timedelta(days=recurrence.interval * (7 if recurrence.freq == "WEEKLY" else 1))
+    if reservation.end_time - reservation.start_time > step:
+        raise HTTPException(status_code=400, detail="Occurrences of a recurring reservation cannot overlap each other.")
+    occurrences = []
+    while recurrence.count is None or len(occurrences) < recurrence.count:
+        shift = step * len(occurrences)
+        start_time = reservation.start_time + shift
+        if recurrence.until is not None and start_time.date() > recurrence.until:
+            break
+        if len(occurrences) == MAX_OCCURRENCES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A recurring reservation cannot have more than {MAX_OCCURRENCES} occurrences."
+            )
+        occurrences.append((reservation.reserve_date + shift, start_time, reservation.end_time + shift))
+    return occurrences
+
+
+async def _occurrence_conflicts(db, room_id, occurrences, exclude=()):
+    """occurrences: {occurrence number: (reserve_date, start_time, end_time)}"""
+    await db.execute(GET_OCCURRENCE_CONFLICTS_QUERY, {
+        "room_id": room_id,
+        "exclude": list(exclude),
+        "occurrences": list(occurrences),
+        "starts": [start for _, start, _ in occurrences.values()],
+        "ends": [end for _, _, end in occurrences.values()],
+    })
+    return await db.fetchall()
+
 # CREATE
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=RoomReservationResponse)
 async def create_reservation(
     reservation: RoomReservationCreate,
-    db=Depends(database.get_db)
+    db=Depends(database.get_async_db)
 ):
     """
     Create a new room reservation.
@@ -68,12 +204,12 @@ async def create_reservation(
     - customer_id: Optional ID of the customer making the reservation
     """
     try:
-        db.execute(
+        await db.execute(
             """
             INSERT INTO hzs_room_reservation
             (room_id, topic_description, reserve_date, start_time, end_time, group_size, l_name, f_name, customer_id)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING reservation_id, room_id, topic_description, reserve_date, start_time, end_time, group_size, l_name, f_name, customer_id
+            RETURNING reservation_id, room_id, topic_description, reserve_date, start_time, end_time, group_size, l_name, f_name, customer_id, updated_at
             """,
             (
                 reservation.room_id,
@@ -87,48 +223,147 @@ async def create_reservation(
                 reservation.customer_id
             )
         )
-        reservation = db.fetchone()
-        db.connection.commit()
+        reservation = await db.fetchone()
+        await db.connection.commit()
+        reservation_index.put(reservation)
         return reservation
+    except errors.ExclusionViolation:
+        await db.connection.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=RESERVATION_CONFLICT_DETAIL)
+    except errors.CheckViolation:
+        await db.connection.rollback()
+        raise HTTPException(status_code=400, detail="The end time must be after the start time.")
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+# CREATE RECURRING
+@router.post("/recurring", status_code=status.HTTP_201_CREATED, response_model=RoomReservationRecurringResponse)
+async def create_recurring_reservation(
+    reservation: RoomReservationRecurringCreate,
+    db=Depends(database.get_async_db)
+):
+    """
+    Book the same room and time slot repeatedly, in one transaction.
+
+    Parameters:
+    - the fields of a single reservation, describing the first occurrence
+    - recurrence: freq (DAILY or WEEKLY), interval, and until (a date, inclusive) or count
+    - skip_conflicts: when false (default) nothing is booked if any occurrence overlaps an
+      existing reservation and the conflicts are returned with a 409; when true the free
+      occurrences are booked and the others are listed under conflicts
+    """
+    if reservation.end_time <= reservation.start_time:
+        raise HTTPException(status_code=400, detail="The end time must be after the start time.")
+    occurrences = dict(enumerate(expand_occurrences(reservation), start=1))
+    try:
+        conflicts = await _occurrence_conflicts(db, reservation.room_id, occurrences)
+        if conflicts and not reservation.skip_conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=jsonable_encoder({"message": RESERVATION_CONFLICT_DETAIL, "conflicts": conflicts})
+            )
+
+        taken = {conflict['occurrence'] for conflict in conflicts}
+        free = {n: occurrence for n, occurrence in occurrences.items() if n not in taken}
+        created = []
+        if free:
+            await db.execute(ADD_OCCURRENCES_QUERY, {
+                "room_id": reservation.room_id,
+                "topic_description": reservation.topic_description,
+                "group_size": reservation.group_size,
+                "l_name": reservation.l_name,
+                "f_name": reservation.f_name,
+                "customer_id": reservation.customer_id,
+                "reserve_dates": [reserve_date for reserve_date, _, _ in free.values()],
+                "starts": [start for _, start, _ in free.values()],
+                "ends": [end for _, _, end in free.values()],
+            })
+            created = await db.fetchall()
+
+        if len(created) < len(free):
+            # booked concurrently since the check; those bookings are committed and visible now
+            own = [row['reservation_id'] for row in created]
+            conflicts += await _occurrence_conflicts(db, reservation.room_id, free, exclude=own)
+            if not reservation.skip_conflicts:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=jsonable_encoder({"message": RESERVATION_CONFLICT_DETAIL, "conflicts": conflicts})
+                )
+        await db.connection.commit()
+    except HTTPException:
+        await db.connection.rollback()
+        raise
+    except Exception as e:
+        await db.connection.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    for row in created:
+        reservation_index.put(row)
+    return {"created": created, "conflicts": sorted(conflicts, key=lambda c: c['occurrence'])}
+
 # READ ALL
 @router.get("/", response_model=List[RoomReservationResponse])
-async def get_reservations(db=Depends(database.get_db)):
+async def get_reservations(db=Depends(database.get_async_db)):
     """
     Get all room reservations.
     """
-    db.execute("SELECT * FROM hzs_room_reservation")
-    return db.fetchall()
+    rows = await db.run_sync(fetch_trusted, LIST_RESERVATIONS_QUERY, None, RoomReservationResponse)
+    return TrustedJSONResponse(rows)
+
+# EXPORT
+@router.get("/export")
+async def export_reservations(format: Literal["ndjson", "csv"] = "ndjson", current_user=Depends(get_current_user)):
+    """
+    Stream all room reservations as NDJSON or CSV.
+
+    Parameters:
+    - format: ndjson (default) or csv
+    """
+    if current_user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="You do not have access to this resource")
+    return stream_export(GET_ALL_RESERVATIONS_QUERY, fmt=format, filename="room_reservations")
 
 # READ ONE
 @router.get("/{reservation_id}", response_model=RoomReservationResponse)
-async def get_reservation(reservation_id: int, db=Depends(database.get_db)):
+async def get_reservation(reservation_id: int, db=Depends(database.get_async_db)):
     """
     Get a specific room reservation by ID.
     
     Parameters:
     - reservation_id: ID of the reservation to retrieve
     """
-    db.execute("SELECT * FROM hzs_room_reservation WHERE reservation_id = %s", (reservation_id,))
-    reservation = db.fetchone()
+    if reservation_index.ready:
+        reservation = reservation_index.get(reservation_id)
+        if reservation:
+            return reservation
+    await db.execute("SELECT * FROM hzs_room_reservation WHERE reservation_id = %s", (reservation_id,))
+    reservation = await db.fetchone()
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
     return reservation
 
 # GET RESERVATIONS BY ROOM ID
 @router.get("/room/{room_id}", response_model=List[RoomReservationResponse])
-async def get_reservations_by_room(room_id: int, db=Depends(database.get_db)):
+async def get_reservations_by_room(room_id: int, db=Depends(database.get_async_db)):
     """
     Get all reservations for a specific room.
     
     Parameters:
     - room_id: ID of the room to get reservations for
     """
+    if reservation_index.ready:
+        reservations = reservation_index.by_room(room_id)
+        if reservations is None:
+            # first request for the room: add its archived reservations to the index
+            generation = reservation_index.archive_generation
+            await db.execute(GET_ARCHIVED_RESERVATIONS_QUERY, (room_id, reservation_index.horizon))
+            reservation_index.store_archive(room_id, await db.fetchall(), generation)
+            reservations = reservation_index.by_room(room_id)
+        if reservations is not None:
+            return sorted(reservations, key=lambda r: (r['reserve_date'], r['start_time']))
     try:
-        db.execute(
+        await db.execute(
             """
             SELECT * FROM hzs_room_reservation 
             WHERE room_id = %s 
@@ -136,7 +371,7 @@ async def get_reservations_by_room(room_id: int, db=Depends(database.get_db)):
             """,
             (room_id,)
         )
-        reservations = db.fetchall()
+        reservations = await db.fetchall()
         return reservations
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -146,7 +381,7 @@ async def get_reservations_by_room(room_id: int, db=Depends(database.get_db)):
 async def update_reservation(
     reservation_id: int,
     reservation: RoomReservationUpdate,
-    db=Depends(database.get_db)
+    db=Depends(database.get_async_db)
 ):
     """
     Update an existing room reservation.
@@ -163,41 +398,50 @@ async def update_reservation(
     - f_name: First name of the person making the reservation
     - customer_id: Optional ID of the customer making the reservation
     """
-    db.execute(
-        """
-        UPDATE hzs_room_reservation
-        SET topic_description=%s, reserve_date=%s, start_time=%s, end_time=%s, group_size=%s, l_name=%s, f_name=%s, customer_id=%s
-        WHERE reservation_id=%s
-        RETURNING reservation_id, room_id, topic_description, reserve_date, start_time, end_time, group_size, l_name, f_name, customer_id
-        """,
-        (
-            reservation.topic_description,
-            reservation.reserve_date,
-            reservation.start_time,
-            reservation.end_time,
-            reservation.group_size,
-            reservation.l_name,
-            reservation.f_name,
-            reservation.customer_id,
-            reservation_id
+    try:
+        await db.execute(
+            """
+            UPDATE hzs_room_reservation
+            SET topic_description=%s, reserve_date=%s, start_time=%s, end_time=%s, group_size=%s, l_name=%s, f_name=%s, customer_id=%s
+            WHERE reservation_id=%s
+            RETURNING reservation_id, room_id, topic_description, reserve_date, start_time, end_time, group_size, l_name, f_name, customer_id, updated_at
+            """,
+            (
+                reservation.topic_description,
+                reservation.reserve_date,
+                reservation.start_time,
+                reservation.end_time,
+                reservation.group_size,
+                reservation.l_name,
+                reservation.f_name,
+                reservation.customer_id,
+                reservation_id
+            )
         )
-    )
-    reservation = db.fetchone()
-    db.connection.commit()
+        reservation = await db.fetchone()
+        await db.connection.commit()
+    except errors.ExclusionViolation:
+        await db.connection.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=RESERVATION_CONFLICT_DETAIL)
+    except errors.CheckViolation:
+        await db.connection.rollback()
+        raise HTTPException(status_code=400, detail="The end time must be after the start time.")
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
+    reservation_index.put(reservation)
     return reservation
 
 # DELETE
 @router.delete("/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_reservation(reservation_id: int, db=Depends(database.get_db)):
+async def delete_reservation(reservation_id: int, db=Depends(database.get_async_db)):
     """
     Delete a room reservation.
     
     Parameters:
     - reservation_id: ID of the reservation to delete
     """
-    db.execute("DELETE FROM hzs_room_reservation WHERE reservation_id = %s", (reservation_id,))
-    db.connection.commit()
+    await db.execute("DELETE FROM hzs_room_reservation WHERE reservation_id = %s", (reservation_id,))
+    await db.connection.commit()
     if db.rowcount == 0:
-        raise HTTPException(status_code=404, detail="Reservation not found")
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    reservation_index.remove(reservation_id)
\ No newline at end of file
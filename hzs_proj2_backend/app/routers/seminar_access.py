@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from app import schemas
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.oauth2 import get_current_user
 
 router = APIRouter(prefix="/seminars/{event_id}/invitations", tags=["seminar-access"])
@@ -38,7 +38,7 @@ def list_invitations(event_id: int, db = Depends(get_db)):
 async def delete_invitation(
     event_id: int,
     invitation_id: int,
-    db=Depends(get_db),
+    db=Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
     # Check if user is admin
@@ -49,7 +49,7 @@ async def delete_invitation(
         )
     
     # Delete the invitation
-    db.execute(
+    await db.execute(
         "DELETE FROM hzs_seminar_access WHERE invitation_id = %s AND event_id = %s",
         (invitation_id, event_id)
     )
@@ -60,5 +60,5 @@ async def delete_invitation(
             detail="Invitation not found"
         )
     
-    db.connection.commit()
+    await db.connection.commit()
     return None
@@ -1,8 +1,9 @@
 # app/routers/seminars.py
 from typing import List
 from fastapi    import APIRouter, Depends, HTTPException, status
-from app        import schemas
-from app.database import get_db
+from app        import schemas, response_cache, row_versions
+from app.database import get_db, get_async_db
+from app.fast_json import TrustedJSONResponse, fetch_trusted
 from app.oauth2 import get_current_user
 
 router = APIRouter(
@@ -10,6 +11,21 @@ router = APIRouter(
     tags=["seminars"]
 )
 
+response_cache.cache_route(f"{router.prefix}/", tags=["seminars"])
+
+# seminars are also changed through the /event router and directly in the database, so
+# kiosks polling the list revalidate against the rows themselves (app/row_versions.py)
+SEMINARS_VERSION_QUERY = """
+  SELECT count(*) AS row_count,
+         max(greatest(e.updated_at, s.updated_at)) AS updated_at,
+         sum(hashtextextended(e.event_id || ':' || e.updated_at || ':' || s.updated_at, 0)) AS checksum
+  FROM HZS_EVENT e
+  JOIN HZS_SEMINAR s USING (event_id)
+  WHERE e.event_type = 'S'
+"""
+
+row_versions.version_route(f"{router.prefix}/", SEMINARS_VERSION_QUERY)
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -43,6 +59,7 @@ def create_seminar(
 
 
     db.connection.commit()
+    response_cache.invalidate("seminars")
     return {
         "event_id":       new_event["event_id"],
         "e_name":         new_event["e_name"],
@@ -53,31 +70,21 @@ def create_seminar(
         "descrip":        sem.descrip,
     }
 
+# rows go straight to JSON (app/fast_json.py), so the columns are cast to SeminarOut's types
+LIST_SEMINARS_QUERY = """
+  SELECT e.event_id::int8 AS event_id, e.e_name, e.topic,
+         e.start_datetime, e.stop_datetime,
+         e.event_type, s.descrip
+  FROM HZS_EVENT e
+  JOIN HZS_SEMINAR s USING (event_id)
+  WHERE e.event_type = 'S'
+  ORDER BY e.start_datetime
+"""
+
 @router.get("/", response_model=List[schemas.SeminarOut])
 def list_seminars(db = Depends(get_db)):
-    sql = """
-      SELECT e.event_id, e.e_name, e.topic,
-             e.start_datetime, e.stop_datetime,
-             e.event_type, s.descrip
-      FROM HZS_EVENT e
-      JOIN HZS_SEMINAR s USING (event_id)
-      WHERE e.event_type = 'S'
-      ORDER BY e.start_datetime
-    """
-    db.execute(sql)
-    rows = db.fetchall()
-    return [
-        {
-          "event_id":       r["event_id"],
-          "e_name":         r["e_name"],
-          "topic":          r["topic"],
-          "start_datetime": r["start_datetime"],
-          "stop_datetime":  r["stop_datetime"],
-          "event_type":     r["event_type"],
-          "descrip":        r["descrip"]
-        }
-        for r in rows
-    ]
+    rows = fetch_trusted(db, LIST_SEMINARS_QUERY, None, schemas.SeminarOut)
+    return TrustedJSONResponse(rows)
 
 @router.get("/{event_id}", response_model=schemas.SeminarOut)
 def get_seminar(event_id: int, db = Depends(get_db)):
@@ -108,7 +115,7 @@ def get_seminar(event_id: int, db = Depends(get_db)):
     }
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_seminar(event_id: int, db=Depends(get_db), current_user=Depends(get_current_user)):
+async def delete_seminar(event_id: int, db=Depends(get_async_db), current_user=Depends(get_current_user)):
     # Check if user is admin
     if current_user["role"] != "admin":
         raise HTTPException(
@@ -116,12 +123,13 @@ async def delete_seminar(event_id: int, db=Depends(get_db), current_user=Depends
             detail="Not authorized to perform this action"
         )
 
-    db.execute("DELETE FROM hzs_seminar_sponsor WHERE event_id = %s", (event_id,))
+    await db.execute("DELETE FROM hzs_seminar_sponsor WHERE event_id = %s", (event_id,))
 
-    db.execute("DELETE FROM hzs_seminar_access WHERE event_id = %s", (event_id,))
+    await db.execute("DELETE FROM hzs_seminar_access WHERE event_id = %s", (event_id,))
 
-    db.execute("DELETE FROM hzs_seminar WHERE event_id = %s", (event_id,))
+    await db.execute("DELETE FROM hzs_seminar WHERE event_id = %s", (event_id,))
 
-    db.execute("DELETE FROM hzs_event WHERE event_id = %s", (event_id,))
-    db.connection.commit()
+    await db.execute("DELETE FROM hzs_event WHERE event_id = %s", (event_id,))
+    await db.connection.commit()
+    await response_cache.invalidate_async("seminars")
     return None
@@ -1,9 +1,13 @@
 # app/routers/sponsors.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Literal
 from app import schemas
+from app.config import settings
 from app.database import get_db
+from app.export import stream_export
+from app.fast_json import RawJSONResponse, fetch_json
+from app.oauth2 import get_current_user
 
 router = APIRouter(prefix="/sponsors", tags=["sponsors"])
 
@@ -67,9 +71,7 @@ def create_individual(
         "l_name": data.l_name,
     }
 
-@router.get("/", response_model=List[schemas.SponsorOutBase])
-def list_sponsors(db=Depends(get_db)):
-    sql = """
+LIST_SPONSORS_QUERY = """
     SELECT s.sponsor_id, s.sponsor_type, s.created_at,
            o.org_name,
            i.f_name, i.l_name 
@@ -77,6 +79,24 @@ def list_sponsors(db=Depends(get_db)):
     LEFT JOIN hzs_organization o ON s.sponsor_id = o.sponsor_id
     LEFT JOIN hzs_individual  i ON s.sponsor_id = i.sponsor_id
     ORDER BY s.sponsor_id
-    """
-    db.execute(sql)
+"""
+
+# The columns of SponsorOutBase; the export keeps the names
+LIST_SPONSOR_SUMMARIES_QUERY = """
+    SELECT sponsor_id, sponsor_type, created_at
+    FROM hzs_sponsor
+    ORDER BY sponsor_id
+"""
+
+@router.get("/", response_model=List[schemas.SponsorOutBase])
+def list_sponsors(db=Depends(get_db)):
+    if settings.postgres_json_lists:
+        return RawJSONResponse(fetch_json(db, LIST_SPONSOR_SUMMARIES_QUERY, None, schemas.SponsorOutBase))
+    db.execute(LIST_SPONSOR_SUMMARIES_QUERY)
     return db.fetchall()
+
+@router.get("/export")
+async def export_sponsors(format: Literal["ndjson", "csv"] = "ndjson", current_user=Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to perform this action")
+    return stream_export(LIST_SPONSORS_QUERY, fmt=format, filename="sponsors")
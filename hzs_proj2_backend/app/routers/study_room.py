@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from .. import schemas, database
+from fastapi import APIRouter, Depends, status, HTTPException, Query
+from psycopg2 import errors
+from .. import schemas, database, response_cache
 from ..oauth2 import get_current_user
-from typing import List
+from ..reservation_index import reservation_index
+from typing import List, Optional
 import logging
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -16,6 +18,9 @@ router = APIRouter(
     tags=["study-room"]
 )
 
+# rooms are created, resized and removed through the /room router
+response_cache.cache_route(f"{router.prefix}/", tags=["study_rooms"])
+
 # Queries
 GET_ALL_ROOMS_QUERY = """
     SELECT room_id, capacity
@@ -35,7 +40,7 @@ GET_ROOM_RESERVATIONS_QUERY = """
            r.room_id, r.l_name, r.f_name
     FROM hzs_room_reservation r
     WHERE r.room_id = %s
-    AND r.reserve_date = %s
+    AND tsrange(r.start_time, r.end_time, '[)') && tsrange(%s, %s, '[)')
     ORDER BY r.start_time
 """
 
@@ -47,7 +52,7 @@ ADD_RESERVATION_QUERY = """
     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
     RETURNING reservation_id, topic_description, reserve_date, 
               start_time, end_time, group_size, customer_id, 
-              room_id, l_name, f_name
+              room_id, l_name, f_name, updated_at
 """
 
 GET_CUSTOMER_RESERVATIONS_QUERY = """
@@ -59,11 +64,33 @@ GET_CUSTOMER_RESERVATIONS_QUERY = """
     ORDER BY r.reserve_date DESC, r.start_time
 """
 
+# Free parts of the window for every room that is large enough: the window minus the union
+# of the room's reservations in it, one row per free slot. Fully booked rooms yield no rows.
+ROOM_AVAILABILITY_QUERY = """
+    WITH rooms AS (
+        SELECT room_id, capacity
+        FROM hzs_study_room
+        WHERE capacity >= %(min_capacity)s
+    ), booked AS (
+        SELECT r.room_id, range_agg(tsrange(r.start_time, r.end_time, '[)') * tsrange(%(start)s, %(end)s, '[)')) AS busy
+        FROM hzs_room_reservation r
+        WHERE tsrange(r.start_time, r.end_time, '[)') && tsrange(%(start)s, %(end)s, '[)')
+        GROUP BY r.room_id
+    )
+    SELECT rooms.room_id, rooms.capacity, lower(free) AS slot_start, upper(free) AS slot_end
+    FROM rooms
+    LEFT JOIN booked ON booked.room_id = rooms.room_id
+    CROSS JOIN LATERAL unnest(
+        tsmultirange(tsrange(%(start)s, %(end)s, '[)')) - coalesce(booked.busy, '{}'::tsmultirange)
+    ) AS free
+    ORDER BY rooms.room_id, slot_start
+"""
+
 @router.get("/", response_model=List[schemas.StudyRoomOut])
-async def get_all_rooms(db=Depends(database.get_db)):
+async def get_all_rooms(db=Depends(database.get_async_db)):
     try:
-        db.execute(GET_ALL_ROOMS_QUERY)
-        rooms = db.fetchall()
+        await db.execute(GET_ALL_ROOMS_QUERY)
+        rooms = await db.fetchall()
         return rooms
     except Exception as e:
         logger.error(f"Error retrieving rooms: {str(e)}")
@@ -72,17 +99,79 @@ async def get_all_rooms(db=Depends(database.get_db)):
             detail="An error occurred while retrieving rooms."
         )
 
+@router.get("/availability", response_model=List[schemas.RoomAvailabilityOut])
+async def get_room_availability(
+    day: date = Query(..., alias="date"),
+    start: time = time(0),
+    end: Optional[time] = None,
+    min_capacity: int = Query(1, ge=1),
+    db=Depends(database.get_async_db)
+):
+    """
+    Rooms seating at least `min_capacity` that are free at some point between `start`
+    and `end` (default: the whole day) on `date`, with their free slots.
+    """
+    window_start = datetime.combine(day, start)
+    window_end = datetime.combine(day, end) if end else datetime.combine(day + timedelta(days=1), time(0))
+    if window_end <= window_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The end time must be after the start time."
+        )
+    try:
+        await db.execute(ROOM_AVAILABILITY_QUERY, {
+            "start": window_start,
+            "end": window_end,
+            "min_capacity": min_capacity,
+        })
+        rows = await db.fetchall()
+    except Exception as e:
+        logger.error(f"Error retrieving room availability: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving room availability."
+        )
+
+    rooms = {}
+    for row in rows:
+        room = rooms.setdefault(row['room_id'], {
+            'room_id': row['room_id'],
+            'capacity': row['capacity'],
+            'free_slots': [],
+        })
+        room['free_slots'].append({'start': row['slot_start'], 'end': row['slot_end']})
+    return list(rooms.values())
+
+@router.get("/my-reservations", response_model=List[schemas.RoomReservationOut])
+async def get_my_reservations(
+    db=Depends(database.get_async_db),
+    current_user=Depends(get_current_user)
+):
+    try:
+        await db.execute(GET_CUSTOMER_RESERVATIONS_QUERY, (current_user['user_id'],))
+        reservations = await db.fetchall()
+        logger.info(f"Retrieved reservations: {reservations}")
+        return reservations
+    except Exception as e:
+        logger.error(f"Error retrieving reservations: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving reservations."
+        )
+
 @router.get("/{room_id}", response_model=schemas.StudyRoomOut)
-async def get_room_by_id(room_id: int, db=Depends(database.get_db)):
+async def get_room_by_id(room_id: int, db=Depends(database.get_async_db)):
     try:
-        db.execute(GET_ROOM_BY_ID_QUERY, (room_id,))
-        room = db.fetchone()
+        await db.execute(GET_ROOM_BY_ID_QUERY, (room_id,))
+        room = await db.fetchone()
         if not room:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Room with id {room_id} does not exist!"
             )
         return room
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving room: {str(e)}")
         raise HTTPException(
@@ -93,12 +182,16 @@ async def get_room_by_id(room_id: int, db=Depends(database.get_db)):
 @router.get("/{room_id}/reservations", response_model=List[schemas.RoomReservationOut])
 async def get_room_reservations(
     room_id: int,
-    date: str,
-    db=Depends(database.get_db)
+    day: date = Query(..., alias="date"),
+    db=Depends(database.get_async_db)
 ):
+    """Reservations of the room that overlap `date`, answered from the reservation index when it holds that day."""
+    day_start = datetime.combine(day, time(0))
+    if reservation_index.covers(day_start):
+        return reservation_index.on_day(room_id, day)
     try:
-        db.execute(GET_ROOM_RESERVATIONS_QUERY, (room_id, date))
-        reservations = db.fetchall()
+        await db.execute(GET_ROOM_RESERVATIONS_QUERY, (room_id, day_start, day_start + timedelta(days=1)))
+        reservations = await db.fetchall()
         return reservations
     except Exception as e:
         logger.error(f"Error retrieving room reservations: {str(e)}")
@@ -110,13 +203,13 @@ async def get_room_reservations(
 @router.post("/reservation", status_code=status.HTTP_201_CREATED, response_model=schemas.RoomReservationOut)
 async def create_reservation(
     reservation: schemas.RoomReservationCreate,
-    db=Depends(database.get_db),
+    db=Depends(database.get_async_db),
     current_user=Depends(get_current_user)
 ):
     try:
         # Check if room exists and has sufficient capacity
-        db.execute(GET_ROOM_BY_ID_QUERY, (reservation.room_id,))
-        room = db.fetchone()
+        await db.execute(GET_ROOM_BY_ID_QUERY, (reservation.room_id,))
+        room = await db.fetchone()
         if not room:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -128,19 +221,8 @@ async def create_reservation(
                 detail=f"Room capacity ({room['capacity']}) is less than group size ({reservation.group_size})"
             )
 
-        # Check for overlapping reservations
-        db.execute(GET_ROOM_RESERVATIONS_QUERY, (reservation.room_id, reservation.reserve_date))
-        existing_reservations = db.fetchall()
-        for existing in existing_reservations:
-            if (reservation.start_time < existing['end_time'] and 
-                reservation.end_time > existing['start_time']):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="This time slot overlaps with an existing reservation"
-                )
-
-        # Create the reservation
-        db.execute(
+        # Overlapping reservations are rejected by the hzs_room_reservation_no_overlap constraint
+        await db.execute(
             ADD_RESERVATION_QUERY,
             (
                 reservation.topic_description,
@@ -154,33 +236,29 @@ async def create_reservation(
                 reservation.f_name
             )
         )
-        new_reservation = db.fetchone()
-        db.connection.commit()
+        new_reservation = await db.fetchone()
+        await db.connection.commit()
+        reservation_index.put(new_reservation)
         return new_reservation
     except HTTPException:
-        db.connection.rollback()
+        await db.connection.rollback()
         raise
+    except errors.ExclusionViolation:
+        await db.connection.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This time slot overlaps with an existing reservation"
+        )
+    except errors.CheckViolation:
+        await db.connection.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The end time must be after the start time."
+        )
     except Exception as e:
-        db.connection.rollback()
+        await db.connection.rollback()
         logger.error(f"Error creating reservation: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while creating the reservation."
         )
-
-@router.get("/my-reservations", response_model=List[schemas.RoomReservationOut])
-async def get_my_reservations(
-    db=Depends(database.get_db),
-    current_user=Depends(get_current_user)
-):
-    try:
-        db.execute(GET_CUSTOMER_RESERVATIONS_QUERY, (current_user['user_id'],))
-        reservations = db.fetchall()
-        logger.info(f"Retrieved reservations: {reservations}")
-        return reservations
-    except Exception as e:
-        logger.error(f"Error retrieving reservations: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An error occurred while retrieving reservations."
-        ) 
\ No newline at end of file
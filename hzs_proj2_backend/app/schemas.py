@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field, conint
-from typing import Annotated, Optional, Literal
+from typing import Annotated, List, Optional, Literal
 from datetime import datetime
 # Schema/Pydantic Models define the structure of a request & response
 # This ensure that when a Customer wants to create a post, the request will
@@ -26,6 +26,9 @@ class CustomerOut(CustomerBase):
     class Config:
         orm_mode = True
 
+class CustomerRoleUpdate(BaseModel):
+    role: Literal["user", "admin"]
+
 class CustomerLogin(BaseModel):
     email: EmailStr
     password: str
@@ -54,6 +57,47 @@ class BookOut(BookBase):
 class BookCreate(BookBase):
     pass
 
+class BookAvailabilityOut(BaseModel):
+    total: int
+    available: int
+    on_loan: int
+    late: int
+
+class BookAvailabilityEntry(BookAvailabilityOut):
+    book_id: int
+
+class BookExpandedOut(BookOut):
+    authors: Optional[List["AuthorOut"]] = None
+    copies: Optional[List["BookCopyOut"]] = None
+    availability: Optional[BookAvailabilityOut] = None
+
+class BookPage(BaseModel):
+    items: List[BookExpandedOut]
+    next_cursor: Optional[int] = None
+
+class BookSearchHit(BookOut):
+    rank: float
+
+class BookSearchPage(BaseModel):
+    items: List[BookSearchHit]
+    next_offset: Optional[int] = None
+
+class BookImportRow(BookBase):
+    topic: str = Field(..., max_length=20)
+    copies: int = Field(0, ge=0, le=1000)
+    author_ids: List[int] = []
+
+class BookImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class BookImportResult(BaseModel):
+    books_created: int
+    copies_created: int
+    author_links_created: int
+    rejected_rows: int
+    errors: List[BookImportError]
+
 
 
 class BookCopyCreate(BaseModel):
@@ -72,9 +116,18 @@ class RentalCreate(BaseModel):
     customer_id: int
     copy_id: int
 
+class RentalCheckout(BaseModel):
+    borrow_date: datetime
+    expected_return_date: datetime
+    customer_id: int
+    book_id: int
+
 class RentalReturn(BaseModel):
     actual_return_date: datetime
 
+class RentalBatchReturn(RentalReturn):
+    copy_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
 class RentalOut(BaseModel):
     rental_id: int
     rental_status: str
@@ -87,6 +140,10 @@ class RentalOut(BaseModel):
     class Config:
         orm_mode = True
 
+class RentalBatchReturnOut(BaseModel):
+    returned: List[RentalOut]
+    not_rented: List[int]
+
 
 class EventBase(BaseModel):
     e_name: str
@@ -254,3 +311,10 @@ class RoomReservationOut(RoomReservationBase):
     class Config:
         from_attributes = True
 
+class RoomFreeSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+class RoomAvailabilityOut(StudyRoomOut):
+    free_slots: List[RoomFreeSlot]
+
@@ -0,0 +1,156 @@
+"""
+Server-side prepared statements for the routers' SQL constants.
+
+register_modules() collects every module-level `*_QUERY` string of the given modules.
+Each pooled connection PREPAREs them once when it is opened (prepare()), and the pool's
+cursors (PreparedCursor, PreparedTupleCursor) run a registered query as
+`EXECUTE name(...)`, so PostgreSQL skips parsing and, once it settles on a generic plan,
+planning. psycopg2 still interpolates the arguments client-side; PostgreSQL converts
+them to the parameter types it inferred for the statement.
+
+A query PostgreSQL cannot prepare on its own (e.g. a parameter whose type it cannot
+infer) is logged once and keeps being executed as plain SQL. Per-statement execution
+counts and times are reported by statement_stats().
+"""
+import logging
+import re
+import threading
+import time
+import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+# PostgreSQL truncates longer identifiers
+_MAX_NAME_LENGTH = 63
+
+
+class Statement:
+    """A registered query, rewritten for PREPARE and EXECUTE."""
+
+    def __init__(self, name, query):
+        self.name = name
+        self.query = query
+        self.error = None
+        self.calls = 0
+        self.total_time = 0.0
+
+        named, positional = [], 0
+        parts, end = [], 0
+        for match in _PLACEHOLDER.finditer(query):
+            parts.append(query[end:match.start()])
+            end = match.end()
+            if match.group(0) == "%%":
+                parts.append("%")
+            elif match.group(1):
+                if match.group(1) not in named:
+                    named.append(match.group(1))
+                parts.append(f"${named.index(match.group(1)) + 1}")
+            else:
+                positional += 1
+                parts.append(f"${positional}")
+        parts.append(query[end:])
+        if named and positional:
+            raise ValueError(f"{name} mixes named and positional parameters")
+
+        self.prepare_sql = f"PREPARE {name} AS {''.join(parts)}"
+        arguments = [f"%({argument})s" for argument in named] or ["%s"] * positional
+        self.execute_sql = f"EXECUTE {name}({', '.join(arguments)})" if arguments else f"EXECUTE {name}"
+
+    def record(self, seconds):
+        with _lock:
+            self.calls += 1
+            self.total_time += seconds
+
+
+_statements = {}
+_lock = threading.Lock()
+
+
+def register(name, query):
+    """Register `query` under `name` (truncated to a valid identifier); returns its Statement."""
+    with _lock:
+        if query not in _statements:
+            _statements[query] = Statement(name.lower()[:_MAX_NAME_LENGTH], query)
+        return _statements[query]
+
+
+def register_modules(*modules):
+    """Register the module-level `*_QUERY` string constants of `modules`."""
+    for module in modules:
+        prefix = module.__name__.rsplit(".", 1)[-1]
+        for attribute, value in vars(module).items():
+            if attribute.endswith("_QUERY") and isinstance(value, str):
+                try:
+                    register(f"{prefix}_{attribute}", value)
+                except ValueError as error:
+                    logger.warning(f"Not preparing {prefix}.{attribute}: {error}")
+
+
+def prepare(conn):
+    """PREPARE every registered statement on a newly opened connection."""
+    conn.prepared_statements = frozenset()
+    if not settings.prepared_statements_enabled:
+        return
+    with _lock:
+        statements = [statement for statement in _statements.values() if statement.error is None]
+    prepared = set()
+    for statement in statements:
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+                cursor.execute(statement.prepare_sql)
+            prepared.add(statement.name)
+        except psycopg2.Error as error:
+            if conn.closed:
+                raise
+            # prepared statements are not transactional, the ones before survive the rollback
+            conn.rollback()
+            statement.error = str(error).strip()
+            logger.warning(f"Statement {statement.name} cannot be prepared, running it as plain SQL: {statement.error}")
+    conn.commit()
+    conn.prepared_statements = frozenset(prepared)
+
+
+class PreparedStatementsMixin:
+    """Cursor mixin executing registered queries through the connection's prepared statements."""
+
+    def execute(self, query, vars=None):
+        statement = _statements.get(query) if isinstance(query, str) else None
+        # DECLARE (named cursors) only accepts a SELECT, not an EXECUTE
+        if (statement is None or self.name is not None
+                or statement.name not in getattr(self.connection, "prepared_statements", ())):
+            return super().execute(query, vars)
+        started = time.perf_counter()
+        try:
+            return super().execute(statement.execute_sql, vars)
+        finally:
+            statement.record(time.perf_counter() - started)
+
+
+class PreparedCursor(PreparedStatementsMixin, RealDictCursor):
+    pass
+
+
+class PreparedTupleCursor(PreparedStatementsMixin, psycopg2.extensions.cursor):
+    pass
+
+
+def statement_stats():
+    with _lock:
+        statements = list(_statements.values())
+        executed = sorted((s for s in statements if s.calls), key=lambda s: s.total_time, reverse=True)
+        return {
+            "registered": len(statements),
+            "unpreparable": sorted(s.name for s in statements if s.error is not None),
+            "statements": {
+                s.name: {
+                    "calls": s.calls,
+                    "total_ms": round(s.total_time * 1000, 3),
+                    "avg_ms": round(s.total_time / s.calls * 1000, 3),
+                }
+                for s in executed
+            },
+        }
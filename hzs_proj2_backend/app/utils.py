@@ -1,9 +1,79 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+class PasswordHashBusy(Exception):
+    """Raised when too many password hash/verify jobs are already queued."""
+
+
+# bcrypt releases the GIL while it works, so a small dedicated thread pool runs hashes in
+# parallel without blocking the event loop or taking threads from FastAPI's own pool.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
+)
+_hash_lock = threading.Lock()
+_hash_stats = {"queued": 0, "running": 0, "max_queued": 0, "completed": 0, "rejected": 0}
+
+
 def hash(password: str):
     return pwd_context.hash(password)
 
 def verify(plain_passowrd, hashed_password):
-    return pwd_context.verify(plain_passowrd, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_passowrd, hashed_password)
+
+
+def _tracked(func, *args):
+    with _hash_lock:
+        _hash_stats["queued"] -= 1
+        _hash_stats["running"] += 1
+    try:
+        return func(*args)
+    finally:
+        with _hash_lock:
+            _hash_stats["running"] -= 1
+            _hash_stats["completed"] += 1
+
+
+def _release_queued(future=None):
+    # a job cancelled before a worker picked it up never reaches _tracked
+    if future is None or future.cancelled():
+        with _hash_lock:
+            _hash_stats["queued"] -= 1
+
+
+async def _run_hash_job(func, *args):
+    with _hash_lock:
+        if _hash_stats["queued"] >= settings.password_hash_max_queue:
+            _hash_stats["rejected"] += 1
+            raise PasswordHashBusy("Too many password operations in progress")
+        _hash_stats["queued"] += 1
+        _hash_stats["max_queued"] = max(_hash_stats["max_queued"], _hash_stats["queued"])
+    try:
+        future = _hash_executor.submit(_tracked, func, *args)
+    except BaseException:
+        _release_queued()
+        raise
+    future.add_done_callback(_release_queued)
+    # cancelling the awaiting request cancels the job too, unless it is already running
+    return await asyncio.wrap_future(future)
+
+
+async def hash_async(password: str):
+    return await _run_hash_job(hash, password)
+
+async def verify_async(plain_password, hashed_password):
+    return await _run_hash_job(verify, plain_password, hashed_password)
+
+
+def hash_stats():
+    with _hash_lock:
+        stats = dict(_hash_stats)
+    stats["workers"] = settings.password_hash_workers
+    stats["max_queue"] = settings.password_hash_max_queue
+    return stats
@@ -0,0 +1,652 @@
+"""
+Micro-benchmarks for the hot paths the API was tuned on, each next to the code path it
+replaced:
+
+    jwt            verify_access_token: token cache hit vs. jwt.decode
+    hashing        bcrypt on the hashing pool (concurrent) vs. one hash after another
+    serialization  TrustedJSONResponse (pydantic_core.to_json) vs. response_model validation
+    pool           ConnectionPool checkout vs. a new psycopg2 connection
+    include        ?include=authors,copies,availability: batched expand_books() vs. per-book queries
+    import         bulk_import.import_books (COPY + set-based inserts) vs. row-by-row INSERTs
+    json_lists     fetch_trusted() and fetch_json() vs. dict rows validated by the response_model,
+                   time and peak RSS growth over 100,000 authors by default
+    availability   GET /study-room/availability over 500 rooms and 50,000 reservations:
+                   ROOM_AVAILABILITY_QUERY vs. one reservations query per room (target: < 30 ms)
+    throughput     requests/sec on GET /book/ and GET /rental/customer/{id}: ConnectionPool vs.
+                   a new connection per request (capped at the pool size)
+    concurrency    p50/p99 of GET /book/ under --clients concurrent clients: queries on worker
+                   threads vs. on the event loop (the routes before the async database layer)
+    login_storm    GET /book/ latency during 50 concurrent POST /login, and without them: bcrypt
+                   on the hashing pool vs. on the event loop
+
+Run from hzs_proj2_backend with the API's settings (.env or environment):
+
+    python scripts/benchmarks.py [name ...] [--rows N] [--repeat 5] [--clients 200]
+
+The first three need no database. The others seed synthetic rows in a transaction that is
+rolled back, as app/query_audit.py does, so the database is left untouched. Each variant
+reports the best of --repeat runs. The load benchmarks send requests through the ASGI app
+in-process (httpx.ASGITransport) against the rows already in the database, and report
+latency percentiles over all requests instead; login_storm commits one customer to log in
+as and deletes it afterwards.
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import io
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import psycopg2
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app import database, oauth2, schemas, statements, utils
+from app.bulk_import import import_books
+from app.cache import TTLCache
+from app.config import settings
+from app.fast_json import TrustedJSONResponse, fetch_json, fetch_trusted
+from app.main import app
+from app.routers import author, book, rental, study_room
+from app.routers.author import GET_ALL_AUTHORS_QUERY
+from app.routers.book import (
+    GET_AUTHORS_BY_BOOK_QUERY,
+    GET_AVAILABILITY_BY_BOOKS_QUERY,
+    GET_COPIES_BY_BOOKS_QUERY,
+    expand_books,
+)
+
+PAGE_SIZE = 50
+REQUESTS_PER_CLIENT = 10
+LOGIN_CLIENTS = 50
+BYSTANDER_CLIENTS = 10
+BENCH_EMAIL = "bench-login@example.com"
+BENCH_PASSWORD = "correct horse battery staple"
+AVAILABILITY_ROOMS = 500
+RESERVATIONS_PER_ROOM = 100
+AVAILABILITY_DAY = datetime.date(2026, 3, 2)
+DEFAULT_ROWS = 10000
+# list endpoints are where memory matters, so json_lists runs at a realistic size
+BENCHMARK_ROWS = {"json_lists": 100000}
+
+SEED_QUERIES = [
+    """
+    INSERT INTO hzs_author (f_name, l_name, email, state, country, street, city)
+    SELECT 'Bench', 'Author' || g, 'author' || g || '@example.com', 'NY', 'US', 'Main St', 'New York'
+    FROM generate_series(1, %(n)s) g
+    """,
+    """
+    INSERT INTO hzs_book (b_name, topic)
+    SELECT 'Bench book ' || g, 'bench'
+    FROM generate_series(1, %(n)s) g
+    """,
+    """
+    INSERT INTO hzs_book_author (book_id, author_id)
+    SELECT b.book_id, a.author_id
+    FROM (SELECT book_id, row_number() OVER (ORDER BY book_id) AS rn FROM hzs_book WHERE topic = 'bench') b
+    JOIN (SELECT author_id, row_number() OVER (ORDER BY author_id) AS rn FROM hzs_author WHERE f_name = 'Bench') a
+      ON a.rn = b.rn
+    """,
+    """
+    INSERT INTO hzs_book_copy (book_id, status)
+    SELECT book_id, 'AVAILABLE'
+    FROM hzs_book, generate_series(1, 3)
+    WHERE topic = 'bench'
+    """,
+]
+
+# ten one-hour reservations every other hour, on each of ten days from AVAILABILITY_DAY on
+SEED_ROOMS_QUERY = """
+    WITH rooms AS (
+        INSERT INTO hzs_study_room (capacity)
+        SELECT 4 + g %% 8 FROM generate_series(1, %(rooms)s) g
+        RETURNING room_id
+    )
+    INSERT INTO hzs_room_reservation (room_id, topic_description, reserve_date, start_time, end_time,
+                                      group_size, l_name, f_name)
+    SELECT room_id, 'Bench', slot::date, slot, slot + interval '1 hour', 2, 'Bench', 'Reader'
+    FROM rooms, generate_series(0, %(per_room)s - 1) i,
+         LATERAL (SELECT %(day)s::timestamp + (i / 10) * interval '1 day' + (i %% 10) * interval '2 hours' AS slot) s
+"""
+
+
+def best_of(repeat, func, number=1):
+    """Best wall time of `repeat` runs, per call of func, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1000
+
+
+def report(name, variants):
+    """variants: [(label, ms)] or [(label, ms, note)]; the first one is the baseline the others are compared to."""
+    print(f"\n{name}")
+    base = variants[0][1]
+    for label, ms, *note in variants:
+        speedup = " " * 9 if label == variants[0][0] else f"  {base / ms:6.1f}x"
+        print(f"  {label:<42} {ms:10.3f} ms{speedup}  {' '.join(note)}".rstrip())
+
+
+def _rss():
+    """Resident set size of this process in bytes, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_growth(func):
+    """Peak resident set size above the starting one while func() runs, as text for report()."""
+    gc.collect()
+    baseline = _rss()
+    if baseline is None:
+        return "peak RSS n/a"
+    peak = baseline
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(0.001):
+            peak = max(peak, _rss())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+    peak = max(peak, _rss())
+    return f"peak RSS +{(peak - baseline) / 2 ** 20:.1f} MiB"
+
+
+def bench_jwt(args):
+    token = oauth2.create_access_token({"user_id": 1, "role": "admin"})
+    error = Exception("invalid token")
+
+    def cold():
+        oauth2.token_cache.clear()
+        oauth2.verify_access_token(token, error)
+
+    oauth2.verify_access_token(token, error)
+    report("JWT verification (per request)", [
+        ("jwt.decode (cache miss)", best_of(args.repeat, cold, number=1000)),
+        ("token cache hit", best_of(args.repeat, lambda: oauth2.verify_access_token(token, error), number=1000)),
+    ])
+
+
+def bench_hashing(args):
+    jobs = settings.password_hash_workers * 2
+
+    async def pooled():
+        await asyncio.gather(*(utils.hash_async("correct horse battery staple") for _ in range(jobs)))
+
+    report(f"bcrypt, {jobs} hashes", [
+        ("one after another", best_of(args.repeat, lambda: [utils.hash("correct horse battery staple") for _ in range(jobs)])),
+        (f"hashing pool ({settings.password_hash_workers} workers)", best_of(args.repeat, lambda: asyncio.run(pooled()))),
+    ])
+
+
+def bench_serialization(args):
+    rows = [
+        {"author_id": i, "f_name": "Bench", "l_name": f"Author{i}", "email": f"author{i}@example.com",
+         "state": "NY", "country": "US", "street": "Main St", "city": "New York"}
+        for i in range(args.rows)
+    ]
+    adapter = TypeAdapter(List[schemas.AuthorOut])
+    response = TrustedJSONResponse(content=[])
+    report(f"serializing {args.rows} AuthorOut rows", [
+        ("response_model validation + jsonable_encoder",
+         best_of(args.repeat, lambda: json.dumps(jsonable_encoder(adapter.validate_python(rows))).encode())),
+        ("TrustedJSONResponse.render", best_of(args.repeat, lambda: response.render(rows))),
+    ])
+
+
+def bench_pool(args):
+    database.pool.open()
+
+    def checkout():
+        database.pool.putconn(database.pool.getconn())
+
+    def connect():
+        psycopg2.connect(database.pool.dsn).close()
+
+    report("getting a connection", [
+        ("psycopg2.connect", best_of(args.repeat, connect, number=20)),
+        ("pool checkout + return", best_of(args.repeat, checkout, number=1000)),
+    ])
+
+
+def _seeded(args, queries=SEED_QUERIES):
+    """Pooled connection with the synthetic rows inserted (not committed)."""
+    conn = database.pool.getconn()
+    with conn.cursor() as cursor:
+        for query in queries:
+            cursor.execute(query, {"n": args.rows})
+        cursor.execute("ANALYZE hzs_author, hzs_book, hzs_book_author, hzs_book_copy")
+    return conn
+
+
+def bench_include(args):
+    conn = _seeded(args)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT book_id, b_name, topic FROM hzs_book WHERE topic = 'bench' ORDER BY book_id LIMIT %s",
+                       (PAGE_SIZE,))
+        page = cursor.fetchall()
+        db = database.AsyncCursor(cursor)
+        expansions = {"authors", "copies", "availability"}
+
+        async def per_book():
+            for row in [dict(row) for row in page]:
+                await db.execute(GET_AUTHORS_BY_BOOK_QUERY, (row["book_id"],))
+                row["authors"] = await db.fetchall()
+                await db.execute(GET_COPIES_BY_BOOKS_QUERY, ([row["book_id"]],))
+                row["copies"] = await db.fetchall()
+                await db.execute(GET_AVAILABILITY_BY_BOOKS_QUERY, ([row["book_id"]],))
+                row["availability"] = await db.fetchone()
+
+        async def run():
+            return (
+                await _best_of_async(args.repeat, per_book),
+                await _best_of_async(args.repeat, lambda: expand_books(db, [dict(row) for row in page], expansions)),
+            )
+
+        n_plus_one, batched = asyncio.run(run())
+        report(f"?include=authors,copies,availability, page of {len(page)} books", [
+            ("one query per book and relation", n_plus_one),
+            ("expand_books (one query per relation)", batched),
+        ])
+    finally:
+        cursor.close()
+        conn.rollback()
+        database.pool.putconn(conn)
+
+
+async def _best_of_async(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def bench_import(args):
+    conn = _seeded(args)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT author_id FROM hzs_author WHERE f_name = 'Bench' ORDER BY author_id LIMIT 1")
+        author_id = int(cursor.fetchone()["author_id"])
+        records = [{"b_name": f"Imported {i}", "topic": "bench", "copies": 2, "author_ids": [author_id]}
+                   for i in range(args.rows)]
+        upload = "".join(json.dumps(record) + "\n" for record in records).encode()
+
+        def rolled_back(func):
+            def run():
+                cursor.execute("SAVEPOINT bench_import")
+                func()
+                cursor.execute("ROLLBACK TO SAVEPOINT bench_import")
+            return run
+
+        def row_by_row():
+            for record in records:
+                schemas.BookImportRow.model_validate(record)
+                cursor.execute("INSERT INTO hzs_book (b_name, topic) VALUES (%s, %s) RETURNING book_id",
+                               (record["b_name"], record["topic"]))
+                book_id = cursor.fetchone()["book_id"]
+                cursor.execute("INSERT INTO hzs_book_author (book_id, author_id) VALUES (%s, %s)", (book_id, author_id))
+                for _ in range(record["copies"]):
+                    cursor.execute("INSERT INTO hzs_book_copy (book_id, status) VALUES (%s, 'AVAILABLE')", (book_id,))
+
+        report(f"importing {args.rows} books with 2 copies each", [
+            ("row-by-row INSERTs", best_of(args.repeat, rolled_back(row_by_row))),
+            ("import_books (COPY)", best_of(args.repeat, rolled_back(lambda: import_books(cursor, io.BytesIO(upload), "ndjson")))),
+        ])
+    finally:
+        cursor.close()
+        conn.rollback()
+        database.pool.putconn(conn)
+
+
+def bench_json_lists(args):
+    # GET /author/ reads authors only
+    conn = _seeded(args, SEED_QUERIES[:1])
+    cursor = conn.cursor()
+    adapter = TypeAdapter(List[schemas.AuthorOut])
+    response = TrustedJSONResponse(content=[])
+
+    def validated():
+        cursor.execute(GET_ALL_AUTHORS_QUERY)
+        json.dumps(jsonable_encoder(adapter.validate_python(cursor.fetchall()))).encode()
+
+    def trusted():
+        response.render(fetch_trusted(cursor, GET_ALL_AUTHORS_QUERY, None, schemas.AuthorOut))
+
+    def built_by_postgres():
+        fetch_json(cursor, GET_ALL_AUTHORS_QUERY, None, schemas.AuthorOut).encode()
+
+    try:
+        cursor.execute("SELECT count(*) AS authors FROM hzs_author")
+        authors = cursor.fetchone()["authors"]
+        report(f"GET /author/ body, {authors} authors", [
+            (label, best_of(args.repeat, func), peak_rss_growth(func))
+            for label, func in [
+                ("dict rows + response_model", validated),
+                ("fetch_trusted + TrustedJSONResponse", trusted),
+                ("fetch_json (built by PostgreSQL)", built_by_postgres),
+            ]
+        ])
+    finally:
+        cursor.close()
+        conn.rollback()
+        database.pool.putconn(conn)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def report_latency(name, variants, by_throughput=False):
+    """
+    variants: [(label, latencies in ms, wall time in s)]; the first one is the baseline,
+    compared on p99 latency or, with by_throughput, on requests/sec.
+    """
+    print(f"\n{name}")
+
+    def score(latencies, seconds):
+        return len(latencies) / seconds if by_throughput else 1 / percentile(latencies, 99)
+
+    base = score(*variants[0][1:])
+    for label, latencies, seconds in variants:
+        p99 = percentile(latencies, 99)
+        speedup = "" if label == variants[0][0] else f"  {score(latencies, seconds) / base:6.1f}x"
+        print(f"  {label:<42} p50 {percentile(latencies, 50):9.1f} ms  p99 {p99:9.1f} ms"
+              f"  {len(latencies) / seconds:8.0f} req/s{speedup}")
+
+
+def _admin_headers(user_id=0):
+    """Bearer token for a synthetic admin with no customer row, kept in oauth2.user_cache for the run."""
+    oauth2.user_cache = TTLCache(max_size=settings.user_cache_max_size, ttl=24 * 3600)
+    oauth2.user_cache.set(user_id, {"user_id": user_id, "role": "admin"})
+    return {"Authorization": f"Bearer {oauth2.create_access_token({'user_id': user_id, 'role': 'admin'})}"}
+
+
+async def _load(http, clients, send, requests_per_client=REQUESTS_PER_CLIENT):
+    """`clients` concurrent clients, each awaiting send(http) in turn; latencies in ms and wall time in s."""
+    latencies = []
+
+    async def client():
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            response = await send(http)
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, time.perf_counter() - started
+
+
+def _measure_load(clients, send):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            await _load(http, clients, send, requests_per_client=1)
+            return await _load(http, clients, send)
+
+    return asyncio.run(run())
+
+
+def _measure_during(clients, send, burst, burst_size):
+    """Latencies of `clients` clients sending in a loop while `burst_size` concurrent burst(http) calls run."""
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            await _load(http, clients, send, requests_per_client=1)
+            latencies = []
+            done = asyncio.Event()
+
+            async def client():
+                while not done.is_set():
+                    started = time.perf_counter()
+                    response = await send(http)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    response.raise_for_status()
+
+            async def bursts():
+                try:
+                    for response in await asyncio.gather(*(burst(http) for _ in range(burst_size))):
+                        response.raise_for_status()
+                finally:
+                    done.set()
+
+            started = time.perf_counter()
+            await asyncio.gather(bursts(), *(client() for _ in range(clients)))
+            return latencies, time.perf_counter() - started
+
+    return asyncio.run(run())
+
+
+def bench_throughput(args):
+    database.pool.open()
+    headers = _admin_headers()
+    conn = database.pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT coalesce((SELECT customer_id FROM hzs_rental GROUP BY customer_id
+                                 ORDER BY count(*) DESC LIMIT 1), 0) AS customer_id
+            """)
+            customer_id = cursor.fetchone()["customer_id"]
+        conn.rollback()
+    finally:
+        database.pool.putconn(conn)
+
+    routes = [
+        ("GET /book/", lambda http: http.get("/book/", params={"limit": PAGE_SIZE}, headers=headers)),
+        (f"GET /rental/customer/{customer_id}", lambda http: http.get(f"/rental/customer/{customer_id}")),
+    ]
+    pool = database.pool
+    # every connection is past its lifetime when it is returned, so each request connects;
+    # nothing is prepared on it, as on the connections opened before the pool
+    unpooled = database.ConnectionPool(pool.dsn, min_size=0, max_size=pool.max_size, max_lifetime=1e-9,
+                                       timeout=pool.timeout, check_on_checkout=False)
+    for route, send in routes:
+        database.pool = unpooled
+        prepared = settings.prepared_statements_enabled
+        settings.prepared_statements_enabled = False
+        try:
+            connecting = _measure_load(args.clients, send)
+        finally:
+            settings.prepared_statements_enabled = prepared
+            database.pool = pool
+        report_latency(f"{route}, {args.clients} concurrent clients x {REQUESTS_PER_CLIENT} requests", [
+            ("new connection per request", *connecting),
+            (f"ConnectionPool (max {pool.max_size})", *_measure_load(args.clients, send)),
+        ], by_throughput=True)
+
+
+async def _query_on_the_loop(func, *args):
+    return func(*args)
+
+
+def bench_concurrency(args):
+    database.pool.open()
+    headers = _admin_headers()
+
+    def books(http):
+        return http.get("/book/", params={"limit": PAGE_SIZE}, headers=headers)
+
+    run_query = database._run_query
+    database._run_query = _query_on_the_loop
+    try:
+        blocking = _measure_load(args.clients, books)
+    finally:
+        database._run_query = run_query
+    report_latency(f"GET /book/, {args.clients} concurrent clients x {REQUESTS_PER_CLIENT} requests", [
+        ("queries on the event loop", *blocking),
+        ("queries on worker threads (AsyncCursor)", *_measure_load(args.clients, books)),
+    ])
+
+
+async def _verify_on_the_loop(plain_password, hashed_password):
+    return utils.verify(plain_password, hashed_password)
+
+
+def bench_login_storm(args):
+    database.pool.open()
+    headers = _admin_headers()
+    conn = database.pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM hzs_customer WHERE email = %s", (BENCH_EMAIL,))
+            cursor.execute(
+                """
+                INSERT INTO hzs_customer (l_name, f_name, phone, email, id_type, id_num, password)
+                VALUES ('Bench', 'Login', '5550100', %s, 'SSN', '1', %s)
+                """,
+                (BENCH_EMAIL, utils.hash(BENCH_PASSWORD)),
+            )
+        conn.commit()
+
+        def books(http):
+            return http.get("/book/", params={"limit": PAGE_SIZE}, headers=headers)
+
+        def login(http):
+            return http.post("/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+
+        def during_logins():
+            return _measure_during(BYSTANDER_CLIENTS, books, login, LOGIN_CLIENTS)
+
+        alone = _measure_load(BYSTANDER_CLIENTS, books)
+        verify_async = utils.verify_async
+        utils.verify_async = _verify_on_the_loop
+        try:
+            blocking = during_logins()
+        finally:
+            utils.verify_async = verify_async
+        pooled = during_logins()
+        report_latency(f"GET /book/, {BYSTANDER_CLIENTS} clients, during {LOGIN_CLIENTS} concurrent logins", [
+            ("bcrypt on the event loop", *blocking),
+            (f"hashing pool ({settings.password_hash_workers} workers)", *pooled),
+            ("no logins", *alone),
+        ])
+    finally:
+        conn.rollback()
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM hzs_customer WHERE email = %s", (BENCH_EMAIL,))
+        conn.commit()
+        database.pool.putconn(conn)
+
+
+def _free_slots(reservations, start, end):
+    """Gaps between a room's reservations (ordered by start_time) within [start, end)."""
+    slots, free_from = [], start
+    for reservation in reservations:
+        if reservation["start_time"] > free_from:
+            slots.append({"start": free_from, "end": min(reservation["start_time"], end)})
+        free_from = max(free_from, reservation["end_time"])
+    if free_from < end:
+        slots.append({"start": free_from, "end": end})
+    return slots
+
+
+def bench_availability(args):
+    conn = database.pool.getconn()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SEED_ROOMS_QUERY, {"rooms": AVAILABILITY_ROOMS, "per_room": RESERVATIONS_PER_ROOM,
+                                          "day": AVAILABILITY_DAY})
+        cursor.execute("ANALYZE hzs_study_room, hzs_room_reservation")
+        db = database.AsyncCursor(cursor)
+        window_start = datetime.datetime.combine(AVAILABILITY_DAY, datetime.time(0))
+        window_end = window_start + datetime.timedelta(days=1)
+
+        async def per_room():
+            await db.execute(study_room.GET_ALL_ROOMS_QUERY)
+            rooms = []
+            for room in await db.fetchall():
+                await db.execute(study_room.GET_ROOM_RESERVATIONS_QUERY, (room["room_id"], window_start, window_end))
+                slots = _free_slots(await db.fetchall(), window_start, window_end)
+                if slots:
+                    rooms.append({"room_id": room["room_id"], "capacity": room["capacity"], "free_slots": slots})
+            return rooms
+
+        async def run():
+            return (
+                await _best_of_async(args.repeat, per_room),
+                await _best_of_async(args.repeat, lambda: study_room.get_room_availability(
+                    day=AVAILABILITY_DAY, start=datetime.time(0), end=None, min_capacity=1, db=db)),
+            )
+
+        one_per_room, availability = asyncio.run(run())
+        report(f"free slots on one day, {AVAILABILITY_ROOMS} rooms x {RESERVATIONS_PER_ROOM} reservations", [
+            ("one reservations query per room", one_per_room),
+            ("ROOM_AVAILABILITY_QUERY (target: < 30 ms)", availability),
+        ])
+    finally:
+        cursor.close()
+        conn.rollback()
+        database.pool.putconn(conn)
+
+
+BENCHMARKS = {
+    "jwt": bench_jwt,
+    "hashing": bench_hashing,
+    "serialization": bench_serialization,
+    "pool": bench_pool,
+    "include": bench_include,
+    "import": bench_import,
+    "json_lists": bench_json_lists,
+    "availability": bench_availability,
+    "throughput": bench_throughput,
+    "concurrency": bench_concurrency,
+    "login_storm": bench_login_storm,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the API's hot paths.")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--rows", type=int, default=None,
+                        help=f"rows generated per benchmark (default: {DEFAULT_ROWS}, json_lists {BENCHMARK_ROWS['json_lists']})")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant, the best one is reported")
+    parser.add_argument("--clients", type=int, default=200, help="concurrent clients of the load benchmarks")
+    args = parser.parse_args()
+    unknown = set(args.names).difference(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    # one line per request would drown the report
+    for name in ("httpx", "app"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    # the API prepares these on every pooled connection
+    statements.register_modules(oauth2, author, book, rental)
+    rows = args.rows
+    try:
+        for name in args.names or BENCHMARKS:
+            args.rows = rows or BENCHMARK_ROWS.get(name, DEFAULT_ROWS)
+            try:
+                BENCHMARKS[name](args)
+            except psycopg2.OperationalError as error:
+                print(f"\n{name}: skipped, no database ({str(error).strip().splitlines()[0]})")
+    finally:
+        database.pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Shared fixtures.
+
+Most tests run the app against `fake_db`, a stand-in for the pooled psycopg2 connection
+whose `responder(query, params)` returns the rows for each statement. Tests that need a
+real server are marked `postgres` and run only when TEST_DATABASE_URL points at a
+scratch database; the `pg_database` fixture migrates it to head first.
+"""
+import os
+
+# Settings are read when app.config is imported
+for _name, _value in {
+    "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_NAME": "hzs_test",
+    "DATABASE_USERNAME": "hzs",
+    "DATABASE_PASSWORD": "hzs",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "RESERVATION_INDEX_ENABLED": "false",
+    "PREPARED_STATEMENTS_ENABLED": "false",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+if os.getenv("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import subprocess
+import sys
+import psycopg2.extensions
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database, oauth2, response_cache
+from app.main import app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: needs TEST_DATABASE_URL (a scratch PostgreSQL database)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv("TEST_DATABASE_URL"):
+        return
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+class Column:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeCursor:
+    name = None
+
+    def __init__(self, connection, tuples):
+        self.connection = connection
+        self.tuples = tuples
+        self.rows = []
+        self.description = None
+        self.rowcount = 0
+
+    def execute(self, query, vars=None):
+        self.connection.log.append((" ".join(query.split()), vars))
+        rows = list(self.connection.responder(query, vars) or [])
+        self.rowcount = len(rows)
+        self.description = [Column(name) for name in rows[0]] if rows and isinstance(rows[0], dict) else None
+        self.rows = [tuple(row.values()) for row in rows] if self.tuples and self.description else rows
+
+    def copy_expert(self, sql, file):
+        # the streamed data takes the place of the parameters in the log
+        self.connection.log.append((" ".join(sql.split()), file.read().decode("utf-8")))
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeConnection:
+    closed = 0
+    autocommit = False
+
+    def __init__(self):
+        self.log = []
+        self.responder = lambda query, vars: []
+        self.prepared_statements = frozenset()
+
+    def cursor(self, name=None, cursor_factory=None):
+        # the pool's default cursor returns dicts; explicit factories (tuple cursors) tuples
+        return FakeCursor(self, tuples=cursor_factory is not None)
+
+    def commit(self):
+        self.log.append(("COMMIT", None))
+
+    def rollback(self):
+        self.log.append(("ROLLBACK", None))
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def queries(self, fragment):
+        return [query for query, _ in self.log if fragment in query]
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    response_cache._backend = None
+    response_cache._stats.update(dict.fromkeys(response_cache._stats, 0))
+    oauth2.token_cache.clear()
+    oauth2.user_cache.clear()
+    yield
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(database.pool, "getconn", lambda timeout=None: conn)
+    monkeypatch.setattr(database.pool, "putconn", lambda c: None)
+    return conn
+
+
+@pytest.fixture
+def client():
+    # no `with`: the lifespan would open the pool against the configured server
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers():
+    """auth_headers(user_id, role) -> Authorization header with a fresh access token."""
+    def make(user_id=1, role="admin"):
+        return {"Authorization": "Bearer " + oauth2.create_access_token({"user_id": user_id, "role": role})}
+    return make
+
+
+@pytest.fixture(scope="session")
+def pg_database():
+    """DSN of TEST_DATABASE_URL, migrated to head."""
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, check=True)
+    return os.environ["TEST_DATABASE_URL"]
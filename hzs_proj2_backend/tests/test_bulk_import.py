@@ -0,0 +1,94 @@
+import io
+import json
+from app import bulk_import
+from app.bulk_import import _copy_text, _csv_records, _ndjson_records, import_books
+
+
+def _upload(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def _staged(fake_db):
+    """Rows sent to the staging table, split into COPY's text-format fields."""
+    (data,) = [data for query, data in fake_db.log if query.startswith("COPY hzs_book_import")]
+    return [line.split("\t") for line in data.splitlines()]
+
+
+def test_copy_text_escapes_the_copy_delimiters():
+    assert _copy_text("plain") == "plain"
+    assert _copy_text("a\tb\nc\rd") == "a\\tb\\nc\\rd"
+    # backslashes first, so the escapes added for the other characters stay intact
+    assert _copy_text("C:\\new\tdir") == "C:\\\\new\\tdir"
+
+
+def test_csv_rows_are_numbered_after_the_header():
+    upload = _upload(
+        "\ufeffb_name,topic,copies,author_ids\n"
+        "Dune,SF,2,\"1, 2\"\n"
+        "Emma,,,3;4\n"
+    )
+    assert list(_csv_records(upload)) == [
+        (1, {"b_name": "Dune", "topic": "SF", "copies": "2", "author_ids": ["1", "2"]}),
+        (2, {"b_name": "Emma", "topic": None, "copies": 0, "author_ids": ["3", "4"]}),
+    ]
+    # the wrapper is detached, so the upload is not closed with it
+    assert not upload.closed
+
+
+def test_ndjson_rows_keep_their_line_numbers():
+    records = list(_ndjson_records(_upload('{"b_name": "Dune"}\n\n   \n{oops\n{"b_name": "Emma"}\n')))
+    assert [row_num for row_num, _ in records] == [1, 4, 5]
+    assert records[0][1] == {"b_name": "Dune"}
+    assert isinstance(records[1][1], ValueError)
+
+
+def test_rejected_rows_are_reported_with_their_row_numbers(fake_db):
+    upload = _upload(
+        "b_name,topic,copies,author_ids\n"
+        "Dune,SF,2,1\n"
+        ",SF,1,1\n"
+        "Emma,Classics,-1,x\n"
+    )
+    result = import_books(fake_db.cursor(), upload, "csv")
+
+    assert [row[0] for row in _staged(fake_db)] == ["1"]
+    assert result["rejected_rows"] == 2
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert result["errors"][0]["errors"] == ["b_name: String should have at least 1 character"]
+    assert [message.split(":")[0] for message in result["errors"][1]["errors"]] == ["copies", "author_ids.0"]
+
+
+def test_unknown_authors_are_rejected_in_row_order(fake_db):
+    def responder(query, vars):
+        if "NOT EXISTS (SELECT 1 FROM hzs_author" in query:
+            return [{"row_num": 2, "author_ids": [99]}]
+        return []
+    fake_db.responder = responder
+    upload = _upload("\n".join(json.dumps(row) for row in (
+        {"b_name": "Dune", "topic": "SF", "author_ids": [1]},
+        {"b_name": "Emma", "topic": "Classics", "author_ids": [99]},
+        {"b_name": "Ulysses", "topic": "Classics", "copies": "many"},
+    )))
+    result = import_books(fake_db.cursor(), upload, "ndjson")
+
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert result["errors"][0]["errors"] == ["author_ids: unknown author id(s) 99"]
+    assert [vars for query, vars in fake_db.log if query.startswith("DELETE FROM hzs_book_import")] == [([2],)]
+
+
+def test_staged_values_are_escaped_for_copy(fake_db):
+    upload = _upload(json.dumps({"b_name": "Tabs\there\\and\nlines", "topic": "odd", "copies": 1,
+                                 "author_ids": [3, 4]}) + "\n")
+    import_books(fake_db.cursor(), upload, "ndjson")
+    assert _staged(fake_db) == [["1", "Tabs\\there\\\\and\\nlines", "odd", "1", "{3,4}"]]
+
+
+def test_reported_errors_are_capped(fake_db):
+    rows = bulk_import.MAX_REPORTED_ERRORS + 5
+    upload = _upload("b_name,topic,copies,author_ids\n" + ",SF,1,1\n" * rows)
+    result = import_books(fake_db.cursor(), upload, "csv")
+
+    assert result["rejected_rows"] == rows
+    assert len(result["errors"]) == bulk_import.MAX_REPORTED_ERRORS
+    assert result["errors"][-1]["row"] == bulk_import.MAX_REPORTED_ERRORS
+    assert _staged(fake_db) == []
@@ -0,0 +1,142 @@
+import datetime
+import threading
+import time
+import psycopg2
+import pytest
+from psycopg2.extras import RealDictCursor
+from app.availability import FOLD_DELTAS_QUERY
+from app.routers.book import GET_AVAILABILITY_BY_BOOKS_QUERY
+from app.routers.rental import CHECKOUT_BOOK_QUERY
+
+pytestmark = pytest.mark.postgres
+
+BORROWERS = 100
+COPIES = 20
+# connections hitting the server at once; stays below the default max_connections
+WORKERS = 40
+
+BORROW_DATE = datetime.datetime(2026, 1, 5, 10, 0)
+RETURN_DATE = BORROW_DATE + datetime.timedelta(days=14)
+
+
+@pytest.fixture
+def title(pg_database):
+    """A book with COPIES available copies and BORROWERS customers; returns (book_id, customer_ids)."""
+    conn = psycopg2.connect(pg_database)
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO hzs_book (b_name, topic) VALUES ('Checkout race', 'test') RETURNING book_id")
+        book_id = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT INTO hzs_book_copy (book_id, status) SELECT %s, 'AVAILABLE' FROM generate_series(1, %s)",
+            (book_id, COPIES),
+        )
+        cursor.execute(
+            """
+            INSERT INTO hzs_customer (l_name, f_name, phone, email, id_type, id_num, password)
+            SELECT 'Race', 'Borrower', '5550100', 'race' || g || '@example.com', 'SSN', g::text, 'x'
+            FROM generate_series(1, %s) g
+            RETURNING customer_id
+            """,
+            (BORROWERS,),
+        )
+        customer_ids = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+    yield book_id, customer_ids
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM hzs_rental WHERE copy_id IN (SELECT copy_id FROM hzs_book_copy WHERE book_id = %s)",
+            (book_id,),
+        )
+        cursor.execute("DELETE FROM hzs_book_copy WHERE book_id = %s", (book_id,))
+        cursor.execute("DELETE FROM hzs_book WHERE book_id = %s", (book_id,))
+        cursor.execute("DELETE FROM hzs_customer WHERE customer_id = ANY(%s)", (customer_ids,))
+    conn.commit()
+    conn.close()
+
+
+def _checkout(conn, book_id, customer_id):
+    with conn.cursor() as cursor:
+        cursor.execute(CHECKOUT_BOOK_QUERY, (book_id, BORROW_DATE, RETURN_DATE, customer_id))
+        return cursor.fetchone()
+
+
+def _availability(conn, book_id):
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(GET_AVAILABILITY_BY_BOOKS_QUERY, ([book_id],))
+        return dict(cursor.fetchone())
+
+
+def test_hundred_borrowers_share_twenty_copies(pg_database, title, record_property, capsys):
+    book_id, customer_ids = title
+    # the last worker to arrive records when the checkouts start
+    started = []
+    start = threading.Barrier(WORKERS, action=lambda: started.append(time.perf_counter()))
+    rentals, errors = [], []
+
+    def borrow(customers):
+        conn = psycopg2.connect(pg_database)
+        try:
+            start.wait()
+            for customer_id in customers:
+                rental = _checkout(conn, book_id, customer_id)
+                conn.commit()
+                if rental:
+                    rentals.append(rental)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=borrow, args=(customer_ids[i::WORKERS],)) for i in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started[0]
+
+    # every attempt is a checkout transaction, whether or not a copy was left
+    rate = BORROWERS / elapsed
+    record_property("checkouts_per_second", round(rate, 1))
+    with capsys.disabled():
+        print(f"\n{BORROWERS} checkouts by {WORKERS} connections in {elapsed * 1000:.1f} ms ({rate:.0f}/s)")
+
+    assert errors == []
+    assert len(rentals) == COPIES
+    assert len({rental[-1] for rental in rentals}) == COPIES
+
+    expected = {"book_id": book_id, "total": COPIES, "available": 0, "on_loan": COPIES, "late": 0}
+    conn = psycopg2.connect(pg_database)
+    try:
+        assert _availability(conn, book_id) == expected
+
+        # folding moves the deltas into the counter row without changing what readers see
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            while True:
+                cursor.execute(FOLD_DELTAS_QUERY, {"batch_size": 1000})
+                if cursor.fetchone()["deltas"] < 1000:
+                    break
+            conn.commit()
+            cursor.execute("SELECT count(*) AS pending FROM hzs_book_availability_delta WHERE book_id = %s", (book_id,))
+            assert cursor.fetchone()["pending"] == 0
+            cursor.execute("SELECT total, available, on_loan, late FROM hzs_book_availability WHERE book_id = %s", (book_id,))
+            assert dict(cursor.fetchone()) == {key: expected[key] for key in ("total", "available", "on_loan", "late")}
+        assert _availability(conn, book_id) == expected
+    finally:
+        conn.close()
+
+
+def test_open_checkout_does_not_block_the_next_borrower(pg_database, title):
+    book_id, customer_ids = title
+    first, second = psycopg2.connect(pg_database), psycopg2.connect(pg_database)
+    try:
+        assert _checkout(first, book_id, customer_ids[0])
+        # the first transaction is still open; a shared counter row would make this wait
+        with second.cursor() as cursor:
+            cursor.execute("SET lock_timeout = '2s'")
+        assert _checkout(second, book_id, customer_ids[1])
+        second.commit()
+        first.commit()
+    finally:
+        first.close()
+        second.close()
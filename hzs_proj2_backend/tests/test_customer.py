@@ -0,0 +1,17 @@
+from psycopg2 import errors
+
+
+def test_deleting_a_customer_with_rentals_is_a_conflict(fake_db, client, auth_headers):
+    def responder(query, vars):
+        if query.lstrip().startswith("DELETE FROM hzs_customer"):
+            raise errors.ForeignKeyViolation("update or delete on table \"hzs_customer\" violates foreign key constraint")
+        if "FROM hzs_customer" in query:
+            return [{"customer_id": vars[0], "role": "admin"}]
+        return []
+    fake_db.responder = responder
+
+    response = client.delete("/customer/42", headers=auth_headers(1))
+    assert response.status_code == 409
+    assert "customer with id 42 still has rentals" in response.json()["detail"]
+    assert fake_db.log[-1] == ("ROLLBACK", None)
+    assert fake_db.queries("COMMIT") == []
@@ -0,0 +1,97 @@
+import datetime
+import psycopg2
+import pytest
+from app import database, schemas
+from app.config import settings
+from app.fast_json import fetch_json, json_list_query
+from app.routers.author import GET_ALL_AUTHORS_QUERY
+
+AUTHOR = {"author_id": 1, "f_name": "Ursula", "l_name": "Le Guin", "email": "ursula@example.com",
+          "state": "OR", "country": "US", "street": "Main St", "city": "Portland"}
+
+
+def test_numeric_fields_are_cast_like_the_model():
+    query = json_list_query("SELECT ...", schemas.RentalOut)
+    assert "'rental_id', r.rental_id::int8" in query
+    assert "'rental_status', r.rental_status," in query
+    assert "'actual_return_date', r.actual_return_date," in query
+
+
+def test_fetch_json_rejects_columns_that_do_not_match_the_model(fake_db):
+    # FakeCursor describes the columns of the rows it returns, so the LIMIT 0 probe returns one
+    fake_db.responder = lambda query, vars: [{"author_id": 1, "f_name": "Ursula"}]
+    with pytest.raises(RuntimeError, match="do not match AuthorOut"):
+        fetch_json(fake_db.cursor(), "SELECT author_id, f_name FROM hzs_author", None, schemas.AuthorOut)
+    assert fake_db.queries("json_agg") == []
+
+
+def test_fetch_json_checks_each_query_once(fake_db):
+    fake_db.responder = lambda query, vars: [{"json": "[]"}] if "json_agg" in query else [AUTHOR]
+    for _ in range(2):
+        assert fetch_json(fake_db.cursor(), GET_ALL_AUTHORS_QUERY, None, schemas.AuthorOut) == "[]"
+    assert len(fake_db.queries("LIMIT 0")) == 1
+    assert len(fake_db.queries("json_agg")) == 2
+
+
+def _typed(rows):
+    return [{key: (type(value).__name__, value) for key, value in row.items()} for row in rows]
+
+
+@pytest.fixture
+def customer_with_rentals(pg_database):
+    conn = psycopg2.connect(pg_database)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO hzs_customer (l_name, f_name, phone, email, id_type, id_num, password)
+            VALUES ('Json', 'Reader', '5550100', 'json@example.com', 'SSN', '1', 'x')
+            RETURNING customer_id
+            """
+        )
+        customer_id = cursor.fetchone()[0]
+        cursor.execute("INSERT INTO hzs_book (b_name, topic) VALUES ('Json paths', 'test') RETURNING book_id")
+        book_id = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT INTO hzs_book_copy (book_id, status) SELECT %s, 'AVAILABLE' FROM generate_series(1, 2) RETURNING copy_id",
+            (book_id,),
+        )
+        copy_ids = [row[0] for row in cursor.fetchall()]
+        borrowed = datetime.datetime(2026, 2, 1, 9, 30)
+        cursor.execute(
+            """
+            INSERT INTO hzs_rental (rental_status, borrow_date, expected_return_date, actual_return_date, customer_id, copy_id)
+            VALUES ('RETURNED', %(borrowed)s, %(due)s, %(due)s, %(customer)s, %(first)s),
+                   ('BORROWED', %(borrowed)s, %(due)s, NULL, %(customer)s, %(second)s)
+            """,
+            {"borrowed": borrowed, "due": borrowed + datetime.timedelta(days=14),
+             "customer": customer_id, "first": copy_ids[0], "second": copy_ids[1]},
+        )
+    conn.commit()
+    yield int(customer_id)
+
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM hzs_invoice WHERE rental_id IN (SELECT rental_id FROM hzs_rental WHERE customer_id = %s)",
+                       (customer_id,))
+        cursor.execute("DELETE FROM hzs_rental WHERE customer_id = %s", (customer_id,))
+        cursor.execute("DELETE FROM hzs_book_copy WHERE book_id = %s", (book_id,))
+        cursor.execute("DELETE FROM hzs_book WHERE book_id = %s", (book_id,))
+        cursor.execute("DELETE FROM hzs_customer WHERE customer_id = %s", (customer_id,))
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.postgres
+def test_json_list_matches_the_response_model_output(client, customer_with_rentals, monkeypatch):
+    path = f"/rental/customer/{customer_with_rentals}"
+    database.pool.open()
+    try:
+        validated = client.get(path)
+        monkeypatch.setattr(settings, "postgres_json_lists", True)
+        built_by_postgres = client.get(path)
+    finally:
+        database.pool.close()
+
+    assert validated.status_code == built_by_postgres.status_code == 200
+    assert len(validated.json()) == 2
+    # typed: 7 == 7.0 in Python, but not in the response body
+    assert _typed(built_by_postgres.json()) == _typed(validated.json())
@@ -0,0 +1,106 @@
+import datetime
+from decimal import Decimal
+import psycopg2
+import pytest
+from app import database, overdue
+from app.overdue import LATE_FEE_PER_DAY, TRY_LOCK_QUERY, UNLOCK_QUERY
+
+pytestmark = pytest.mark.postgres
+
+LOAN_DAYS = 14
+DAYS_LATE = 6
+# rate of the rental invoice written by trg_generate_invoice_func
+RENTAL_FEE_PER_DAY = Decimal("0.2")
+
+
+@pytest.fixture
+def overdue_rental(pg_database):
+    """A rental DAYS_LATE days (and an hour) past its due date; returns (rental_id, now)."""
+    conn = psycopg2.connect(pg_database)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT LOCALTIMESTAMP(0)")
+        now = cursor.fetchone()[0]
+        due = now - datetime.timedelta(days=DAYS_LATE, hours=1)
+        cursor.execute("INSERT INTO hzs_book (b_name, topic) VALUES ('Overdue sweep', 'test') RETURNING book_id")
+        book_id = cursor.fetchone()[0]
+        cursor.execute("INSERT INTO hzs_book_copy (book_id, status) VALUES (%s, 'UNAVAILABLE') RETURNING copy_id",
+                       (book_id,))
+        copy_id = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            INSERT INTO hzs_customer (l_name, f_name, phone, email, id_type, id_num, password)
+            VALUES ('Late', 'Reader', '5550100', 'late@example.com', 'SSN', '1', 'x')
+            RETURNING customer_id
+            """
+        )
+        customer_id = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            INSERT INTO hzs_rental (rental_status, borrow_date, expected_return_date, customer_id, copy_id)
+            VALUES ('BORROWED', %s, %s, %s, %s)
+            RETURNING rental_id
+            """,
+            (due - datetime.timedelta(days=LOAN_DAYS), due, customer_id, copy_id),
+        )
+        rental_id = cursor.fetchone()[0]
+    conn.commit()
+    yield int(rental_id), now
+
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM hzs_invoice WHERE rental_id = %s", (rental_id,))
+        cursor.execute("DELETE FROM hzs_rental WHERE rental_id = %s", (rental_id,))
+        cursor.execute("DELETE FROM hzs_book_copy WHERE book_id = %s", (book_id,))
+        cursor.execute("DELETE FROM hzs_book WHERE book_id = %s", (book_id,))
+        cursor.execute("DELETE FROM hzs_customer WHERE customer_id = %s", (customer_id,))
+    conn.commit()
+    conn.close()
+
+
+def _rental(conn, rental_id):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT rental_status FROM hzs_rental WHERE rental_id = %s", (rental_id,))
+        status = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT invoice_type, invoic__amount FROM hzs_invoice WHERE rental_id = %s ORDER BY invoice_id",
+            (rental_id,),
+        )
+        return status, cursor.fetchall()
+
+
+def test_sweep_is_idempotent_and_return_bills_the_rest(pg_database, client, overdue_rental):
+    rental_id, now = overdue_rental
+    late_fee = Decimal(str(LATE_FEE_PER_DAY)) * DAYS_LATE
+    conn = psycopg2.connect(pg_database)
+    database.pool.open()
+    try:
+        # another sweep holds the lock: this one leaves everything alone
+        with conn.cursor() as cursor:
+            cursor.execute(TRY_LOCK_QUERY)
+            assert cursor.fetchone()[0]
+        assert overdue.run_overdue_job()["scanned"] == 0
+        assert _rental(conn, rental_id) == ("BORROWED", [])
+        with conn.cursor() as cursor:
+            cursor.execute(UNLOCK_QUERY)
+        conn.commit()
+
+        overdue.run_overdue_job()
+        assert _rental(conn, rental_id) == ("LATE", [("LATE_FEE", late_fee)])
+        # a second run neither duplicates nor rewrites the late-fee invoice
+        second = overdue.run_overdue_job()
+        assert _rental(conn, rental_id) == ("LATE", [("LATE_FEE", late_fee)])
+        assert second["flagged"] == 0
+
+        response = client.put(f"/rental/{rental_id}/return", json={"actual_return_date": now.isoformat()})
+        assert response.status_code == 200
+        assert response.json()["rental_status"] == "LATE"
+    finally:
+        database.pool.close()
+
+    # the rental invoice leaves out the late days the sweep has invoiced already
+    total = RENTAL_FEE_PER_DAY * LOAN_DAYS + late_fee
+    try:
+        _, invoices = _rental(conn, rental_id)
+    finally:
+        conn.close()
+    assert invoices == [("LATE_FEE", late_fee), ("RENTAL", total - late_fee)]
+    assert sum(amount for _, amount in invoices) == total
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app import database, utils
+
+CUSTOMER = {
+    "l_name": "Doe", "f_name": "Jane", "phone": "+15550100", "email": "jane@example.com",
+    "id_type": "SSN", "id_num": "123", "password": "secret",
+}
+
+
+def test_cancelled_job_releases_its_queue_slot(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(utils, "_hash_executor", executor)
+    release = threading.Event()
+
+    async def run():
+        busy = asyncio.ensure_future(utils._run_hash_job(release.wait))
+        waiting = asyncio.ensure_future(utils._run_hash_job(str.upper, "never runs"))
+        await asyncio.sleep(0.05)
+        assert utils.hash_stats()["queued"] == 1
+        # e.g. the client disconnected while the job waited for a worker
+        waiting.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await busy
+
+    asyncio.run(run())
+    executor.shutdown(wait=True)
+    stats = utils.hash_stats()
+    assert (stats["queued"], stats["running"]) == (0, 0)
+
+
+def test_password_is_hashed_before_a_connection_is_checked_out(fake_db, client, monkeypatch):
+    events = []
+
+    async def hash_async(password):
+        events.append("hash")
+        return "hashed:" + password
+
+    def getconn(timeout=None):
+        events.append("checkout")
+        return fake_db
+
+    monkeypatch.setattr(utils, "hash_async", hash_async)
+    monkeypatch.setattr(database.pool, "getconn", getconn)
+    fake_db.responder = lambda query, vars: (
+        [{"customer_id": 5, **{key: value for key, value in CUSTOMER.items() if key != "password"}, "role": "user"}]
+        if "INSERT INTO hzs_customer" in query else []
+    )
+
+    response = client.post("/customer/", json=CUSTOMER)
+    assert response.status_code == 201
+    assert events == ["hash", "checkout"]
+    assert fake_db.log[0][1][6] == "hashed:secret"
+    assert fake_db.log[-1] == ("COMMIT", None)
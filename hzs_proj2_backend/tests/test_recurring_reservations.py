@@ -0,0 +1,59 @@
+import datetime
+import pytest
+from fastapi import HTTPException
+from app.routers.room_reservation import MAX_OCCURRENCES, RoomReservationRecurringCreate, expand_occurrences
+
+START = datetime.datetime(2026, 3, 2, 14, 0)
+
+
+def _recurring(hours=2, **recurrence):
+    return RoomReservationRecurringCreate(
+        room_id=1, topic_description="Weekly study group", reserve_date=START.replace(hour=0),
+        start_time=START, end_time=START + datetime.timedelta(hours=hours), group_size=4,
+        l_name="Smith", f_name="John", recurrence=recurrence,
+    )
+
+
+def _starts(occurrences):
+    return [start for _, start, _ in occurrences]
+
+
+def test_daily_occurrences_step_by_the_interval():
+    occurrences = expand_occurrences(_recurring(freq="DAILY", interval=2, count=3))
+    assert _starts(occurrences) == [START, START + datetime.timedelta(days=2), START + datetime.timedelta(days=4)]
+    # every field of an occurrence moves by the same step
+    reserve_date, start, end = occurrences[2]
+    assert (reserve_date, end - start) == (datetime.datetime(2026, 3, 6), datetime.timedelta(hours=2))
+
+
+def test_weekly_occurrences_step_by_weeks():
+    occurrences = expand_occurrences(_recurring(freq="WEEKLY", interval=3, count=2))
+    assert _starts(occurrences) == [START, START + datetime.timedelta(weeks=3)]
+
+
+def test_until_is_inclusive():
+    occurrences = expand_occurrences(_recurring(freq="WEEKLY", until=datetime.date(2026, 3, 16)))
+    assert _starts(occurrences) == [START + datetime.timedelta(weeks=week) for week in range(3)]
+
+
+def test_count_ends_before_until():
+    occurrences = expand_occurrences(_recurring(freq="DAILY", count=2, until=datetime.date(2026, 12, 31)))
+    assert len(occurrences) == 2
+
+
+def test_until_before_the_first_occurrence_books_nothing():
+    assert expand_occurrences(_recurring(freq="DAILY", until=datetime.date(2026, 3, 1))) == []
+
+
+def test_occurrences_may_not_overlap_each_other():
+    with pytest.raises(HTTPException) as error:
+        expand_occurrences(_recurring(hours=25, freq="DAILY", count=2))
+    assert error.value.status_code == 400
+
+
+def test_occurrence_limit():
+    until = (START + datetime.timedelta(days=MAX_OCCURRENCES - 1)).date()
+    assert len(expand_occurrences(_recurring(freq="DAILY", until=until))) == MAX_OCCURRENCES
+    with pytest.raises(HTTPException) as error:
+        expand_occurrences(_recurring(freq="DAILY", until=until + datetime.timedelta(days=1)))
+    assert error.value.status_code == 400
@@ -0,0 +1,93 @@
+import datetime
+from app import reservation_index
+from app.reservation_index import ReservationIndex
+
+HORIZON = datetime.datetime(2026, 3, 1)
+UPDATED = datetime.datetime(2026, 3, 10, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _reservation(reservation_id, start, hours=1, room_id=1, updated=UPDATED, topic="Study group"):
+    return {
+        "reservation_id": reservation_id, "room_id": room_id, "topic_description": topic,
+        "reserve_date": start.replace(hour=0), "start_time": start, "end_time": start + datetime.timedelta(hours=hours),
+        "group_size": 4, "customer_id": None, "l_name": "Doe", "f_name": "Jane", "updated_at": updated,
+    }
+
+
+def _loaded(*rows):
+    index = ReservationIndex()
+    index.load(rows, HORIZON)
+    return index
+
+
+def test_an_older_row_does_not_replace_a_newer_one():
+    start = datetime.datetime(2026, 3, 12, 9, 0)
+    index = _loaded(_reservation(1, start))
+    newer = _reservation(1, start, topic="Moved by another worker", updated=UPDATED + datetime.timedelta(seconds=5))
+    index.apply_changes({1}, [newer])
+
+    # the route that made the older change writes it through after the notification
+    index.put(_reservation(1, start, topic="Stale write", updated=UPDATED + datetime.timedelta(seconds=1)))
+    assert index.get(1)["topic_description"] == "Moved by another worker"
+    index.apply_changes({1}, [_reservation(1, start, topic="Stale notification", updated=UPDATED)])
+    assert index.get(1)["topic_description"] == "Moved by another worker"
+    assert index.stats()["stale_writes"] == 2
+
+
+def test_days_before_the_horizon_are_not_answered_from_the_index():
+    index = _loaded(_reservation(1, datetime.datetime(2026, 3, 12, 9, 0)))
+    assert index.covers(datetime.datetime(2026, 3, 12))
+    assert not index.covers(datetime.datetime(2026, 2, 27))
+
+    # a reservation moved before the horizon leaves the index
+    index.put(_reservation(1, datetime.datetime(2026, 2, 27, 9, 0), updated=UPDATED + datetime.timedelta(seconds=1)))
+    assert index.get(1) is None
+
+
+def test_room_schedule_includes_the_cached_archive():
+    recent = _reservation(2, datetime.datetime(2026, 3, 12, 9, 0))
+    index = _loaded(recent)
+    assert index.by_room(1) is None
+
+    archived = _reservation(1, datetime.datetime(2026, 2, 10, 9, 0))
+    index.store_archive(1, [archived], index.archive_generation)
+    assert [r["reservation_id"] for r in index.by_room(1)] == [1, 2]
+    assert index.room_version(1)["row_count"] == 2
+
+    # deleting the archived reservation drops the archive, so the next request reads it again
+    index.apply_changes({1}, [])
+    assert index.by_room(1) is None
+
+
+def test_archive_read_during_a_change_is_not_cached():
+    index = _loaded()
+    generation = index.archive_generation
+    # e.g. an archived reservation of the room was deleted while its archive was read
+    index.apply_changes({7}, [])
+    index.store_archive(1, [_reservation(7, datetime.datetime(2026, 2, 10, 9, 0))], generation)
+    assert index.by_room(1) is None
+
+
+def test_advancing_the_horizon_drops_ended_reservations():
+    index = _loaded(_reservation(1, datetime.datetime(2026, 3, 2, 9, 0)),
+                    _reservation(2, datetime.datetime(2026, 3, 20, 9, 0)))
+    index.advance_horizon(datetime.datetime(2026, 3, 10))
+    assert index.get(1) is None
+    assert index.get(2) is not None
+    assert index.stats()["reservations"] == 1
+
+
+def test_room_etag_comes_from_the_index(fake_db, client, monkeypatch):
+    index = _loaded(_reservation(2, datetime.datetime(2026, 3, 12, 9, 0)))
+    index.store_archive(1, [], index.archive_generation)
+    monkeypatch.setattr(reservation_index, "reservation_index", index)
+    monkeypatch.setattr("app.routers.room_reservation.reservation_index", index)
+
+    first = client.get("/room-reservation/room/1")
+    assert first.status_code == 200
+    assert [r["reservation_id"] for r in first.json()] == [2]
+    assert client.get("/room-reservation/room/1", headers={"if-none-match": first.headers["etag"]}).status_code == 304
+    assert fake_db.queries("hzs_room_reservation") == []
+
+    index.put(_reservation(2, datetime.datetime(2026, 3, 12, 10, 0), updated=UPDATED + datetime.timedelta(seconds=1)))
+    assert client.get("/room-reservation/room/1", headers={"if-none-match": first.headers["etag"]}).status_code == 200
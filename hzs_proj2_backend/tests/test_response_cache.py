@@ -0,0 +1,124 @@
+import asyncio
+import time
+from jose import jwt
+from app import oauth2, response_cache
+from app.config import settings
+
+
+def test_int_params_only_match_digits():
+    regex = response_cache.route_regex("/book/{book_id:int}")
+    assert regex.match("/book/12").groupdict() == {"book_id": "12"}
+    assert regex.match("/book/search") is None
+    assert regex.match("/book/availability") is None
+    assert response_cache.route_regex("/author/{name}").match("/author/search")
+
+
+def test_static_book_routes_are_not_cached(fake_db, client):
+    fake_db.responder = lambda query, vars: (
+        [{"book_id": 1, "total": 2, "available": 1, "on_loan": 1, "late": 0}] if "hzs_book_availability" in query else []
+    )
+    for _ in range(2):
+        response = client.get("/book/availability?ids=1")
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+    assert len(fake_db.queries("hzs_book_availability")) == 2
+    assert response_cache.response_cache_stats()["stores"] == 0
+
+
+def _book_db(fake_db, users):
+    """Serve book 7 and the customers in `users` (customer_id -> role)."""
+    def responder(query, vars):
+        if "FROM hzs_customer" in query:
+            role = users.get(vars[0])
+            return [{"customer_id": vars[0], "role": role}] if role else []
+        if "FROM hzs_book" in query:
+            return [{"book_id": 7, "b_name": "Dune", "topic": "SF"}]
+        return []
+    fake_db.responder = responder
+
+
+def test_cached_book_is_served_to_admins_only(fake_db, client, auth_headers):
+    users = {1: "admin", 2: "admin"}
+    _book_db(fake_db, users)
+    first = client.get("/book/7", headers=auth_headers(1))
+    assert first.status_code == 200
+    assert client.get("/book/7", headers=auth_headers(2)).json() == first.json()
+    assert len(fake_db.queries("FROM hzs_book")) == 1
+
+    # demoted: the customer router drops the cached user when the role changes
+    users[2] = "customer"
+    oauth2.user_cache.invalidate(2)
+    assert client.get("/book/7", headers=auth_headers(2)).status_code == 403
+
+    # deleted customer, and no token at all
+    del users[1]
+    oauth2.user_cache.invalidate(1)
+    assert client.get("/book/7", headers=auth_headers(1)).status_code == 401
+    assert client.get("/book/7").status_code == 401
+    assert response_cache.response_cache_stats()["rejected"] == 3
+
+
+def test_expired_token_is_not_served_from_cache(fake_db, client, auth_headers):
+    _book_db(fake_db, {1: "admin"})
+    assert client.get("/book/7", headers=auth_headers(1)).status_code == 200
+
+    expired = jwt.encode({"user_id": 1, "role": "admin", "exp": int(time.time()) - 10},
+                         settings.secret_key, settings.algorithm)
+    response = client.get("/book/7", headers={"Authorization": f"Bearer {expired}"})
+    assert response.status_code == 401
+
+
+def test_memory_backend_forgets_tags_older_than_the_entry_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    backend = response_cache.MemoryBackend(max_size=3, ttl=60)
+    backend.bump([f"book:{i}" for i in range(3)])
+    seen = backend.tag_versions(["book:0", "book:1", "book:2"])
+
+    now[0] += 61
+    backend.bump(["book:3"])
+    assert backend.stats()["tags"] == 1
+    assert backend.tag_versions(["book:0", "book:3"]) == [0, 4]
+
+    # versions are never handed out twice, so keys stored under a forgotten one stay dead
+    backend.bump(["book:0"])
+    assert backend.tag_versions(["book:0"])[0] not in seen
+
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class _LoopRecordingBackend(response_cache.MemoryBackend):
+    """A MemoryBackend that claims to do I/O and records whether it is called on the event loop."""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__(max_size=10, ttl=60)
+        self.calls = []
+
+    def tag_versions(self, tags):
+        self.calls.append(_on_event_loop())
+        return super().tag_versions(tags)
+
+    def set(self, key, entry, ttl):
+        self.calls.append(_on_event_loop())
+        super().set(key, entry, ttl)
+
+
+def test_blocking_backend_is_called_off_the_event_loop(fake_db, client, auth_headers):
+    backend = _LoopRecordingBackend()
+    response_cache._backend = backend
+    _book_db(fake_db, {1: "admin"})
+
+    for _ in range(2):
+        assert client.get("/book/7", headers=auth_headers(1)).status_code == 200
+    assert response_cache.response_cache_stats()["hits"] == 1
+    # two lookups and one store
+    assert backend.calls == [False, False, False]
@@ -0,0 +1,145 @@
+import asyncio
+import datetime
+import httpx
+import psycopg2
+import pytest
+from psycopg2 import errors
+from app import database
+from app.main import app
+from app.routers.room_reservation import RESERVATION_CONFLICT_DETAIL
+
+SLOTS = 10
+REQUESTS_PER_SLOT = 20
+DAY = datetime.datetime(2026, 3, 2, 8, 0)
+
+
+def _booking(room_id, slot, attempt):
+    # every attempt at a slot covers its half-hour mark, so all attempts overlap each other
+    start = DAY + datetime.timedelta(hours=slot, minutes=5 * (attempt % 5))
+    return {
+        "room_id": room_id,
+        "topic_description": f"Slot {slot}, attempt {attempt}",
+        "reserve_date": DAY.isoformat(),
+        "start_time": start.isoformat(),
+        "end_time": (start + datetime.timedelta(minutes=35)).isoformat(),
+        "group_size": 4,
+        "l_name": "Race",
+        "f_name": "Tester",
+    }
+
+
+def test_overlap_is_reported_as_409(fake_db, client):
+    def responder(query, vars):
+        if "INSERT INTO hzs_room_reservation" in query:
+            raise errors.ExclusionViolation("conflicting key value violates exclusion constraint")
+        return []
+    fake_db.responder = responder
+
+    response = client.post("/room-reservation/", json=_booking(1, 0, 0))
+    assert response.status_code == 409
+    assert response.json() == {"detail": RESERVATION_CONFLICT_DETAIL}
+    assert fake_db.log[-1] == ("ROLLBACK", None)
+
+
+@pytest.fixture
+def room(pg_database):
+    conn = psycopg2.connect(pg_database)
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO hzs_study_room (capacity) VALUES (8) RETURNING room_id")
+        room_id = cursor.fetchone()[0]
+    conn.commit()
+    yield int(room_id)
+
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM hzs_room_reservation WHERE room_id = %s", (room_id,))
+        cursor.execute("DELETE FROM hzs_study_room WHERE room_id = %s", (room_id,))
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.postgres
+def test_parallel_overlapping_bookings_get_one_slot_each(pg_database, room):
+    async def book_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            bookings = [_booking(room, slot, attempt) for attempt in range(REQUESTS_PER_SLOT) for slot in range(SLOTS)]
+            return await asyncio.gather(*(http.post("/room-reservation/", json=booking) for booking in bookings))
+
+    database.pool.open()
+    try:
+        responses = asyncio.run(book_all())
+    finally:
+        database.pool.close()
+
+    created = [response.json() for response in responses if response.status_code == 201]
+    conflicts = [response for response in responses if response.status_code == 409]
+    assert len(created) + len(conflicts) == SLOTS * REQUESTS_PER_SLOT
+    assert all(response.json()["detail"] == RESERVATION_CONFLICT_DETAIL for response in conflicts)
+    assert sorted(reservation["topic_description"].split(",")[0] for reservation in created) == \
+        sorted(f"Slot {slot}" for slot in range(SLOTS))
+
+    conn = psycopg2.connect(pg_database)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT count(*)
+                FROM hzs_room_reservation a
+                JOIN hzs_room_reservation b
+                  ON a.room_id = b.room_id AND a.reservation_id < b.reservation_id
+                 AND a.start_time < b.end_time AND b.start_time < a.end_time
+                WHERE a.room_id = %s
+                """,
+                (room,),
+            )
+            assert cursor.fetchone()[0] == 0
+            cursor.execute("SELECT count(*) FROM hzs_room_reservation WHERE room_id = %s", (room,))
+            assert cursor.fetchone()[0] == SLOTS
+    finally:
+        conn.close()
+
+
+def _recurring(room_id, skip_conflicts):
+    return {**_booking(room_id, 0, 0), "topic_description": "Weekly", "skip_conflicts": skip_conflicts,
+            "recurrence": {"freq": "WEEKLY", "count": 4}}
+
+
+@pytest.mark.postgres
+def test_recurring_booking_skips_only_the_taken_occurrences(pg_database, client, room):
+    # the second weekly occurrence overlaps an existing reservation
+    taken = {**_booking(room, 0, 0), "topic_description": "Taken"}
+    for field in ("reserve_date", "start_time", "end_time"):
+        taken[field] = (datetime.datetime.fromisoformat(taken[field]) + datetime.timedelta(weeks=1, minutes=30)).isoformat()
+
+    database.pool.open()
+    try:
+        existing = client.post("/room-reservation/", json=taken)
+        assert existing.status_code == 201
+        all_or_nothing = client.post("/room-reservation/recurring", json=_recurring(room, skip_conflicts=False))
+        partial = client.post("/room-reservation/recurring", json=_recurring(room, skip_conflicts=True))
+    finally:
+        database.pool.close()
+
+    assert all_or_nothing.status_code == 409
+    assert [c["occurrence"] for c in all_or_nothing.json()["detail"]["conflicts"]] == [2]
+
+    assert partial.status_code == 201
+    body = partial.json()
+    assert sorted(r["start_time"] for r in body["created"]) == [
+        (DAY + datetime.timedelta(weeks=week)).isoformat() for week in (0, 2, 3)
+    ]
+    assert body["conflicts"] == [{
+        "occurrence": 2,
+        "start_time": (DAY + datetime.timedelta(weeks=1)).isoformat(),
+        "end_time": (DAY + datetime.timedelta(weeks=1, minutes=35)).isoformat(),
+        "conflicting_reservation_id": existing.json()["reservation_id"],
+    }]
+
+    conn = psycopg2.connect(pg_database)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT topic_description, count(*) FROM hzs_room_reservation WHERE room_id = %s "
+                           "GROUP BY topic_description ORDER BY topic_description", (room,))
+            assert cursor.fetchall() == [("Taken", 1), ("Weekly", 3)]
+    finally:
+        conn.close()